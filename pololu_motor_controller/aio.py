@@ -0,0 +1,705 @@
+import asyncio
+import collections
+import concurrent.futures
+import os
+
+
+from pololu_motor_controller.exceptions import ResponseTimeoutError, SerialCrcError, SerialError
+from pololu_motor_controller.utils.serial_port import open_serial_port
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, verify_responses
+from pololu_motor_controller.utils.pololu_protocol.variables import (
+    SerialErrors,
+    Variables,
+
+    combine_values,
+    decode_variables,
+    scale_value,
+)
+from pololu_motor_controller.utils.pololu_protocol.frames import FrameEncoder, Resolutions, use_low_resolution
+from pololu_motor_controller.utils.pololu_protocol.commands import (
+    Command,
+    Commands,
+    Protocols,
+)
+
+
+POLL_INTERVAL = 0.001  # seconds, used only where the event loop cannot watch the port
+
+
+class AsyncSerialTransport:
+    """
+    AsyncSerialTransport
+    Non-blocking serial port driven by the event loop. Responses are matched to requests in request order. Requests to
+    one device are pipelined; a request to another device waits until the pending responses are received, so devices
+    on a daisy chain never answer at the same time.
+    The port is watched with loop.add_reader() and written with loop.add_writer() where supported (POSIX). Otherwise
+    it is polled from the event loop, only while responses are pending, and written from a single writer thread so a
+    slow write never blocks the event loop.
+    """
+    def __init__(self, com_port, baud_rate=115200, connection=None, loop=None):
+        """
+        Initializer
+        :param com_port: COM Port
+        :type com_port: str
+        :param baud_rate: baud rate
+        :type baud_rate: int
+        :param connection: already opened serial port (pyserial compatible); opened from com_port if not provided
+        :type connection: serial.Serial
+        :param loop: event loop; the running loop if not provided
+        :type loop: asyncio.AbstractEventLoop
+        """
+        self.__com_port = com_port
+        self.__baud_rate = baud_rate
+        self.__loop = loop or asyncio.get_running_loop()
+
+        if connection is None:
+            connection = self.__connect()
+        connection.timeout = 0  # reads return whatever is available, without blocking
+        self.__connection = connection
+        self.__connected = True
+
+        self.__received = bytearray()
+        self.__pending = collections.deque()  # [expected bytes, future], in request order
+        self.__pending_device = None  # device the pending requests are addressed to
+        self.__idle = asyncio.Event()  # set while no response is pending
+        self.__idle.set()
+
+        self.__reader_registered = False
+        self.__poll_handle = None
+        try:
+            self.__loop.add_reader(connection.fileno(), self.__on_readable)
+            self.__reader_registered = True
+        except (AttributeError, NotImplementedError, OSError, ValueError):
+            pass
+
+        # bytes not yet accepted by the port (the file descriptor of pyserial ports is non-blocking)
+        self.__outgoing = bytearray()
+        self.__writer_registered = False
+        self.__writer = None  # single thread writer, for ports the event loop cannot watch
+
+    def __connect(self):
+        """
+        Establish connection.
+        :return: connection
+        :rtype: serial.Serial
+        """
+        try:
+            return open_serial_port(self.__com_port, self.__baud_rate, timeout=0)
+        except Exception as exception:
+            raise ConnectionError(f'Failed to establish connection: {exception}')
+
+    def __on_readable(self):
+        """
+        Read everything available and complete the pending requests it satisfies.
+        :return: None
+        """
+        connection = self.__connection
+        data = connection.read(connection.in_waiting or 1)
+        if data:
+            self.__received += data
+        self.__dispatch()
+
+    def __dispatch(self):
+        """
+        Complete pending requests, in order, for as long as enough bytes have been received.
+        :return: None
+        """
+        received = self.__received
+        pending = self.__pending
+        while pending and len(received) >= pending[0][0]:
+            expected_bytes, future = pending.popleft()
+            response = bytes(received[:expected_bytes])
+            del received[:expected_bytes]
+            if not future.done():
+                future.set_result(response)
+        if not pending:
+            self.__idle.set()
+
+    def __write(self, bytes_array):
+        """
+        Write bytes without blocking the event loop, in call order.
+        :param bytes_array: bytes to be sent
+        :type bytes_array: bytes or bytearray
+        :return: future completed once the bytes are written, None if already accepted by the port
+        :rtype: asyncio.Future
+        """
+        if self.__reader_registered:
+            self.__outgoing += bytes_array
+            if not self.__writer_registered:
+                self.__on_writable()
+            return None
+
+        if self.__writer is None:
+            self.__writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='AsyncSerialWriter')
+        return self.__loop.run_in_executor(self.__writer, self.__connection.write, bytes(bytes_array))
+
+    def __on_writable(self):
+        """
+        Write as many pending bytes as the port accepts; wait for it to be writable again if some are left.
+        :return: None
+        """
+        file_descriptor = self.__connection.fileno()
+        try:
+            written = os.write(file_descriptor, self.__outgoing)
+        except BlockingIOError:
+            written = 0
+        del self.__outgoing[:written]
+
+        if self.__outgoing and not self.__writer_registered:
+            self.__loop.add_writer(file_descriptor, self.__on_writable)
+            self.__writer_registered = True
+        elif not self.__outgoing and self.__writer_registered:
+            self.__loop.remove_writer(file_descriptor)
+            self.__writer_registered = False
+
+    def __poll(self):
+        """
+        Fallback for ports the event loop cannot watch: poll while responses are pending.
+        :return: None
+        """
+        self.__poll_handle = None
+        if not self.__connected:
+            return
+        if self.__connection.in_waiting:
+            self.__on_readable()
+        if self.__pending:
+            self.__poll_handle = self.__loop.call_later(POLL_INTERVAL, self.__poll)
+
+    def __resynchronize(self):
+        """
+        Drop pending requests and every byte received so far, so a late response cannot be matched to a later
+        request.
+        :return: None
+        """
+        while self.__pending:
+            expected_bytes, future = self.__pending.popleft()
+            if not future.done():
+                future.set_exception(ResponseTimeoutError(
+                    'Response lost after an earlier request timed out!',
+                    expected_bytes=expected_bytes,
+                ))
+        self.__idle.set()
+        self.__received.clear()
+        self.__connection.reset_input_buffer()
+
+    async def request(self, bytes_array, expected_bytes=0, timeout=None, device_number=None):
+        """
+        Send bytes and wait for the response.
+        :param bytes_array: bytes to be sent
+        :type bytes_array: bytes or bytearray
+        :param expected_bytes: number of expected response bytes
+        :type expected_bytes: int
+        :param timeout: maximum time to wait for the response once the request is written, in seconds; wait forever
+        if None
+        :type timeout: float
+        :param device_number: device the bytes are addressed to, None if unknown
+        :type device_number: int
+        :return: received bytes
+        :rtype: bytes
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        if not self.__connected:
+            raise ConnectionError('A connection must be established first!')
+        while expected_bytes and self.__pending and self.__pending_device != device_number:
+            await self.__idle.wait()  # another device is answering
+            if not self.__connected:
+                raise ConnectionError('Connection closed!')
+
+        # write and queue without yielding, so the response order always matches the request order
+        written = self.__write(bytes_array)
+        if not expected_bytes:
+            if written is not None:
+                await written
+            return b''
+
+        future = self.__loop.create_future()
+        self.__pending.append([expected_bytes, future])
+        self.__pending_device = device_number
+        self.__idle.clear()
+        if not self.__reader_registered and self.__poll_handle is None:
+            self.__poll_handle = self.__loop.call_soon(self.__poll)
+
+        try:
+            if written is not None:
+                await written
+            return await asyncio.wait_for(future, timeout)
+        except ResponseTimeoutError:
+            raise  # failed by the resynchronization after an earlier request timed out
+        except asyncio.TimeoutError:
+            received = bytes(self.__received[:expected_bytes])
+            self.__resynchronize()
+            raise ResponseTimeoutError(
+                f'Timed out waiting for response: received {len(received)} of {expected_bytes} bytes '
+                f'within {timeout}s!',
+                expected_bytes=expected_bytes,
+                received=received,
+            ) from None
+
+    def close(self):
+        """
+        Close the port. Pending requests fail with ConnectionError.
+        :return: None
+        """
+        if not self.__connected:
+            return
+        self.__connected = False
+        if self.__reader_registered:
+            self.__loop.remove_reader(self.__connection.fileno())
+            self.__reader_registered = False
+        if self.__poll_handle is not None:
+            self.__poll_handle.cancel()
+            self.__poll_handle = None
+        if self.__writer_registered:
+            self.__loop.remove_writer(self.__connection.fileno())
+            self.__writer_registered = False
+        if self.__writer is not None:
+            self.__writer.shutdown(wait=True)
+            self.__writer = None
+        while self.__pending:
+            expected_bytes, future = self.__pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError('Connection closed!'))
+        self.__idle.set()
+        self.__connection.close()
+
+    @property
+    def com_port(self):
+        """
+        Get COM Port.
+        :return: com port
+        :rtype: str
+        """
+        return self.__com_port
+
+    @property
+    def baud_rate(self):
+        """
+        Get baud rate.
+        :return: baud_rate
+        :rtype: int
+        """
+        return self.__baud_rate
+
+    @property
+    def connected(self):
+        """
+        Get connected status.
+        :return: connected
+        :rtype: bool
+        """
+        return self.__connected
+
+
+class AsyncPololuMotorController:
+    """
+    AsyncPololuMotorController
+    asyncio counterpart of PololuMotorController. Several controllers may share one transport (daisy chain).
+    """
+    def __init__(self, com_port, baud_rate=115200, device_number=0x0D, protocol=Protocols.POLOLU,
+                 resolution=Resolutions.FULL, transport=None, timeout=None, crc=CrcModes.DISABLED):
+        """
+        Initializer. Must be called from within a running event loop; use connect() to also read the device info.
+        :param com_port: COM Port
+        :type com_port: str
+        :param baud_rate: baud rate
+        :type baud_rate: int
+        :param device_number: device number
+        :type device_number: int
+        :param protocol: protocol; the compact protocol saves 2 bytes per frame but requires a single device link
+        :type protocol: Protocols
+        :param resolution: speed command resolution policy; the 7-bit commands save 1 byte per speed frame
+        :type resolution: Resolutions
+        :param transport: transport shared with other daisy-chained controllers; a private one is opened if not
+        provided
+        :type transport: AsyncSerialTransport
+        :param timeout: default response timeout, in seconds; wait forever if None
+        :type timeout: float
+        :param crc: CRC mode, as configured on the controller
+        :type crc: CrcModes
+        """
+        # commands
+        # ==============================================================================================================
+        self.__commands = Commands
+        # ==============================================================================================================
+
+        # connection
+        # ==============================================================================================================
+        self.__owns_transport = transport is None
+        if transport is None:
+            transport = AsyncSerialTransport(com_port=com_port, baud_rate=baud_rate)
+        self.__transport = transport
+        self.__timeout = timeout
+        # ==============================================================================================================
+
+        # device
+        # ==============================================================================================================
+        self.__device_number = device_number
+        self.__encoder = FrameEncoder(device_number, protocol, crc)
+        self.__resolution = resolution
+
+        self.__product_id = 'N/A'
+        self.__firmware_version = 'N/A'
+        # ==============================================================================================================
+
+    @classmethod
+    async def connect(cls, com_port, baud_rate=115200, device_number=0x0D, protocol=Protocols.POLOLU,
+                      resolution=Resolutions.FULL, transport=None, timeout=None, crc=CrcModes.DISABLED):
+        """
+        Create a controller and read its firmware version (and product id).
+        :return: controller
+        :rtype: AsyncPololuMotorController
+        """
+        controller = cls(
+            com_port=com_port,
+            baud_rate=baud_rate,
+            device_number=device_number,
+            protocol=protocol,
+            resolution=resolution,
+            transport=transport,
+            timeout=timeout,
+            crc=crc,
+        )
+        device_info = await controller.get_firmware_version()
+        controller.__product_id = device_info.get('product_id', 'N/A')
+        controller.__firmware_version = device_info.get('firmware_version', 'N/A')
+        return controller
+
+    async def terminate(self):
+        """
+        Terminate application. To be called before closing.
+        The transport is closed only if it is not shared with other controllers.
+        :return: None
+        """
+        if self.connected:
+            await self.stop_motor()
+        if self.__owns_transport:
+            self.__transport.close()
+
+    async def __send_frame(self, command, frame, timeout):
+        """
+        Send an encoded frame to the board and wait for the response, if the command has one.
+        :param command: command the frame was encoded for
+        :type command: Commands
+        :param frame: complete frame
+        :type frame: bytes or bytearray
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: received response
+        :rtype: bytes
+        :raises CrcError: the response failed its CRC check
+        """
+        command = command.value
+        command: Command
+
+        if timeout is None:
+            timeout = self.__timeout
+        response = await self.__transport.request(
+            frame, self.__response_length(command.response_bytes), timeout, self.__device_number,
+        )
+        return self.__verify(response, command.response_bytes) if command.response_bytes else None
+
+    def __response_length(self, response_bytes, responses=1):
+        """
+        Get the number of bytes to read for consecutive responses, CRC bytes included.
+        :param response_bytes: length of one response, CRC byte excluded
+        :type response_bytes: int
+        :param responses: number of responses
+        :type responses: int
+        :return: number of bytes
+        :rtype: int
+        """
+        if response_bytes and self.__encoder.response_crc:
+            response_bytes += 1
+        return response_bytes * responses
+
+    def __verify(self, response, response_bytes):
+        """
+        Verify and strip the response CRC bytes, if the controller appends them.
+        :param response: received bytes
+        :type response: bytes
+        :param response_bytes: length of one response, CRC byte excluded
+        :type response_bytes: int
+        :return: responses
+        :rtype: bytes
+        :raises CrcError: a response failed its CRC check
+        """
+        if response_bytes and self.__encoder.response_crc:
+            return verify_responses(response, response_bytes)
+        return response
+
+    async def send_command(self, command, timeout=None):
+        """
+        Send command to the board
+        :param command: command to be sent
+        :type command: Commands
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: sent status and received response
+        :rtype: tuple
+        """
+        response = await self.__send_frame(command, self.__encoder.command(command), timeout)
+        return True, response
+
+    @property
+    def com_port(self):
+        """
+        Get COM Port.
+        :return: com port
+        :rtype: str
+        """
+        return self.__transport.com_port
+
+    @property
+    def baud_rate(self):
+        """
+        Get baud rate.
+        :return: baud_rate
+        :rtype: int
+        """
+        return self.__transport.baud_rate
+
+    @property
+    def connected(self):
+        """
+        Get connected status.
+        :return: connected
+        :rtype: bool
+        """
+        return self.__transport.connected
+
+    @property
+    def transport(self):
+        """
+        Get transport.
+        :return: transport the controller is connected through
+        :rtype: AsyncSerialTransport
+        """
+        return self.__transport
+
+    @property
+    def device_number(self):
+        """
+        Get device number.
+        :return: device number
+        :rtype: int
+        """
+        return self.__device_number
+
+    @property
+    def protocol(self):
+        """
+        Get protocol.
+        :return: protocol
+        :rtype: Protocols
+        """
+        return self.__encoder.protocol
+
+    @property
+    def crc(self):
+        """
+        Get CRC mode.
+        :return: CRC mode
+        :rtype: CrcModes
+        """
+        return self.__encoder.crc
+
+    @property
+    def resolution(self):
+        """
+        Get speed command resolution policy.
+        :return: resolution policy
+        :rtype: Resolutions
+        """
+        return self.__resolution
+
+    @property
+    def device_number_hex(self):
+        """
+        Get device number as hex value.
+        :return: device number
+        :rtype: str
+        """
+        return hex(self.__device_number)
+
+    @property
+    def product_id(self):
+        """
+        Get product id, as read by connect().
+        :return: product id
+        :rtype: str
+        """
+        return self.__product_id
+
+    @property
+    def firmware_version(self):
+        """
+        Get firmware version, as read by connect().
+        :return: firmware version
+        :rtype: str
+        """
+        return self.__firmware_version
+
+    @property
+    def commands(self):
+        """
+        Get commands.
+        :return: commands enumeration
+        :rtype: Commands
+        """
+        return self.__commands
+
+    async def get_firmware_version(self, timeout=None):
+        """
+        Get firmware version (and product id).
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: firmware version and product id
+        :rtype: dict
+        """
+        command = self.commands.get_firmware_version
+        response = await self.__send_frame(command, self.__encoder.command(command), timeout)
+        return command.value.normalizer(response)
+
+    async def exit_safe_start(self):
+        """
+        Exit Safe-Start. Description available within command definition.
+        :return: None
+        """
+        command = self.commands.exit_safe_start
+        await self.__send_frame(command, self.__encoder.command(command), None)  # no response expected
+
+    async def motor_forward(self, speed):
+        """
+        Motor Forward. Description available within command definition.
+        The 7-bit variant of the command is sent instead when the resolution policy allows it.
+        :param speed: desired speed [0-3200]
+        :type speed: int
+        :return: None
+        """
+        if use_low_resolution(speed, self.__resolution):
+            command = self.commands.motor_forward_low_resolution
+            frame = self.__encoder.motor_forward_low_resolution(speed)
+        else:
+            command = self.commands.motor_forward
+            frame = self.__encoder.motor_forward(speed)
+        await self.__send_frame(command, frame, None)  # no response expected
+
+    async def motor_reverse(self, speed):
+        """
+        Motor Reverse. Description available within command definition.
+        The 7-bit variant of the command is sent instead when the resolution policy allows it.
+        :param speed: desired speed [0-3200]
+        :type speed: int
+        :return: None
+        """
+        if use_low_resolution(speed, self.__resolution):
+            command = self.commands.motor_reverse_low_resolution
+            frame = self.__encoder.motor_reverse_low_resolution(speed)
+        else:
+            command = self.commands.motor_reverse
+            frame = self.__encoder.motor_reverse(speed)
+        await self.__send_frame(command, frame, None)  # no response expected
+
+    async def motor_brake(self, brake_amount=1):
+        """
+        Motor Brake. Description available within command definition.
+        :param brake_amount: desired brake amount [0-32]
+        :type brake_amount: int
+        :return: None
+        """
+        await self.__send_frame(self.commands.motor_brake, self.__encoder.motor_brake(brake_amount), None)
+
+    async def stop_motor(self):
+        """
+        Stop Motor. Description available within command definition.
+        Exit Safe Start command required in order to control motor again.
+        :return: None
+        """
+        command = self.commands.stop_motor
+        await self.__send_frame(command, self.__encoder.command(command), None)  # no response expected
+
+    async def read_variables(self, variables, timeout=None):
+        """
+        Read several variables in a single exchange.
+        :param variables: variables to be read
+        :type variables: iterable of Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: raw 16-bit values keyed by variable, signed variables decoded as such
+        :rtype: dict
+        """
+        variables = list(dict.fromkeys(variables))  # drop duplicates, keep order
+        if not variables:
+            return {}
+
+        if timeout is None:
+            timeout = self.__timeout
+        response_bytes = self.commands.get_variable.value.response_bytes
+        response = await self.__transport.request(
+            self.__encoder.get_variables(variables),
+            self.__response_length(response_bytes, len(variables)),
+            timeout,
+            self.__device_number,
+        )
+        return decode_variables(variables, self.__verify(response, response_bytes))
+
+    async def get_variable(self, variable, timeout=None):
+        """
+        Get variable.
+        :param variable: variable to be read
+        :type variable: Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: raw 16-bit value, signed variables decoded as such
+        :rtype: int
+        """
+        values = await self.read_variables((variable, ), timeout)
+        return values[variable]
+
+    async def get_input_voltage(self, timeout=None):
+        """
+        Get input voltage.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: input voltage in mV
+        :rtype: int
+        """
+        return await self.get_variable(Variables.INPUT_VOLTAGE, timeout)
+
+    async def get_temperature(self, timeout=None):
+        """
+        Get temperature.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: board temperature as measured by a temperature sensor near the motor driver
+        :rtype: float
+        """
+        return scale_value(Variables.TEMPERATURE, await self.get_variable(Variables.TEMPERATURE, timeout))
+
+    async def get_system_time(self, timeout=None):
+        """
+        Get system time: both 16-bit halves are read in a single exchange.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: milliseconds since the last reset or power-up, modulo 2^32
+        :rtype: int
+        """
+        values = await self.read_variables((Variables.SYSTEM_TIME_LOW, Variables.SYSTEM_TIME_HIGH), timeout)
+        return combine_values(values)[Variables.SYSTEM_TIME_LOW]
+
+    async def check_serial_errors(self, timeout=None):
+        """
+        Read (and thereby clear) the serial errors latched by the board since the last check.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: serial errors occurred since the last check: none
+        :rtype: SerialErrors
+        :raises SerialCrcError: the board received frames failing their CRC check
+        :raises SerialError: the board reported other serial errors
+        """
+        errors = SerialErrors(await self.get_variable(Variables.SERIAL_ERRORS_OCCURRED, timeout))
+        if errors & SerialErrors.CRC:
+            raise SerialCrcError(f'Frames ignored by the board: {errors!r}!', errors=errors)
+        if errors:
+            raise SerialError(f'Serial errors reported by the board: {errors!r}!', errors=errors)
+        return errors
@@ -0,0 +1,270 @@
+# Baud rate probing
+# In Serial/USB input mode with automatic baud detection, the Simple Motor Controller measures the baud rate on the
+# first 0xAA byte (BAUD_RATE_SYNC_BYTE) it receives and keeps that rate until it is reset. The probe tries candidate
+# rates from the highest to the lowest: a freshly reset controller locks onto the first (fastest) rate it is probed at,
+# while an already locked one only answers at its locked rate. At each rate the probe sends Get Firmware Version (its Pololu
+# protocol frame starts with the sync byte; a lone sync byte would be reported as a format error), checks the response
+# and the baud rate the controller reports, then runs a short burst of Get Variable reads to measure the error rate.
+# usage: python -m pololu_motor_controller.baud_probe COM7 --baud-rates 115200 57600 9600
+import argparse
+import collections
+import json
+import sys
+import time
+
+
+from pololu_motor_controller.bus import PololuBus
+from pololu_motor_controller.exceptions import PololuError
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, verify_responses
+from pololu_motor_controller.utils.pololu_protocol.frames import FrameEncoder
+from pololu_motor_controller.utils.pololu_protocol.variables import VARIABLE_RESPONSE_BYTES, Variables, decode_variables
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+DEFAULT_BAUD_RATES = (115200, 57600, 38400, 19200, 9600, 4800, 2400, 1200)  # supported by the controller
+DEFAULT_READS = 50
+DEFAULT_TIMEOUT = 0.1  # seconds, per response
+BAUD_RATE_TOLERANCE = 0.05  # maximum relative difference between the probed and the reported baud rates
+BAUD_RATE_REGISTER_CLOCK = 72000000  # BAUD_RATE_REGISTER = BAUD_RATE_REGISTER_CLOCK / baud rate
+
+BURST_VARIABLES = (
+    Variables.ERROR_STATUS,
+    Variables.TARGET_SPEED,
+    Variables.SPEED,
+    Variables.INPUT_VOLTAGE,
+    Variables.TEMPERATURE,
+)
+
+
+ProbeResult = collections.namedtuple(
+    'ProbeResult',
+    [
+        'baud_rate',  # probed baud rate
+        'responding',  # True if the firmware version was received
+        'product_id',  # reported product id, None if not responding
+        'firmware_version',  # reported firmware version, None if not responding
+        'reported_baud_rate',  # baud rate measured by the controller, None if not read
+        'reads',  # number of Get Variable reads in the burst
+        'errors',  # failed reads (timeouts, CRC errors) plus serial errors reported by the controller
+        'round_trip',  # mean Get Variable round trip, in seconds; None if no read succeeded
+    ],
+)
+
+
+def error_rate(result):
+    """
+    Get the error rate of a probe.
+    :param result: probe result
+    :type result: ProbeResult
+    :return: errors per read [0, 1]; 1 if the controller did not respond
+    :rtype: float
+    """
+    if not result.responding or not result.reads:
+        return 1.0
+    return min(1.0, result.errors / result.reads)
+
+
+def reliable(result, max_error_rate=0.0):
+    """
+    Check whether a probed baud rate can be used.
+    :param result: probe result
+    :type result: ProbeResult
+    :param max_error_rate: maximum accepted error rate [0, 1]
+    :type max_error_rate: float
+    :return: True if the controller responded at the expected baud rate within the accepted error rate
+    :rtype: bool
+    """
+    if not result.responding or result.reported_baud_rate is None:
+        return False
+    if abs(result.reported_baud_rate - result.baud_rate) > result.baud_rate * BAUD_RATE_TOLERANCE:
+        return False
+    return error_rate(result) <= max_error_rate
+
+
+def probe_baud_rate(com_port, baud_rate, device_number=0x0D, reads=DEFAULT_READS, timeout=DEFAULT_TIMEOUT,
+                    crc=CrcModes.DISABLED, connection_factory=None):
+    """
+    Probe one baud rate.
+    :param com_port: COM Port
+    :type com_port: str
+    :param baud_rate: probed baud rate
+    :type baud_rate: int
+    :param device_number: device number
+    :type device_number: int
+    :param reads: number of Get Variable reads in the burst
+    :type reads: int
+    :param timeout: response timeout, in seconds
+    :type timeout: float
+    :param crc: CRC mode, as configured on the controller
+    :type crc: CrcModes
+    :param connection_factory: called with (com_port, baud_rate) to open the port, e.g. to probe an emulator; the port
+    is opened with pyserial if not provided
+    :type connection_factory: callable
+    :return: result
+    :rtype: ProbeResult
+    """
+    encoder = FrameEncoder(device_number, crc=crc)
+    response_crc = encoder.response_crc
+    connection = connection_factory(com_port, baud_rate) if connection_factory is not None else None
+    bus = PololuBus(com_port, baud_rate, connection=connection)
+
+    def exchange(frame, response_bytes):
+        """
+        Exchange one frame, verifying the response CRC if enabled.
+        """
+        if response_crc:
+            return verify_responses(bus.exchange(frame, response_bytes + 1, timeout=timeout), response_bytes)
+        return bus.exchange(frame, response_bytes, timeout=timeout)
+
+    def read_variable(variable):
+        """
+        Read one variable.
+        """
+        response = exchange(encoder.get_variable(variable), VARIABLE_RESPONSE_BYTES)
+        return decode_variables((variable, ), response)[variable]
+
+    try:
+        command = Commands.get_firmware_version
+        try:
+            device_info = command.value.normalizer(exchange(encoder.command(command), command.value.response_bytes))
+        except PololuError:
+            return ProbeResult(baud_rate, False, None, None, None, 0, 0, None)
+
+        try:
+            register = read_variable(Variables.BAUD_RATE_REGISTER)
+            reported_baud_rate = round(BAUD_RATE_REGISTER_CLOCK / register) if register else None
+            read_variable(Variables.SERIAL_ERRORS_OCCURRED)  # clear the errors caused by the previous rates
+        except PololuError:
+            reported_baud_rate = None
+
+        errors = 0
+        round_trips = []
+        clock = time.perf_counter
+        for index in range(reads):
+            started = clock()
+            try:
+                read_variable(BURST_VARIABLES[index % len(BURST_VARIABLES)])
+            except PololuError:
+                errors += 1
+            else:
+                round_trips.append(clock() - started)
+
+        try:
+            serial_errors = read_variable(Variables.SERIAL_ERRORS_OCCURRED)
+            errors += bin(serial_errors).count('1')
+        except PololuError:
+            errors += 1
+
+        return ProbeResult(
+            baud_rate=baud_rate,
+            responding=True,
+            product_id=device_info.get('product_id'),
+            firmware_version=device_info.get('firmware_version'),
+            reported_baud_rate=reported_baud_rate,
+            reads=reads,
+            errors=errors,
+            round_trip=sum(round_trips) / len(round_trips) if round_trips else None,
+        )
+    finally:
+        bus.disconnect()
+
+
+def probe_baud_rates(com_port, baud_rates=DEFAULT_BAUD_RATES, device_number=0x0D, reads=DEFAULT_READS,
+                     timeout=DEFAULT_TIMEOUT, crc=CrcModes.DISABLED, max_error_rate=0.0, stop_at_first=True,
+                     connection_factory=None):
+    """
+    Probe candidate baud rates, from the highest to the lowest.
+    :param com_port: COM Port
+    :type com_port: str
+    :param baud_rates: candidate baud rates
+    :type baud_rates: iterable of int
+    :param device_number: device number
+    :type device_number: int
+    :param reads: number of Get Variable reads in each burst
+    :type reads: int
+    :param timeout: response timeout, in seconds
+    :type timeout: float
+    :param crc: CRC mode, as configured on the controller
+    :type crc: CrcModes
+    :param max_error_rate: maximum accepted error rate [0, 1]
+    :type max_error_rate: float
+    :param stop_at_first: stop at the first reliable baud rate
+    :type stop_at_first: bool
+    :param connection_factory: called with (com_port, baud_rate) to open the port; pyserial if not provided
+    :type connection_factory: callable
+    :return: results, from the highest baud rate to the lowest
+    :rtype: list of ProbeResult
+    """
+    results = []
+    for baud_rate in sorted(set(baud_rates), reverse=True):
+        result = probe_baud_rate(
+            com_port,
+            baud_rate,
+            device_number=device_number,
+            reads=reads,
+            timeout=timeout,
+            crc=crc,
+            connection_factory=connection_factory,
+        )
+        results.append(result)
+        if stop_at_first and reliable(result, max_error_rate):
+            break
+    return results
+
+
+def select_baud_rate(results, max_error_rate=0.0):
+    """
+    Select the fastest reliable baud rate.
+    :param results: probe results
+    :type results: iterable of ProbeResult
+    :param max_error_rate: maximum accepted error rate [0, 1]
+    :type max_error_rate: float
+    :return: baud rate, None if none is reliable
+    :rtype: int
+    """
+    candidates = [result.baud_rate for result in results if reliable(result, max_error_rate)]
+    return max(candidates) if candidates else None
+
+
+def main(argv=None):
+    """
+    Probe baud rates from the command line.
+    :param argv: command line arguments
+    :type argv: list
+    :return: exit code: 0 if a reliable baud rate was found, 1 otherwise
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Pololu Motor Controller baud rate probe')
+    parser.add_argument('com_port', help='COM Port')
+    parser.add_argument('--baud-rates', nargs='+', type=int, default=DEFAULT_BAUD_RATES, help='candidate baud rates')
+    parser.add_argument('--device-number', type=lambda value: int(value, 0), default=0x0D, help='device number')
+    parser.add_argument('--reads', type=int, default=DEFAULT_READS, help='Get Variable reads per baud rate')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='response timeout, in seconds')
+    parser.add_argument('--max-error-rate', type=float, default=0.0, help='maximum accepted error rate [0, 1]')
+    parser.add_argument('--all', action='store_true', help='probe every baud rate instead of stopping at the first')
+    arguments = parser.parse_args(argv)
+
+    results = probe_baud_rates(
+        arguments.com_port,
+        baud_rates=arguments.baud_rates,
+        device_number=arguments.device_number,
+        reads=arguments.reads,
+        timeout=arguments.timeout,
+        max_error_rate=arguments.max_error_rate,
+        stop_at_first=not arguments.all,
+    )
+    selected = select_baud_rate(results, arguments.max_error_rate)
+
+    report = {
+        'com_port': arguments.com_port,
+        'device_number': arguments.device_number,
+        'selected_baud_rate': selected,
+        'results': [dict(result._asdict(), error_rate=error_rate(result)) for result in results],
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
+    return 0 if selected is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
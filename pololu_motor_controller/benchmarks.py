@@ -0,0 +1,217 @@
+# Command path benchmarks
+# Measures commands/s and round trip latency percentiles of every command, of the motor_forward() setpoint path and of
+# variable reads, against emulated devices (EmulatedSerial or EmulatorPty) at several baud rates. Results are written
+# as JSON so releases can be compared. A run without wire time ("baud_rate": null) isolates the Python side cost.
+# Write-only benchmarks ("write_only": true) return once the frame is handed to the port; on EmulatedSerial they also
+# wait for the frame to leave the emulated line (flush()) so their results include wire time, on EmulatorPty they do
+# not. Motor limits and Safe-Start are restored after every benchmark, so each one runs against a device able to move.
+# usage: python -m pololu_motor_controller.benchmarks --baud-rates 115200 460800 --output benchmarks.json
+import argparse
+import json
+import platform
+import sys
+import time
+
+
+from pololu_motor_controller.core import PololuMotorController
+from pololu_motor_controller.emulator import EmulatedSerial, EmulatorPty
+from pololu_motor_controller.version import __version__
+from pololu_motor_controller.utils.statistics import percentile
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+DEFAULT_BAUD_RATES = (None, 115200, 460800)
+DEFAULT_ITERATIONS = 500
+WARMUP_ITERATIONS = 20
+
+BULK_VARIABLES = (
+    Variables.ERROR_STATUS,
+    Variables.LIMIT_STATUS,
+    Variables.TARGET_SPEED,
+    Variables.SPEED,
+    Variables.BRAKE_AMOUNT,
+    Variables.INPUT_VOLTAGE,
+    Variables.TEMPERATURE,
+    Variables.SYSTEM_TIME_LOW,
+    Variables.SYSTEM_TIME_HIGH,
+    Variables.MAX_SPEED_FORWARD,
+)
+
+
+def measure(operation, iterations):
+    """
+    Measure an operation.
+    :param operation: operation, called with the iteration index
+    :type operation: callable
+    :param iterations: number of measured calls
+    :type iterations: int
+    :return: throughput (operations/s) and latency statistics (µs)
+    :rtype: dict
+    """
+    for index in range(WARMUP_ITERATIONS):
+        operation(index)
+
+    clock = time.perf_counter
+    latencies = [0.0] * iterations
+    started = clock()
+    for index in range(iterations):
+        call_started = clock()
+        operation(index)
+        latencies[index] = clock() - call_started
+    elapsed = clock() - started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'ops_per_second': iterations / elapsed if elapsed else None,
+        'latency_us': {
+            'mean': sum(latencies) / iterations * 1e6,
+            'p50': percentile(latencies, 0.50) * 1e6,
+            'p99': percentile(latencies, 0.99) * 1e6,
+            'p999': percentile(latencies, 0.999) * 1e6,
+            'max': latencies[-1] * 1e6,
+        },
+    }
+
+
+def operations(controller, flush=None):
+    """
+    Get the benchmarked operations.
+    :param controller: benchmarked controller
+    :type controller: PololuMotorController
+    :param flush: called after every write-only operation (e.g. waiting for the bytes to leave the line), if any
+    :type flush: callable
+    :return: operations keyed by benchmark name, and the names of the write-only ones
+    :rtype: tuple
+    """
+    benchmarks = {}
+    write_only = set()
+    for command in Commands:
+        benchmarks[f'send_command.{command.name}'] = lambda index, command=command: controller.send_command(command)
+        if not command.value.response_bytes:
+            write_only.add(f'send_command.{command.name}')
+
+    benchmarks['motor_forward'] = lambda index: controller.motor_forward(index % 3201)
+    benchmarks['set_speed'] = lambda index: controller.set_speed(index % 6401 - 3200)
+    write_only.update(('motor_forward', 'set_speed'))
+    benchmarks['get_variable'] = lambda index: controller.get_variable(Variables.SPEED)
+    benchmarks[f'read_variables.{len(BULK_VARIABLES)}'] = lambda index: controller.read_variables(BULK_VARIABLES)
+    benchmarks[f'get_variable.{len(BULK_VARIABLES)}x'] = lambda index: [
+        controller.get_variable(variable) for variable in BULK_VARIABLES
+    ]
+
+    if flush is not None:
+        for name in write_only:
+            benchmarks[name] = lambda index, operation=benchmarks[name]: (operation(index), flush())
+    return benchmarks, write_only
+
+
+def run_benchmarks(baud_rates=DEFAULT_BAUD_RATES, iterations=DEFAULT_ITERATIONS, transport='emulated', latency=0.0,
+                   selected=None):
+    """
+    Run the benchmarks.
+    :param baud_rates: baud rates; None runs without wire time and latency
+    :type baud_rates: iterable
+    :param iterations: number of measured calls per benchmark
+    :type iterations: int
+    :param transport: 'emulated' (EmulatedSerial) or 'pty' (EmulatorPty)
+    :type transport: str
+    :param latency: device response latency, in seconds
+    :type latency: float
+    :param selected: names of the benchmarks to run; all if None
+    :type selected: iterable of str
+    :return: results
+    :rtype: list
+    """
+    results = []
+    for baud_rate in baud_rates:
+        simulate_timing = baud_rate is not None
+        emulated_baud_rate = baud_rate or 115200
+
+        pty = None
+        flush = None
+        if transport == 'pty':
+            pty = EmulatorPty(baud_rate=emulated_baud_rate, latency=latency, simulate_timing=simulate_timing)
+            controller = PololuMotorController(com_port=pty.port, baud_rate=emulated_baud_rate)
+        elif transport == 'emulated':
+            connection = EmulatedSerial(baudrate=emulated_baud_rate, latency=latency, simulate_timing=simulate_timing)
+            controller = PololuMotorController(com_port=None, baud_rate=emulated_baud_rate, connection=connection)
+            flush = connection.flush if simulate_timing else None
+        else:
+            raise ValueError(f'Invalid transport: {transport}! Must be one of: emulated, pty! ')
+
+        try:
+            controller.exit_safe_start()
+            limits = controller.read_motor_limits()
+            benchmarks, write_only = operations(controller, flush)
+            for name, operation in benchmarks.items():
+                if selected and name not in selected:
+                    continue
+                result = {
+                    'benchmark': name,
+                    'transport': transport,
+                    'baud_rate': baud_rate,
+                    'latency_s': latency if simulate_timing else 0.0,
+                    'write_only': name in write_only,
+                }
+                result.update(measure(operation, iterations))
+                results.append(result)
+
+                # undo what the benchmark changed (Set Motor Limit sets 0, Stop Motor sets Safe-Start)
+                controller.configure_motor_limits(limits)
+                controller.exit_safe_start()
+        finally:
+            controller.terminate()
+            if pty is not None:
+                pty.close()
+    return results
+
+
+def main(argv=None):
+    """
+    Run the benchmarks from the command line.
+    :param argv: command line arguments
+    :type argv: list
+    :return: exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Pololu Motor Controller command path benchmarks')
+    parser.add_argument('--baud-rates', nargs='+', default=None,
+                        help='baud rates to emulate; "none" runs without wire time (default: none 115200 460800)')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS, help='measured calls per benchmark')
+    parser.add_argument('--transport', choices=('emulated', 'pty'), default='emulated', help='emulated device link')
+    parser.add_argument('--latency', type=float, default=0.0, help='device response latency, in seconds')
+    parser.add_argument('--benchmark', action='append', dest='selected', help='benchmark to run (repeatable)')
+    parser.add_argument('--output', default=None, help='JSON output file (default: stdout)')
+    arguments = parser.parse_args(argv)
+
+    baud_rates = DEFAULT_BAUD_RATES
+    if arguments.baud_rates:
+        baud_rates = [None if value.lower() == 'none' else int(value) for value in arguments.baud_rates]
+
+    report = {
+        'package_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'results': run_benchmarks(
+            baud_rates=baud_rates,
+            iterations=arguments.iterations,
+            transport=arguments.transport,
+            latency=arguments.latency,
+            selected=arguments.selected,
+        ),
+    }
+
+    if arguments.output:
+        with open(arguments.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,413 @@
+import collections
+import threading
+import time
+
+
+from pololu_motor_controller.exceptions import ResponseTimeoutError
+from pololu_motor_controller.instrumentation import ExchangeRecord
+from pololu_motor_controller.worker import IoWorker
+from pololu_motor_controller.utils.serial_port import open_serial_port
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes
+from pololu_motor_controller.utils.pololu_protocol.frames import Brake, encode_setpoints
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+BITS_PER_BYTE = 10  # start bit, 8 data bits, stop bit
+
+
+GroupWrite = collections.namedtuple(
+    'GroupWrite',
+    [
+        'devices',  # number of devices (frames) in the group
+        'bytes',  # bytes written
+        'wire_time',  # time the whole group takes on the wire at the bus baud rate, in seconds
+        'spread',  # wire time between the end of the first frame and the end of the last one, in seconds
+        'write_time',  # time spent in the write call (bus wait included), in seconds
+    ],
+)
+
+
+class FairLock:
+    """
+    FairLock
+    Lock granted in request order (ticket lock), so no thread can be overtaken indefinitely by others.
+    """
+    def __init__(self):
+        """
+        Initializer
+        """
+        self.__condition = threading.Condition(threading.Lock())
+        self.__next_ticket = 0
+        self.__now_serving = 0
+
+    def acquire(self):
+        """
+        Wait for the lock, in request order.
+        :return: None
+        """
+        with self.__condition:
+            ticket = self.__next_ticket
+            self.__next_ticket += 1
+            while self.__now_serving != ticket:
+                self.__condition.wait()
+
+    def release(self):
+        """
+        Release the lock to the next waiting thread.
+        :return: None
+        """
+        with self.__condition:
+            self.__now_serving += 1
+            self.__condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class PololuBus:
+    """
+    PololuBus
+    Serial line shared by one or more daisy-chained controllers, addressed by their device numbers.
+    """
+    def __init__(self, com_port, baud_rate=115200, connection=None):
+        """
+        Initializer
+        :param com_port: COM Port
+        :type com_port: str
+        :param baud_rate: baud rate
+        :type baud_rate: int
+        :param connection: already opened serial port (pyserial compatible); opened from com_port if not provided
+        :type connection: serial.Serial
+        """
+        # connection
+        # ==============================================================================================================
+        self.__com_port = com_port
+        self.__baud_rate = baud_rate
+
+        # every request/response exchange on the line holds this lock, granted first come first served
+        self.__lock = FairLock()
+
+        self.__connected = False
+        if connection is None:
+            connection = self.__connect()
+        else:
+            self.__connected = True
+        self.__connection = connection
+
+        # read timeout currently configured on the port; only changed when an exchange needs a different one
+        self.__read_timeout = getattr(connection, 'timeout', None)
+        # set after a response timed out: bytes arriving late are discarded before the next exchange
+        self.__resynchronize = False
+
+        # I/O worker owning the line in thread-safe mode, started on first use
+        self.__worker = None
+        self.__worker_lock = threading.Lock()
+        # ==============================================================================================================
+
+        # devices
+        # ==============================================================================================================
+        self.__devices = {}
+        # ==============================================================================================================
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def __connect(self):
+        """
+        Establish connection.
+        :return: connection
+        :rtype: serial.Serial
+        """
+        try:
+            connection = open_serial_port(self.__com_port, self.__baud_rate)
+            self.__connected = True
+            return connection
+        except Exception as exception:
+            self.__connected = False
+            error = f'Failed to establish connection: {exception}'
+            self.__log_error(error)
+            raise ConnectionError(error)
+
+    def disconnect(self):
+        """
+        Disconnect. Devices on the bus can no longer be used afterwards.
+        :return: None
+        """
+        if self.__worker is not None:
+            self.__worker.stop()  # after the queued requests
+        with self.__lock:
+            if self.__connected:
+                self.__connection.close()
+                self.__connected = False
+
+    def terminate(self):
+        """
+        Stop every device handed out by the bus, then disconnect. To be called before closing.
+        :return: None
+        """
+        if self.__connected:
+            for device in self.__devices.values():
+                device.stop_motor()
+        self.disconnect()
+
+    def device(self, device_number=0x0D, lazy=False, **kwargs):
+        """
+        Get the controller with the specified device number. Handles are created once and shared afterwards.
+        :param device_number: device number
+        :type device_number: int
+        :param lazy: read the firmware version of a new handle only when requested, instead of on creation
+        :type lazy: bool
+        :param kwargs: other PololuMotorController options of a new handle (timeout, crc, protocol, instrumentation,
+        cache, threaded, ...); ignored if the handle already exists
+        :return: controller
+        :rtype: PololuMotorController
+        """
+        device = self.__devices.get(device_number)
+        if device is None:
+            from pololu_motor_controller.core import PololuMotorController
+
+            device = PololuMotorController(
+                com_port=self.__com_port,
+                baud_rate=self.__baud_rate,
+                device_number=device_number,
+                bus=self,
+                lazy=lazy,
+                **kwargs
+            )
+        return device
+
+    def register(self, device):
+        """
+        Register a controller attached to the bus, so it is stopped by terminate() and its cache kept consistent by
+        group writes. Called by the controller itself; the first controller of each device number is kept.
+        :param device: controller
+        :type device: PololuMotorController
+        :return: None
+        """
+        self.__devices.setdefault(device.device_number, device)
+
+    def set_speeds(self, setpoints, crc=None, instrumentation=None):
+        """
+        Set the speeds of several devices at once: every frame is encoded into one buffer, written with a single write,
+        so the devices receive their setpoints back to back on the wire.
+        Frames are always full-resolution Pololu protocol frames (the compact protocol cannot address several devices)
+        and are written directly under the bus lock: they never queue behind the I/O worker of threaded handles, and
+        they are not counted as traffic by the handles' keepalives (which may then send one keepalive too many).
+        :param setpoints: signed speed [-3200, 3200] or Brake(amount) keyed by device number
+        :type setpoints: dict
+        :param crc: CRC mode of every device; if None, the mode of each device's registered handle (disabled for
+        devices without one)
+        :type crc: CrcModes
+        :param instrumentation: instrumentation the write is recorded to, if any
+        :type instrumentation: Instrumentation
+        :return: write report
+        :rtype: GroupWrite
+        """
+        if not setpoints:
+            return GroupWrite(0, 0, 0.0, 0.0, 0.0)
+        if crc is None:
+            devices = self.__devices
+            crc = {
+                device_number: device_number in devices and devices[device_number].crc is not CrcModes.DISABLED
+                for device_number in setpoints
+            }
+        else:
+            crc = crc is not CrcModes.DISABLED
+        buffer, first_frame = encode_setpoints(setpoints, crc)
+        commands = {
+            Commands.motor_brake if isinstance(setpoint, Brake) else
+            Commands.motor_forward if setpoint >= 0 else Commands.motor_reverse
+            for setpoint in setpoints.values()
+        }
+
+        started = time.perf_counter()
+        self.exchange(buffer, 0, commands.pop() if len(commands) == 1 else None, instrumentation, len(setpoints))
+        write_time = time.perf_counter() - started
+
+        # the handles of these devices no longer know their speeds
+        for device_number in setpoints:
+            device = self.__devices.get(device_number)
+            if device is not None and device.cache is not None:
+                device.cache.command_sent(Commands.motor_forward)
+
+        byte_time = BITS_PER_BYTE / self.__baud_rate
+        return GroupWrite(
+            devices=len(setpoints),
+            bytes=len(buffer),
+            wire_time=len(buffer) * byte_time,
+            spread=(len(buffer) - first_frame) * byte_time,
+            write_time=write_time,
+        )
+
+    def __write(self, bytes_array):
+        """
+        Write bytes, discarding first any late response left over by a timed out exchange. Bus lock required.
+        :param bytes_array: bytes to be sent
+        :type bytes_array: bytes or bytearray
+        :return: None
+        """
+        if not self.__connected:
+            raise ConnectionError('A connection must be established first!')
+        if self.__resynchronize:
+            self.__connection.reset_input_buffer()
+            self.__resynchronize = False
+        self.__connection.write(bytes_array)
+
+    def __read(self, expected_bytes, timeout):
+        """
+        Read the expected response bytes before the deadline. Bus lock required.
+        :param expected_bytes: number of expected response bytes
+        :type expected_bytes: int
+        :param timeout: maximum time to wait for the whole response, in seconds; wait forever if None
+        :type timeout: float
+        :return: received bytes
+        :rtype: bytes
+        """
+        connection = self.__connection
+        if timeout != self.__read_timeout:
+            connection.timeout = timeout
+            self.__read_timeout = timeout
+
+        response = connection.read(expected_bytes)
+        if len(response) < expected_bytes:
+            # drop the partial response now and anything arriving late before the next exchange, so a late byte
+            # cannot shift every later response
+            connection.reset_input_buffer()
+            self.__resynchronize = True
+            raise ResponseTimeoutError(
+                f'Timed out waiting for response: received {len(response)} of {expected_bytes} bytes '
+                f'within {timeout}s!',
+                expected_bytes=expected_bytes,
+                received=response,
+            )
+        return response
+
+    def exchange(self, bytes_array, expected_bytes=0, command=None, instrumentation=None, frames=1, timeout=None):
+        """
+        Send bytes and read the response as one exchange. Exchanges from different threads never interleave on the
+        line and are served in request order.
+        :param bytes_array: bytes to be sent
+        :type bytes_array: bytes or bytearray
+        :param expected_bytes: number of expected response bytes
+        :type expected_bytes: int
+        :param command: command the bytes were encoded for, reported to instrumentation
+        :type command: Commands
+        :param instrumentation: instrumentation the exchange is recorded to, if any
+        :type instrumentation: Instrumentation
+        :param frames: number of frames in bytes_array, reported to instrumentation
+        :type frames: int
+        :param timeout: maximum time to wait for the whole response, in seconds; wait forever if None
+        :type timeout: float
+        :return: received bytes
+        :rtype: bytes
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        if instrumentation is not None:
+            return self.__instrumented_exchange(bytes_array, expected_bytes, command, instrumentation, frames, timeout)
+
+        with self.__lock:
+            self.__write(bytes_array)
+            if expected_bytes:
+                return self.__read(expected_bytes, timeout)
+            return b''
+
+    def __instrumented_exchange(self, bytes_array, expected_bytes, command, instrumentation, frames, timeout):
+        """
+        Exchange, timing the wait for the bus, the write and the wait for the response.
+        :return: received bytes
+        :rtype: bytes
+        """
+        clock = time.perf_counter
+        started = clock()
+        acquired = written = finished = None
+        response = None
+        error = None
+        try:
+            with self.__lock:
+                acquired = clock()
+                self.__write(bytes_array)
+                written = clock()
+                if expected_bytes:
+                    response = self.__read(expected_bytes, timeout)
+                finished = clock()
+        except ResponseTimeoutError as exception:
+            finished = clock()
+            error = exception
+            response = exception.received
+            raise
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            now = clock()
+            instrumentation.record(ExchangeRecord(
+                command=command,
+                frames=frames,
+                request=bytes_array,
+                response=response,
+                expected_bytes=expected_bytes,
+                started=started,
+                acquired=acquired or now,
+                written=written,
+                finished=finished,
+                error=error,
+            ))
+        return response if expected_bytes else b''
+
+    @property
+    def com_port(self):
+        """
+        Get COM Port.
+        :return: com port
+        :rtype: str
+        """
+        return self.__com_port
+
+    @property
+    def baud_rate(self):
+        """
+        Get baud rate.
+        :return: baud_rate
+        :rtype: int
+        """
+        return self.__baud_rate
+
+    @property
+    def connected(self):
+        """
+        Get connected status.
+        :return: connected
+        :rtype: bool
+        """
+        return self.__connected
+
+    @property
+    def worker(self):
+        """
+        Get the I/O worker exchanges are queued to in thread-safe mode, created on first request.
+        :return: worker
+        :rtype: IoWorker
+        """
+        if self.__worker is None:
+            with self.__worker_lock:
+                if self.__worker is None:
+                    self.__worker = IoWorker(self)
+        return self.__worker
+
+    @property
+    def devices(self):
+        """
+        Get devices handed out by the bus.
+        :return: controllers keyed by device number
+        :rtype: dict
+        """
+        return dict(self.__devices)
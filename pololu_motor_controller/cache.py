@@ -0,0 +1,184 @@
+import math
+import threading
+import time
+
+
+from pololu_motor_controller.utils.pololu_protocol.limits import LIMIT_VARIABLES
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+# freshness policies: maximum age of a cached value, in seconds
+IMMUTABLE = math.inf  # read once while connected
+SLOW = 1.0  # changes slowly (temperature, input voltage); re-read at most once per second
+LIVE = 0.0  # always read from the board
+
+# variables not listed are LIVE: latched flags (cleared when read), inputs, speeds, system time and the temporary
+# motor limits (restored to their settings by a device reset)
+DEFAULT_POLICIES = {
+    Variables.RESET_FLAGS: IMMUTABLE,
+    Variables.BAUD_RATE_REGISTER: IMMUTABLE,
+
+    Variables.INPUT_VOLTAGE: SLOW,
+    Variables.TEMPERATURE: SLOW,
+    Variables.RC_PERIOD: SLOW,
+}
+
+# variables a command changes, dropped from the cache once the command is sent
+SPEED_VARIABLES = (Variables.TARGET_SPEED, Variables.BRAKE_AMOUNT, Variables.ERROR_STATUS, Variables.LIMIT_STATUS)
+INVALIDATIONS = {
+    Commands.exit_safe_start: (Variables.ERROR_STATUS, Variables.LIMIT_STATUS),
+    Commands.motor_forward: SPEED_VARIABLES,
+    Commands.motor_reverse: SPEED_VARIABLES,
+    Commands.motor_forward_low_resolution: SPEED_VARIABLES,
+    Commands.motor_reverse_low_resolution: SPEED_VARIABLES,
+    Commands.motor_brake: SPEED_VARIABLES,
+    Commands.stop_motor: SPEED_VARIABLES,
+    Commands.set_motor_limit: tuple(LIMIT_VARIABLES.values()),
+}
+
+
+class VariableCache:
+    """
+    VariableCache
+    Read-through cache of variable values, each kept for the maximum age of its policy. The controller serves reads
+    from it and fills every miss of a read with a single pipelined exchange; commands drop the variables they change.
+    """
+    def __init__(self, policies=None, default=LIVE):
+        """
+        Initializer
+        :param policies: maximum age (IMMUTABLE, SLOW, LIVE or any number of seconds) keyed by variable, overriding
+        DEFAULT_POLICIES
+        :type policies: dict
+        :param default: maximum age of the variables without a policy
+        :type default: float
+        """
+        self.__policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.__policies.update(policies)
+        self.__default = default
+
+        self.__lock = threading.Lock()
+        self.__entries = {}  # (value, time.monotonic() of the read) keyed by variable
+        self.__hits = 0
+        self.__misses = 0
+
+    def max_age(self, variable):
+        """
+        Get the maximum age of a variable.
+        :param variable: variable
+        :type variable: Variables
+        :return: maximum age, in seconds
+        :rtype: float
+        """
+        return self.__policies.get(variable, self.__default)
+
+    def lookup(self, variables):
+        """
+        Split requested variables into fresh cached values and misses, counting both.
+        :param variables: requested variables, without duplicates
+        :type variables: list of Variables
+        :return: cached values keyed by variable, and the variables to be read
+        :rtype: tuple
+        """
+        now = time.monotonic()
+        hits = {}
+        misses = []
+        with self.__lock:
+            for variable in variables:
+                entry = self.__entries.get(variable)
+                if entry is not None and now - entry[1] <= self.max_age(variable):
+                    hits[variable] = entry[0]
+                else:
+                    misses.append(variable)
+            self.__hits += len(hits)
+            self.__misses += len(misses)
+        return hits, misses
+
+    def store(self, values):
+        """
+        Store values just read from the board. LIVE variables are not stored.
+        :param values: raw values keyed by variable
+        :type values: dict
+        :return: None
+        """
+        now = time.monotonic()
+        with self.__lock:
+            for variable, value in values.items():
+                if self.max_age(variable) > 0:
+                    self.__entries[variable] = (value, now)
+
+    def invalidate(self, variables=None):
+        """
+        Drop cached values.
+        :param variables: variables to be dropped; every variable if None
+        :type variables: iterable of Variables
+        :return: None
+        """
+        with self.__lock:
+            if variables is None:
+                self.__entries.clear()
+                return
+            for variable in variables:
+                self.__entries.pop(variable, None)
+
+    def command_sent(self, command):
+        """
+        Drop the variables changed by a command.
+        :param command: command sent to the board
+        :type command: Commands
+        :return: None
+        """
+        variables = INVALIDATIONS.get(command)
+        if variables:
+            self.invalidate(variables)
+
+    def reset_stats(self):
+        """
+        Reset hit and miss counters.
+        :return: None
+        """
+        with self.__lock:
+            self.__hits = self.__misses = 0
+
+    @property
+    def hits(self):
+        """
+        Get number of variables served from the cache.
+        :return: hits
+        :rtype: int
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        Get number of variables read from the board.
+        :return: misses
+        :rtype: int
+        """
+        return self.__misses
+
+    @property
+    def hit_rate(self):
+        """
+        Get ratio of the variables served from the cache.
+        :return: hit rate [0, 1], None if nothing was requested
+        :rtype: float
+        """
+        requested = self.__hits + self.__misses
+        return self.__hits / requested if requested else None
+
+    @property
+    def stats(self):
+        """
+        Get statistics.
+        :return: hits, misses, hit rate and number of cached variables
+        :rtype: dict
+        """
+        return {
+            'hits': self.__hits,
+            'misses': self.__misses,
+            'hit_rate': self.hit_rate,
+            'cached': len(self.__entries),
+        }
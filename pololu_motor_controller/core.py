@@ -1,15 +1,44 @@
-import serial
+import concurrent.futures
+import functools
+import threading
 import time
 
 
-from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+from pololu_motor_controller.bus import PololuBus
+from pololu_motor_controller.keepalive import DEFAULT_LEAD, KeepaliveScheduler
+from pololu_motor_controller.exceptions import (
+    CrcError,
+    MotorLimitError,
+    ResponseTimeoutError,
+    SerialCrcError,
+    SerialError,
+)
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, verify_responses
+from pololu_motor_controller.utils.pololu_protocol.limits import (
+    BOTH_DIRECTIONS,
+    LIMIT_VARIABLES,
+    MOTOR_LIMIT_RESPONSE_BYTES,
+    LimitConflicts,
+    MotorLimitProfile,
+
+    limit_changes,
+    limit_value,
+    profile_limits,
+)
+from pololu_motor_controller.utils.pololu_protocol.variables import (
+    VARIABLE_RESPONSE_BYTES,
+    SerialErrors,
+    Variables,
+
+    combine_values,
+    decode_variables,
+    scale_value,
+)
+from pololu_motor_controller.utils.pololu_protocol.frames import FrameEncoder, Resolutions, use_low_resolution
 from pololu_motor_controller.utils.pololu_protocol.commands import (
-    BAUD_RATE_SYNC_BYTE,
-
-    VARIABLE_ID_BYTE_INDEX,
-
     Command,
     Commands,
+    Protocols,
 )
 
 
@@ -17,11 +46,39 @@ class PololuMotorController:
     """
     PololuMotorController
     """
-    def __init__(self, com_port, baud_rate=115200, device_number=0x0D):
+    def __init__(self, com_port, baud_rate=115200, device_number=0x0D, protocol=Protocols.POLOLU,
+                 resolution=Resolutions.FULL, bus=None, connection=None, instrumentation=None, timeout=None,
+                 crc=CrcModes.DISABLED, lazy=False, cache=None, threaded=False):
         """
 
         :param com_port: COM Port
         :type com_port: str
+        :param baud_rate: baud rate
+        :type baud_rate: int
+        :param device_number: device number
+        :type device_number: int
+        :param protocol: protocol; the compact protocol saves 2 bytes per frame but requires a single device link
+        :type protocol: Protocols
+        :param resolution: speed command resolution policy; the 7-bit commands save 1 byte per speed frame
+        :type resolution: Resolutions
+        :param bus: bus shared with other daisy-chained controllers; a private one is opened if not provided
+        :type bus: PololuBus
+        :param connection: already opened serial port (pyserial compatible) for the private bus, e.g. EmulatedSerial
+        :type connection: serial.Serial
+        :param instrumentation: instrumentation every exchange is recorded to; disabled if None
+        :type instrumentation: Instrumentation
+        :param timeout: default response timeout, in seconds; wait forever if None
+        :type timeout: float
+        :param crc: CRC mode, as configured on the controller
+        :type crc: CrcModes
+        :param lazy: open the private bus on first use and read the firmware version (and product id) only when
+        requested, instead of doing both here
+        :type lazy: bool
+        :param cache: cache variable reads are served from (the firmware version is then read once); disabled if None
+        :type cache: VariableCache
+        :param threaded: thread-safe mode: frames are copied out of the encoder under a lock and exchanged by the bus
+        I/O worker, which writes requests queued by concurrent threads as one buffer
+        :type threaded: bool
         """
         # commands
         # ==============================================================================================================
@@ -30,20 +87,37 @@ class PololuMotorController:
 
         # connection
         # ==============================================================================================================
+        self.__owns_bus = bus is None
+        if bus is not None:
+            com_port, baud_rate = bus.com_port, bus.baud_rate
         self.__com_port = com_port
         self.__baud_rate = baud_rate
-
-        self.__connected = False
-        self.__connection = self.__connect()
+        self.__connection = connection
+        self.__bus = bus
+        self.__open_lock = threading.Lock()
+        if not lazy:
+            self.__open()
+        self.__instrumentation = instrumentation
+        self.__timeout = timeout
+        self.__threaded = threaded
+        self.__keepalive = None
+        self.__last_sent = None  # time.monotonic() of the last exchange, tracked while a keepalive is running
         # ==============================================================================================================
 
         # device
         # ==============================================================================================================
         self.__device_number = device_number
-
-        device_info = self.get_firmware_version()
-        self.__product_id = device_info.get('product_info', 'N/A')
-        self.__firmware_version = device_info.get('firmware_version', 'N/A')
+        self.__encoder = FrameEncoder(device_number, protocol, crc)
+        self.__encoder_lock = threading.Lock()  # the encoder reuses its buffers, shared in thread-safe mode
+        self.__resolution = resolution
+
+        self.__device_info = None  # firmware version and product id, read once
+        self.__error_status = None  # (value, time.monotonic()) of the last ERROR_STATUS read
+        self.__cache = cache
+        if not lazy:
+            self.handshake()
+        if bus is not None:
+            bus.register(self)
         # ==============================================================================================================
 
     def __log_error(self, error):  # noqa
@@ -54,6 +128,23 @@ class PololuMotorController:
         """
         print(error)
 
+    def __open(self):
+        """
+        Open the private bus, unless already open.
+        :return: bus
+        :rtype: PololuBus
+        """
+        if self.__bus is None:
+            with self.__open_lock:
+                if self.__bus is None:
+                    self.__bus = PololuBus(
+                        com_port=self.__com_port,
+                        baud_rate=self.__baud_rate,
+                        connection=self.__connection,
+                    )
+                    self.__connection = None
+        return self.__bus
+
     def __connection_required(method):  # noqa
         """
 
@@ -68,103 +159,158 @@ class PololuMotorController:
             :param kwargs:
             :return:
             """
-            if not self.__connected:
+            if not self.__open().connected:
                 raise ConnectionError('A connection must be established first!')
             return method(self, *args, **kwargs)  # noqa
 
         return wrapper
 
-    def __connect(self):
-        """
-        Establish connection.
-        :return: connection
-        :rtype: serial.Serial
-        """
-        if not self.__connected:
-            try:
-                connection = serial.Serial(
-                    port=self.__com_port,
-                    baudrate=self.__baud_rate,
-                    timeout=None,
-                    bytesize=8,
-                    parity='N',
-                    stopbits=1,
-                )
-                self.__connected = True
-                return connection
-            except Exception as exception:
-                self.__connected = False
-                error = f'Failed to establish connection: {exception}'
-                self.__log_error(error)
-                raise ConnectionError(error)
-
-    def __disconnect(self):
-        """
-        Disconnect
-        :return: None
-        """
-        if self.__connected:
-            self.__connection.close()
-            self.__connected = False
-
     def terminate(self):
         """
         Terminate application. To be called before closing.
+        The connection is closed only if it is not shared with other controllers through a bus.
         :return: None
         """
-        if self.__connected:
+        self.stop_keepalive()
+        if self.connected:
             self.stop_motor()
-        self.__disconnect()
+        if self.__owns_bus and self.__bus is not None:
+            self.__bus.disconnect()
+        if self.__cache is not None:
+            self.__cache.invalidate()
 
     @__connection_required  # noqa
-    def send_command(self, command):
+    def send_command(self, command, timeout=None):
         """
         Send command to the board
         :param command: command to be sent
         :type command: Commands
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: sent status and received response
+        :rtype: tuple
+        :raises ResponseTimeoutError: the response was not received in time
+        :raises CrcError: the response failed its CRC check
+        """
+        return self.__send_frame(command, self.__encode(self.__encoder.command, command), timeout)
+
+    def __send_frame(self, command, frame, timeout=None):
+        """
+        Send an encoded frame to the board and read the response, if the command has one.
+        :param command: command the frame was encoded for
+        :type command: Commands
+        :param frame: complete frame
+        :type frame: bytes or bytearray
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
         :return: sent status and received response
         :rtype: tuple
+        :raises ResponseTimeoutError: the response was not received in time
+        :raises CrcError: the response failed its CRC check
         """
-        command = command.value
-        command: Command
+        definition = command.value
+        definition: Command
 
         response = None
 
         try:
-            self.__send_bytes(bytearray([BAUD_RATE_SYNC_BYTE, self.device_number]) + command.payload)
+            response = self.__exchange(
+                frame, self.__response_length(definition.response_bytes), command, timeout=timeout,
+            )
+            response = self.__verify(response, definition.response_bytes)
             sent = True
+        except ResponseTimeoutError as exception:
+            self.__log_error(f'No response to command: {definition}!\n{exception}')
+            raise
+        except CrcError as exception:
+            self.__log_error(f'Corrupted response to command: {definition}!\n{exception}')
+            raise
         except Exception as exception:
-            error = f'Failed to send command: {command}!\n{exception}'
+            error = f'Failed to send command: {definition}!\n{exception}'
             self.__log_error(error)
             sent = False
             response = None
 
-        if sent:
-            if command.response_bytes:
-                response = self.__receive_bytes(command.response_bytes)
+        if self.__cache is not None:
+            self.__cache.command_sent(command)
+
+        if not definition.response_bytes:
+            response = None
 
         return sent, response
 
-    @__connection_required  # noqa
-    def __send_bytes(self, bytes_array):
+    def __encode(self, encode, *args):
         """
-        Send specified bytes to the board.
-        :param bytes_array: bytes array to be sent
-        :type bytes_array: bytearray
-        :return: None
+        Encode a frame. In thread-safe mode the frame is copied out of the encoder's reusable buffer under a lock.
+        :param encode: encoder method
+        :type encode: callable
+        :param args: encoder method arguments
+        :return: frame
+        :rtype: bytes or bytearray
+        """
+        if not self.__threaded:
+            return encode(*args)
+        with self.__encoder_lock:
+            return bytes(encode(*args))
+
+    def __response_length(self, response_bytes, responses=1):
+        """
+        Get the number of bytes to read for consecutive responses, CRC bytes included.
+        :param response_bytes: length of one response, CRC byte excluded
+        :type response_bytes: int
+        :param responses: number of responses
+        :type responses: int
+        :return: number of bytes
+        :rtype: int
+        """
+        if response_bytes and self.__encoder.response_crc:
+            response_bytes += 1
+        return response_bytes * responses
+
+    def __verify(self, response, response_bytes):
         """
-        self.__connection.write(bytes_array)
+        Verify and strip the response CRC bytes, if the controller appends them.
+        :param response: received bytes
+        :type response: bytes
+        :param response_bytes: length of one response, CRC byte excluded
+        :type response_bytes: int
+        :return: responses
+        :rtype: bytes
+        :raises CrcError: a response failed its CRC check
+        """
+        if response_bytes and self.__encoder.response_crc:
+            return verify_responses(response, response_bytes)
+        return response
 
     @__connection_required  # noqa
-    def __receive_bytes(self, expected_bytes=1):
+    def __exchange(self, bytes_array, expected_bytes=0, command=None, frames=1, timeout=None):
         """
-        Read bytes from the board.
+        Send specified bytes to the board and read the response as one exchange on the bus.
+        :param bytes_array: bytes array to be sent
+        :type bytes_array: bytes or bytearray
         :param expected_bytes: number of expected bytes
         :type expected_bytes: int
+        :param command: command the bytes were encoded for
+        :type command: Commands
+        :param frames: number of frames in bytes_array
+        :type frames: int
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
         :return: received bytes
-        :rtype: bytearray
-        """
-        return self.__connection.read(expected_bytes)
+        :rtype: bytes
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        if timeout is None:
+            timeout = self.__timeout
+        exchange = self.__bus.exchange
+        if self.__threaded:
+            exchange = functools.partial(self.__bus.worker.exchange, device_number=self.__device_number)
+        if self.__keepalive is None:
+            return exchange(bytes_array, expected_bytes, command, self.__instrumentation, frames, timeout)
+        try:
+            return exchange(bytes_array, expected_bytes, command, self.__instrumentation, frames, timeout)
+        finally:
+            self.__last_sent = time.monotonic()
 
     @property
     def com_port(self):
@@ -187,11 +333,48 @@ class PololuMotorController:
     @property
     def connected(self):
         """
-        Get connected status.
+        Get connected status. A lazy controller is not connected before its first use.
         :return: connected
         :rtype: bool
         """
-        return self.__connected
+        return self.__bus is not None and self.__bus.connected
+
+    @property
+    def instrumentation(self):
+        """
+        Get instrumentation.
+        :return: instrumentation every exchange is recorded to, None if disabled
+        :rtype: Instrumentation
+        """
+        return self.__instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, instrumentation):
+        """
+        Enable (or disable, with None) instrumentation.
+        :param instrumentation: instrumentation every exchange is recorded to
+        :type instrumentation: Instrumentation
+        :return: None
+        """
+        self.__instrumentation = instrumentation
+
+    @property
+    def timeout(self):
+        """
+        Get default response timeout.
+        :return: timeout, in seconds; None waits forever
+        :rtype: float
+        """
+        return self.__timeout
+
+    @property
+    def bus(self):
+        """
+        Get bus. The private bus of a lazy controller is opened here if not yet open.
+        :return: bus the controller is connected through
+        :rtype: PololuBus
+        """
+        return self.__open()
 
     @property
     def device_number(self):
@@ -202,6 +385,33 @@ class PololuMotorController:
         """
         return self.__device_number
 
+    @property
+    def protocol(self):
+        """
+        Get protocol.
+        :return: protocol
+        :rtype: Protocols
+        """
+        return self.__encoder.protocol
+
+    @property
+    def crc(self):
+        """
+        Get CRC mode.
+        :return: CRC mode
+        :rtype: CrcModes
+        """
+        return self.__encoder.crc
+
+    @property
+    def resolution(self):
+        """
+        Get speed command resolution policy.
+        :return: resolution policy
+        :rtype: Resolutions
+        """
+        return self.__resolution
+
     @property
     def device_number_hex(self):
         """
@@ -211,6 +421,81 @@ class PololuMotorController:
         """
         return hex(self.__device_number)
 
+    @property
+    def last_sent(self):
+        """
+        Get time of the last exchange, tracked while a keepalive is running.
+        :return: time.monotonic() timestamp, None if not tracked yet
+        :rtype: float
+        """
+        return self.__last_sent
+
+    @property
+    def error_status(self):
+        """
+        Get ERROR_STATUS as last read (by any read including it, e.g. a keepalive), without reading it.
+        :return: value and time.monotonic() timestamp of the read, None if never read
+        :rtype: tuple
+        """
+        return self.__error_status
+
+    @property
+    def keepalive(self):
+        """
+        Get keepalive scheduler.
+        :return: running keepalive scheduler, None if not running
+        :rtype: KeepaliveScheduler
+        """
+        return self.__keepalive
+
+    @property
+    def threaded(self):
+        """
+        Get thread-safe mode.
+        :return: True if exchanges go through the bus I/O worker
+        :rtype: bool
+        """
+        return self.__threaded
+
+    @property
+    def cache(self):
+        """
+        Get variable cache.
+        :return: cache, None if disabled
+        :rtype: VariableCache
+        """
+        return self.__cache
+
+    @property
+    def device_info(self):
+        """
+        Get firmware version and product id, read from the board on first request (see handshake()).
+        :return: firmware version and product id
+        :rtype: dict
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        if self.__device_info is None:
+            self.handshake()
+        return self.__device_info
+
+    @property
+    def product_id(self):
+        """
+        Get product id, read from the board on first request.
+        :return: product id
+        :rtype: str
+        """
+        return self.device_info.get('product_id', 'N/A')
+
+    @property
+    def firmware_version(self):
+        """
+        Get firmware version, read from the board on first request.
+        :return: firmware version
+        :rtype: str
+        """
+        return self.device_info.get('firmware_version', 'N/A')
+
     @property
     def commands(self):
         """
@@ -235,16 +520,72 @@ class PololuMotorController:
         return normalized
 
     @__connection_required  # noqa
-    def get_firmware_version(self):
+    def get_firmware_version(self, timeout=None):
         """
-        Get firmware version (and product id).
+        Get firmware version (and product id). With a cache, it is read from the board once.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
         :return: firmware version and product id
         :rtype: dict
+        :raises ResponseTimeoutError: the response was not received in time
         """
-        sent, response = self.send_command(self.commands.get_firmware_version)
+        if self.__cache is None:
+            return self.__read_firmware_version(timeout)
+        if self.__device_info is None:
+            self.__device_info = self.__read_firmware_version(timeout)
+        return dict(self.__device_info)
+
+    def __read_firmware_version(self, timeout=None):
+        """
+        Read firmware version (and product id) from the board.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: firmware version and product id
+        :rtype: dict
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        sent, response = self.send_command(self.commands.get_firmware_version, timeout)
         response = self.__normalize_response(response, self.commands.get_firmware_version)
         return response
 
+    def handshake(self, timeout=None):
+        """
+        Open the connection if needed, check that the board answers and cache its firmware version and product id.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: firmware version and product id
+        :rtype: dict
+        :raises ResponseTimeoutError: the board did not answer in time
+        """
+        self.__device_info = self.__read_firmware_version(timeout)
+        return self.__device_info
+
+    def start_keepalive(self, serial_timeout, lead=DEFAULT_LEAD):
+        """
+        Keep the serial timeout configured on the board from expiring while the link is idle: a Get Variable
+        ERROR_STATUS is sent only when nothing was sent to the board for (1 - lead) * serial_timeout.
+        :param serial_timeout: serial timeout configured on the board, in seconds
+        :type serial_timeout: float
+        :param lead: fraction of the serial timeout left when the keepalive is sent (0, 1)
+        :type lead: float
+        :return: scheduler
+        :rtype: KeepaliveScheduler
+        """
+        self.stop_keepalive()
+        self.__last_sent = time.monotonic()
+        self.__keepalive = KeepaliveScheduler(self, serial_timeout, lead)
+        self.__keepalive.start()
+        return self.__keepalive
+
+    def stop_keepalive(self):
+        """
+        Stop the keepalive scheduler, if running.
+        :return: None
+        """
+        keepalive, self.__keepalive = self.__keepalive, None
+        if keepalive is not None:
+            keepalive.stop()
+
     @__connection_required  # noqa
     def exit_safe_start(self):
         """
@@ -258,35 +599,48 @@ class PololuMotorController:
     def motor_forward(self, speed):
         """
         Motor Forward. Description available within command definition.
+        The 7-bit variant of the command is sent instead when the resolution policy allows it.
         :param speed: desired speed [0-3200]
         :type speed: int
         :return: None
         """
-        speed_byte_1 = speed & 0x1F  # as specified in documentation
-        speed_byte_2 = speed >> 5  # as specified in documentation
-
-        motor_forward_command = self.commands.motor_forward.value
-        motor_forward_command.set_payload_byte(3, speed_byte_1)
-        motor_forward_command.set_payload_byte(4, speed_byte_2)
-
-        self.send_command(self.commands.motor_forward)  # no response expected
+        if use_low_resolution(speed, self.__resolution):
+            command = self.commands.motor_forward_low_resolution
+            frame = self.__encode(self.__encoder.motor_forward_low_resolution, speed)
+        else:
+            command = self.commands.motor_forward
+            frame = self.__encode(self.__encoder.motor_forward, speed)
+        self.__send_frame(command, frame)  # no response expected
 
     @__connection_required  # noqa
     def motor_reverse(self, speed):
         """
         Motor Reverse. Description available within command definition.
+        The 7-bit variant of the command is sent instead when the resolution policy allows it.
         :param speed: desired speed [0-3200]
         :type speed: int
         :return: None
         """
-        speed_byte_1 = speed & 0x1F  # as specified in documentation
-        speed_byte_2 = speed >> 5  # as specified in documentation
-
-        motor_forward_command = self.commands.motor_reverse.value
-        motor_forward_command.set_payload_byte(3, speed_byte_1)
-        motor_forward_command.set_payload_byte(4, speed_byte_2)
+        if use_low_resolution(speed, self.__resolution):
+            command = self.commands.motor_reverse_low_resolution
+            frame = self.__encode(self.__encoder.motor_reverse_low_resolution, speed)
+        else:
+            command = self.commands.motor_reverse
+            frame = self.__encode(self.__encoder.motor_reverse, speed)
+        self.__send_frame(command, frame)  # no response expected
 
-        self.send_command(self.commands.motor_reverse)  # no response expected
+    @__connection_required  # noqa
+    def set_speed(self, speed):
+        """
+        Set signed motor speed: Motor Forward for positive speeds, Motor Reverse for negative ones.
+        :param speed: desired speed [-3200, 3200]
+        :type speed: int
+        :return: None
+        """
+        if speed < 0:
+            self.motor_reverse(-speed)
+        else:
+            self.motor_forward(speed)
 
     @__connection_required  # noqa
     def motor_brake(self, brake_amount=1):
@@ -296,10 +650,8 @@ class PololuMotorController:
         :type brake_amount: int
         :return: None
         """
-        motor_forward_command = self.commands.motor_forward.value
-        motor_forward_command.set_payload_byte(3, brake_amount)
-
-        self.send_command(self.commands.motor_brake)  # no response expected
+        frame = self.__encode(self.__encoder.motor_brake, brake_amount)
+        self.__send_frame(self.commands.motor_brake, frame)  # no response expected
 
     @__connection_required  # noqa
     def stop_motor(self):
@@ -311,33 +663,281 @@ class PololuMotorController:
         self.send_command(self.commands.stop_motor)  # no response expected
 
     @__connection_required  # noqa
-    def get_input_voltage(self):
+    def read_variables(self, variables, timeout=None, live=False):
+        """
+        Read several variables in a single exchange. All Get Variable requests are written to the board as one
+        buffer and all responses are read back with one read, so reading N variables costs about one round trip
+        instead of N. With a cache, fresh cached values are served from it and only the misses are read.
+        :param variables: variables to be read
+        :type variables: iterable of Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :param live: read every variable from the board, bypassing the cache (the results are still cached)
+        :type live: bool
+        :return: raw 16-bit values keyed by variable, signed variables decoded as such
+        :rtype: dict
+        :raises ResponseTimeoutError: the response was not received in time
+        :raises CrcError: a response failed its CRC check
+        """
+        variables = list(dict.fromkeys(variables))  # drop duplicates, keep order
+        if not variables:
+            return {}
+
+        cache = self.__cache
+        if cache is None:
+            return self.__read_variables(variables, timeout)
+        if live:
+            values = self.__read_variables(variables, timeout)
+            cache.store(values)
+            return values
+
+        values, misses = cache.lookup(variables)
+        if misses:
+            read = self.__read_variables(misses, timeout)
+            cache.store(read)
+            values.update(read)
+        return {variable: values[variable] for variable in variables}
+
+    def __read_variables(self, variables, timeout=None):
+        """
+        Read variables from the board in a single exchange.
+        :param variables: variables to be read, without duplicates
+        :type variables: list of Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: raw 16-bit values keyed by variable, signed variables decoded as such
+        :rtype: dict
+        :raises ResponseTimeoutError: the response was not received in time
+        :raises CrcError: a response failed its CRC check
+        """
+        response = self.__exchange(
+            self.__encode(self.__encoder.get_variables, variables),
+            self.__response_length(VARIABLE_RESPONSE_BYTES, len(variables)),
+            self.commands.get_variable,
+            len(variables),
+            timeout,
+        )
+        return self.__decode_variables(variables, response)
+
+    def __decode_variables(self, variables, response):
+        """
+        Verify and decode Get Variable responses, refreshing the cached error status.
+        :param variables: requested variables, in request order
+        :type variables: list of Variables
+        :param response: received bytes
+        :type response: bytes
+        :return: raw 16-bit values keyed by variable, signed variables decoded as such
+        :rtype: dict
+        :raises CrcError: a response failed its CRC check
+        """
+        values = decode_variables(variables, self.__verify(response, VARIABLE_RESPONSE_BYTES))
+        error_status = values.get(Variables.ERROR_STATUS)
+        if error_status is not None:
+            self.__error_status = (error_status, time.monotonic())
+        return values
+
+    @__connection_required  # noqa
+    def submit_read_variables(self, variables, timeout=None):
+        """
+        Queue a pipelined read of several variables to the bus I/O worker without waiting for it. Always read from the
+        board; the results are still cached.
+        :param variables: variables to be read
+        :type variables: iterable of Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: future receiving the raw values keyed by variable
+        :rtype: concurrent.futures.Future
+        """
+        variables = list(dict.fromkeys(variables))  # drop duplicates, keep order
+        with self.__encoder_lock:
+            frame = bytes(self.__encoder.get_variables(variables))
+        response = self.__bus.worker.submit(
+            frame,
+            self.__response_length(VARIABLE_RESPONSE_BYTES, len(variables)),
+            self.commands.get_variable,
+            self.__instrumentation,
+            len(variables),
+            self.__timeout if timeout is None else timeout,
+            self.__device_number,
+        )
+        future = concurrent.futures.Future()
+
+        def decode(done):
+            """
+            Decode the response, worker side.
+            """
+            try:
+                values = self.__decode_variables(variables, done.result())
+                if self.__cache is not None:
+                    self.__cache.store(values)
+            except Exception as exception:
+                future.set_exception(exception)
+            else:
+                future.set_result(values)
+
+        response.add_done_callback(decode)
+        return future
+
+    @__connection_required  # noqa
+    def get_variable(self, variable, timeout=None):
+        """
+        Get variable.
+        :param variable: variable to be read
+        :type variable: Variables
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: raw 16-bit value, signed variables decoded as such
+        :rtype: int
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        return self.read_variables((variable, ), timeout)[variable]
+
+    @__connection_required  # noqa
+    def get_input_voltage(self, timeout=None):
         """
         Get input voltage.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
         :return: input voltage in mV
         :rtype: int
+        :raises ResponseTimeoutError: the response was not received in time
         """
-        get_variable_command = self.commands.get_variable.value
-        get_variable_command.set_payload_byte(VARIABLE_ID_BYTE_INDEX, Variables.INPUT_VOLTAGE.value)
-
-        sent, response = self.send_command(self.commands.get_variable)
-        voltage_mv = int.from_bytes(bytes=response, byteorder='little')
+        voltage_mv = self.get_variable(Variables.INPUT_VOLTAGE, timeout)
         return voltage_mv
 
     @__connection_required  # noqa
-    def get_temperature(self):
+    def get_temperature(self, timeout=None):
         """
         Get temperature.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
         :return: board temperature as measured by a temperature sensor near the motor driver
         :rtype: float
+        :raises ResponseTimeoutError: the response was not received in time
         """
-        get_variable_command = self.commands.get_variable.value
-        get_variable_command.set_payload_byte(VARIABLE_ID_BYTE_INDEX, Variables.TEMPERATURE.value)
-
-        sent, response = self.send_command(self.commands.get_variable)
-        temperature = int.from_bytes(bytes=response, byteorder='little') / 10
+        temperature = scale_value(Variables.TEMPERATURE, self.get_variable(Variables.TEMPERATURE, timeout))
         return temperature
 
+    @__connection_required  # noqa
+    def get_system_time(self, timeout=None):
+        """
+        Get system time: both 16-bit halves are read in a single exchange.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: milliseconds since the last reset or power-up, modulo 2^32
+        :rtype: int
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        values = self.read_variables((Variables.SYSTEM_TIME_LOW, Variables.SYSTEM_TIME_HIGH), timeout)
+        return combine_values(values)[Variables.SYSTEM_TIME_LOW]
+
+    @__connection_required  # noqa
+    def set_motor_limit(self, limit, value, timeout=None):
+        """
+        Set Motor Limit. Description available within command definition.
+        :param limit: limit
+        :type limit: MotorLimits
+        :param value: limit value; brake durations in units of 4 ms
+        :type value: int
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: None
+        :raises MotorLimitError: the limit conflicts with the Hard Motor Limit settings
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        self.__set_motor_limits({limit: value}, timeout)
+
+    @__connection_required  # noqa
+    def read_motor_limits(self, timeout=None):
+        """
+        Read every temporary motor limit in a single exchange.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: limits, in Set Motor Limit units (brake durations in units of 4 ms)
+        :rtype: MotorLimitProfile
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        values = self.read_variables(LIMIT_VARIABLES.values(), timeout)
+        return MotorLimitProfile(*(limit_value(limit, values[variable]) for limit, variable in LIMIT_VARIABLES.items()))
+
+    @__connection_required  # noqa
+    def configure_motor_limits(self, profile, timeout=None):
+        """
+        Apply a limit profile: the current limits are read in a single exchange, and only the Set Motor Limit frames of
+        the limits that differ are sent, as one buffer, their responses read back with one read.
+        :param profile: limits to be set; None values are left unchanged
+        :type profile: MotorLimitProfile
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: values sent keyed by limit, empty if the device already matched the profile
+        :rtype: dict
+        :raises MotorLimitError: limits conflict with the Hard Motor Limit settings (the other limits are set)
+        :raises ResponseTimeoutError: a response was not received in time
+        """
+        target = profile_limits(profile)
+        variables = [LIMIT_VARIABLES[limit] for limit in target]
+        values = self.read_variables(variables, timeout, live=True)  # diffed against the device, never the cache
+        current = {limit: limit_value(limit, values[LIMIT_VARIABLES[limit]]) for limit in target}
+
+        changes = limit_changes(current, target)
+        if changes:
+            self.__set_motor_limits(changes, timeout)
+        return changes
+
+    def __set_motor_limits(self, limits, timeout=None):
+        """
+        Send Set Motor Limit frames as one buffer and check their responses.
+        :param limits: values keyed by limit
+        :type limits: dict
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: None
+        :raises MotorLimitError: limits conflict with the Hard Motor Limit settings
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        command = self.commands.set_motor_limit
+        try:
+            response = self.__exchange(
+                self.__encode(self.__encoder.set_motor_limits, limits),
+                self.__response_length(MOTOR_LIMIT_RESPONSE_BYTES, len(limits)),
+                command,
+                len(limits),
+                timeout,
+            )
+        finally:
+            if self.__cache is not None:
+                self.__cache.command_sent(command)
+        response = self.__verify(response, MOTOR_LIMIT_RESPONSE_BYTES)
+
+        conflicts = {limit: LimitConflicts(code) for limit, code in zip(limits, response) if code}
+        if conflicts:
+            raise MotorLimitError(f'Motor limits conflicting with the hard motor limits: {conflicts}!', conflicts)
+        if self.__cache is not None:
+            self.__cache.store({
+                LIMIT_VARIABLES[direction]: value
+                for limit, value in limits.items()
+                for direction in BOTH_DIRECTIONS.get(limit, (limit, ))
+            })
+
+    @__connection_required  # noqa
+    def check_serial_errors(self, timeout=None):
+        """
+        Read (and thereby clear) the serial errors latched by the board since the last check.
+        With CRC enabled, frames failing their CRC check are ignored by the board: this is where they show up.
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        :return: serial errors occurred since the last check: none
+        :rtype: SerialErrors
+        :raises SerialCrcError: the board received frames failing their CRC check
+        :raises SerialError: the board reported other serial errors
+        """
+        errors = SerialErrors(self.get_variable(Variables.SERIAL_ERRORS_OCCURRED, timeout))
+        if errors & SerialErrors.CRC:
+            raise SerialCrcError(f'Frames ignored by the board: {errors!r}!', errors=errors)
+        if errors:
+            raise SerialError(f'Serial errors reported by the board: {errors!r}!', errors=errors)
+        return errors
+
 
 def test():
     """
@@ -0,0 +1,695 @@
+# Simple Motor Controller emulator
+# Protocol-accurate, in-process stand-in for a Simple Motor Controller in Serial/USB input mode. It parses Pololu and
+# compact protocol frames (optionally CRC-7 protected), keeps a variable table matching Variables, models safe-start,
+# speed ramping and braking, answers Get Variable and Get Firmware Version requests and applies Set Motor Limit
+# against configurable hard motor limits. It can be used behind a
+# controller either as a pyserial compatible object (EmulatedSerial) or through a pseudo terminal (EmulatorPty, POSIX
+# only).
+
+# https://www.pololu.com/docs/0J44/6
+import collections
+import os
+import threading
+import time
+
+
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, crc7
+from pololu_motor_controller.utils.pololu_protocol.limits import (
+    BOTH_DIRECTIONS,
+    BRAKE_DURATION_UNIT,
+    LIMIT_VARIABLES,
+    LimitConflicts,
+
+    is_brake_duration,
+)
+from pololu_motor_controller.utils.pololu_protocol.variables import ErrorStatus, LimitStatus, SerialErrors, Variables
+from pololu_motor_controller.utils.pololu_protocol.frames import (
+    LOW_RESOLUTION_SPEED_STEP,
+    MAX_BRAKE_AMOUNT,
+    MAX_LOW_RESOLUTION_SPEED,
+    MAX_SPEED,
+)
+from pololu_motor_controller.utils.pololu_protocol.commands import (
+    BAUD_RATE_SYNC_BYTE,
+    COMMAND_DATA_BYTES,
+    COMPACT_COMMAND_FLAG,
+
+    Commands,
+)
+
+
+PRODUCT_ID = 0x9A  # Simple High-Power Motor Controller 24v12
+FIRMWARE_VERSION = (0x01, 0x04)  # major, minor (BCD)
+
+BITS_PER_BYTE = 10  # start bit, 8 data bits, stop bit
+SPEED_UPDATE_PERIOD = 0.001  # seconds; acceleration and deceleration limits are expressed per update period
+BAUD_RATE_REGISTER_CLOCK = 72000000
+
+COMMAND_BYTES = {command.value.payload[0]: command for command in Commands}
+VARIABLE_IDS = {variable.value: variable for variable in Variables}
+LIMIT_IDS = {limit.value: limit for limit in (*BOTH_DIRECTIONS, *LIMIT_VARIABLES)}
+
+
+class SimpleMotorControllerEmulator:
+    """
+    SimpleMotorControllerEmulator
+    Device model: protocol parser, variable table and motor state. Thread-safe.
+    """
+    def __init__(self, device_number=0x0D, input_voltage=24000, temperature=25.0, max_acceleration=0,
+                 max_deceleration=0, baud_rate=115200, crc=CrcModes.DISABLED):
+        """
+        Initializer
+        :param device_number: device number
+        :type device_number: int
+        :param input_voltage: reported input voltage, in mV
+        :type input_voltage: int
+        :param temperature: reported temperature, in °C
+        :type temperature: float
+        :param max_acceleration: speed increase per update period (1 ms) in both directions; 0 means no limit
+        :type max_acceleration: int
+        :param max_deceleration: speed decrease per update period (1 ms) in both directions; 0 means no limit
+        :type max_deceleration: int
+        :param baud_rate: reported baud rate
+        :type baud_rate: int
+        :param crc: CRC mode: frames without a valid CRC byte are ignored and reported as CRC errors
+        :type crc: CrcModes
+        """
+        self.__lock = threading.RLock()
+        self.__device_number = device_number
+        self.__crc = crc
+        self.__started = time.monotonic()
+        self.__updated = self.__started
+
+        self.__received = bytearray()
+
+        self.__variables = {variable: 0 for variable in Variables}
+        self.__variables[Variables.ERROR_STATUS] = ErrorStatus.SAFE_START_VIOLATION
+        self.__variables[Variables.ERRORS_OCCURRED] = ErrorStatus.SAFE_START_VIOLATION
+        self.__variables[Variables.LIMIT_STATUS] = LimitStatus.MOTOR_NOT_ALLOWED_TO_RUN
+        self.__variables[Variables.RESET_FLAGS] = 0x0C  # power-on reset
+        self.__variables[Variables.INPUT_VOLTAGE] = input_voltage
+        self.__variables[Variables.TEMPERATURE] = int(round(temperature * 10))
+        self.__variables[Variables.BRAKE_AMOUNT] = MAX_BRAKE_AMOUNT
+        self.__variables[Variables.BAUD_RATE_REGISTER] = BAUD_RATE_REGISTER_CLOCK // baud_rate
+        for variable in (Variables.MAX_SPEED_FORWARD, Variables.MAX_SPEED_REVERSE):
+            self.__variables[variable] = MAX_SPEED
+        for variable in (Variables.MAX_ACCELERATION_FORWARD, Variables.MAX_ACCELERATION_REVERSE):
+            self.__variables[variable] = max_acceleration
+        for variable in (Variables.MAX_DECELERATION_FORWARD, Variables.MAX_DECELERATION_REVERSE):
+            self.__variables[variable] = max_deceleration
+
+        # hard motor limits (settings): temporary limits cannot be looser
+        self.__hard_limits = {variable: self.__variables[variable] for variable in LIMIT_VARIABLES.values()}
+
+        self.__frames = 0
+
+    # state
+    # ==================================================================================================================
+    def __set_error(self, error):
+        """
+        Set a stopping error: the motor stops and stays stopped until the error is cleared.
+        :param error: ERROR_STATUS bit
+        :type error: ErrorStatus
+        :return: None
+        """
+        self.__variables[Variables.ERROR_STATUS] |= error
+        self.__variables[Variables.ERRORS_OCCURRED] |= error
+        self.__variables[Variables.SPEED] = 0
+
+    def __serial_error(self, error):
+        """
+        Report a serial error.
+        :param error: SERIAL_ERRORS_OCCURRED bit
+        :type error: SerialErrors
+        :return: None
+        """
+        self.__variables[Variables.SERIAL_ERRORS_OCCURRED] |= error
+        self.__set_error(ErrorStatus.SERIAL_ERROR)
+
+    def update(self, now=None):
+        """
+        Advance the motor model (speed ramping, system time) up to now.
+        :param now: time.monotonic() timestamp; current time if None
+        :type now: float
+        :return: None
+        """
+        with self.__lock:
+            if now is None:
+                now = time.monotonic()
+            variables = self.__variables
+
+            system_time = int((now - self.__started) * 1000) & 0xFFFFFFFF
+            variables[Variables.SYSTEM_TIME_LOW] = system_time & 0xFFFF
+            variables[Variables.SYSTEM_TIME_HIGH] = system_time >> 16
+
+            periods = int((now - self.__updated) / SPEED_UPDATE_PERIOD)
+            if periods <= 0:
+                return
+            self.__updated += periods * SPEED_UPDATE_PERIOD
+
+            limiting = 0
+            speed = variables[Variables.SPEED]
+            target = variables[Variables.TARGET_SPEED]
+            if variables[Variables.ERROR_STATUS]:
+                speed = 0
+                limiting = LimitStatus.MOTOR_NOT_ALLOWED_TO_RUN
+            elif speed != target:
+                if speed == 0 or (speed > 0) == (target > 0) and abs(target) > abs(speed):
+                    goal = target
+                    step = variables[
+                        Variables.MAX_ACCELERATION_FORWARD if target > 0 else Variables.MAX_ACCELERATION_REVERSE
+                    ]
+                else:
+                    goal = target if target == 0 or (speed > 0) == (target > 0) else 0  # stop before reversing
+                    step = variables[
+                        Variables.MAX_DECELERATION_FORWARD if speed > 0 else Variables.MAX_DECELERATION_REVERSE
+                    ]
+                if step and abs(goal - speed) > step * periods:
+                    speed += step * periods if goal > speed else -step * periods
+                    limiting = LimitStatus.ACCELERATION_LIMIT
+                else:
+                    speed = goal
+            variables[Variables.SPEED] = speed
+            variables[Variables.LIMIT_STATUS] = limiting
+
+            # brake amount is reported as 0xFF while the motor is running
+            if speed:
+                variables[Variables.BRAKE_AMOUNT] = 0xFF
+            elif variables[Variables.BRAKE_AMOUNT] == 0xFF:
+                variables[Variables.BRAKE_AMOUNT] = MAX_BRAKE_AMOUNT
+    # ==================================================================================================================
+
+    # protocol
+    # ==================================================================================================================
+    def feed(self, data, now=None):
+        """
+        Process received bytes.
+        :param data: bytes received from the host
+        :type data: bytes or bytearray
+        :param now: reception time (time.monotonic); current time if None
+        :type now: float
+        :return: response bytes
+        :rtype: bytes
+        """
+        with self.__lock:
+            self.update(now)
+            self.__received += data
+            response = bytearray()
+            while True:
+                frame = self.__next_frame()
+                if frame is None:
+                    break
+                command_byte, data_bytes = frame
+                frame_response = self.__execute(command_byte, data_bytes)
+                if frame_response and self.__crc is CrcModes.COMMANDS_AND_RESPONSES:
+                    frame_response += bytes([crc7(frame_response)])
+                response += frame_response
+            return bytes(response)
+
+    def __next_frame(self):
+        """
+        Take the next complete frame addressed to this device from the received bytes.
+        :return: command byte and data bytes; None if no complete frame is available
+        :rtype: tuple
+        """
+        received = self.__received
+        while received:
+            first = received[0]
+            if first == BAUD_RATE_SYNC_BYTE:
+                header = 2  # 0xAA, device number
+                if len(received) < 3:
+                    return None
+                device_number, command_byte = received[1], received[2]
+                if device_number & COMPACT_COMMAND_FLAG or command_byte & COMPACT_COMMAND_FLAG:
+                    del received[:1]
+                    self.__serial_error(SerialErrors.FORMAT)
+                    continue
+            elif first & COMPACT_COMMAND_FLAG:
+                header = 0
+                device_number, command_byte = self.__device_number, first & ~COMPACT_COMMAND_FLAG
+            else:
+                del received[:1]  # data byte without a command byte
+                self.__serial_error(SerialErrors.FORMAT)
+                continue
+
+            data_length = COMMAND_DATA_BYTES.get(command_byte)
+            if data_length is None:
+                del received[:header + 1]
+                if device_number == self.__device_number:
+                    self.__serial_error(SerialErrors.FORMAT)
+                continue
+
+            frame_length = header + 1 + data_length
+            crc_length = 0 if self.__crc is CrcModes.DISABLED else 1
+            if len(received) < frame_length + crc_length:
+                return None
+            data_bytes = bytes(received[header + 1:frame_length])
+            crc_valid = not crc_length or crc7(received, frame_length) == received[frame_length]
+            del received[:frame_length + crc_length]
+
+            if not crc_valid:
+                self.__serial_error(SerialErrors.CRC)  # the frame is ignored
+                continue
+
+            if any(byte & COMPACT_COMMAND_FLAG for byte in data_bytes):
+                if device_number == self.__device_number:
+                    self.__serial_error(SerialErrors.FORMAT)
+                continue
+            if device_number != self.__device_number:
+                continue  # addressed to another device on the line
+
+            self.__frames += 1
+            return command_byte, data_bytes
+        return None
+
+    def __execute(self, command_byte, data_bytes):
+        """
+        Execute a command.
+        :param command_byte: command byte, MSB cleared
+        :type command_byte: int
+        :param data_bytes: data bytes
+        :type data_bytes: bytes
+        :return: response bytes
+        :rtype: bytes
+        """
+        variables = self.__variables
+        command = COMMAND_BYTES[command_byte]
+
+        if command is Commands.get_firmware_version:
+            major, minor = FIRMWARE_VERSION
+            return bytes([PRODUCT_ID & 0xFF, PRODUCT_ID >> 8, minor, major])
+
+        if command is Commands.get_variable:
+            variable = VARIABLE_IDS.get(data_bytes[0])
+            if variable is None:
+                self.__serial_error(SerialErrors.FORMAT)
+                return b''  # no response, as specified in documentation
+            value = variables[variable] & 0xFFFF
+            if variable in (Variables.ERRORS_OCCURRED, Variables.SERIAL_ERRORS_OCCURRED):
+                variables[variable] = 0  # cleared when read
+            return value.to_bytes(2, byteorder='little')
+
+        if command is Commands.set_motor_limit:
+            limit = LIMIT_IDS.get(data_bytes[0])
+            if limit is None:
+                self.__serial_error(SerialErrors.FORMAT)
+                return b''
+            return bytes([self.__set_motor_limit(limit, data_bytes[1] + (data_bytes[2] << 7))])
+
+        if command is Commands.exit_safe_start:
+            variables[Variables.ERROR_STATUS] &= ~(ErrorStatus.SAFE_START_VIOLATION | ErrorStatus.SERIAL_ERROR)
+        elif command is Commands.stop_motor:
+            variables[Variables.TARGET_SPEED] = 0
+            self.__set_error(ErrorStatus.SAFE_START_VIOLATION)
+        elif command is Commands.motor_brake:
+            brake_amount = data_bytes[0]
+            if brake_amount > MAX_BRAKE_AMOUNT:
+                self.__serial_error(SerialErrors.FORMAT)
+            else:
+                variables[Variables.TARGET_SPEED] = 0
+                variables[Variables.SPEED] = 0
+                variables[Variables.BRAKE_AMOUNT] = brake_amount
+        else:
+            if command in (Commands.motor_forward, Commands.motor_reverse):
+                speed = data_bytes[0] + (data_bytes[1] << 5)
+            elif data_bytes[0] == MAX_LOW_RESOLUTION_SPEED:
+                speed = MAX_SPEED
+            else:
+                speed = data_bytes[0] * LOW_RESOLUTION_SPEED_STEP
+
+            if speed > MAX_SPEED:
+                self.__serial_error(SerialErrors.FORMAT)
+            else:
+                forward = command in (Commands.motor_forward, Commands.motor_forward_low_resolution)
+                if forward:
+                    speed = min(speed, variables[Variables.MAX_SPEED_FORWARD])
+                else:
+                    speed = -min(speed, variables[Variables.MAX_SPEED_REVERSE])
+                variables[Variables.TARGET_SPEED] = speed
+        return b''
+
+    def __set_motor_limit(self, limit, value):
+        """
+        Set a temporary motor limit, bounded by the hard motor limit.
+        :param limit: limit
+        :type limit: MotorLimits
+        :param value: requested value; brake durations in units of 4 ms
+        :type value: int
+        :return: Set Motor Limit response
+        :rtype: LimitConflicts
+        """
+        conflicts = LimitConflicts(0)
+        for direction in BOTH_DIRECTIONS.get(limit, (limit, )):
+            variable = LIMIT_VARIABLES[direction]
+            hard = self.__hard_limits[variable]
+            requested = value
+            if is_brake_duration(direction):
+                requested = value * BRAKE_DURATION_UNIT  # reported in ms
+                allowed = max(requested, hard)  # braking cannot be shorter
+            elif direction.name.startswith('MAX_SPEED'):
+                allowed = min(requested, hard)
+            else:
+                allowed = min(requested, hard) if requested and hard else requested or hard  # 0 means no limit
+            self.__variables[variable] = allowed
+            if allowed != requested:
+                conflicts |= LimitConflicts.FORWARD if direction.name.endswith('FORWARD') else LimitConflicts.REVERSE
+        return conflicts
+    # ==================================================================================================================
+
+    def set_hard_limit(self, variable, value):
+        """
+        Set a hard motor limit (as configured in the settings), also applied to the temporary limit.
+        :param variable: Temporary Motor Limits variable
+        :type variable: Variables
+        :param value: limit value, as reported by Get Variable (brake durations in ms)
+        :type value: int
+        :return: None
+        """
+        with self.__lock:
+            self.__hard_limits[variable] = value
+            self.__variables[variable] = value
+
+    def get_variable(self, variable):
+        """
+        Get variable, as it would be reported (without clearing latched flags).
+        :param variable: variable
+        :type variable: Variables
+        :return: value
+        :rtype: int
+        """
+        with self.__lock:
+            self.update()
+            return self.__variables[variable]
+
+    def set_variable(self, variable, value):
+        """
+        Set variable, e.g. to inject input voltage, temperature or errors.
+        :param variable: variable
+        :type variable: Variables
+        :param value: value
+        :type value: int
+        :return: None
+        """
+        with self.__lock:
+            self.__variables[variable] = value
+
+    @property
+    def device_number(self):
+        """
+        Get device number.
+        :return: device number
+        :rtype: int
+        """
+        return self.__device_number
+
+    @property
+    def crc(self):
+        """
+        Get CRC mode.
+        :return: CRC mode
+        :rtype: CrcModes
+        """
+        return self.__crc
+
+    @property
+    def frames(self):
+        """
+        Get number of frames executed.
+        :return: frames
+        :rtype: int
+        """
+        return self.__frames
+
+
+def feed_devices(devices, data, now=None):
+    """
+    Feed bytes written to the line to every device, frame by frame, so the responses come back in the order the frames
+    were written whatever the order of the devices. A frame starts at every byte with its MSB set (0xAA or a compact
+    command byte); data and CRC bytes never have it.
+    :param devices: emulated devices on the line
+    :type devices: list of SimpleMotorControllerEmulator
+    :param data: bytes written to the line
+    :type data: bytes or bytearray
+    :param now: reception time (time.monotonic); current time if None
+    :type now: float
+    :return: response bytes
+    :rtype: bytes
+    """
+    starts = [index for index, byte in enumerate(data) if byte & COMPACT_COMMAND_FLAG]
+    if not starts or starts[0]:
+        starts.insert(0, 0)  # end of a frame split across writes
+    response = bytearray()
+    for start, end in zip(starts, starts[1:] + [len(data)]):
+        chunk = data[start:end]
+        for device in devices:
+            response += device.feed(chunk, now)
+    return bytes(response)
+
+
+class EmulatedSerial:
+    """
+    EmulatedSerial
+    pyserial compatible port connected to one or more emulated devices (daisy chain). Frames and responses take the
+    time they would take on the wire at the configured baud rate, plus the injected response latency.
+    """
+    def __init__(self, devices=None, baudrate=115200, timeout=None, latency=0.0, simulate_timing=True):
+        """
+        Initializer
+        :param devices: emulated devices on the line; a single one with the default device number if not provided
+        :type devices: list of SimpleMotorControllerEmulator
+        :param baudrate: baud rate, used for wire time
+        :type baudrate: int
+        :param timeout: read timeout, in seconds; block until enough bytes are available if None
+        :type timeout: float
+        :param latency: device response latency, in seconds
+        :type latency: float
+        :param simulate_timing: simulate wire time and latency; responses are available immediately if False
+        :type simulate_timing: bool
+        """
+        if devices is None:
+            devices = [SimpleMotorControllerEmulator(baud_rate=baudrate)]
+        self.devices = list(devices)
+
+        self.port = 'emulated'
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.latency = latency
+        self.simulate_timing = simulate_timing
+        self.is_open = True
+
+        self.__condition = threading.Condition()
+        self.__rx = collections.deque()  # [availability time, bytearray]
+        self.__tx_free = 0.0  # time the host -> device line is free
+        self.__rx_free = 0.0  # time the device -> host line is free
+
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    def __byte_time(self):
+        """
+        Get wire time of one byte.
+        :return: byte time, in seconds
+        :rtype: float
+        """
+        return BITS_PER_BYTE / self.baudrate if self.simulate_timing else 0.0
+
+    def write(self, data):
+        """
+        Send bytes to the emulated devices.
+        :param data: bytes to be sent
+        :type data: bytes or bytearray
+        :return: number of bytes written
+        :rtype: int
+        """
+        if not self.is_open:
+            raise ConnectionError('Port is closed!')
+        data = bytes(data)
+        now = time.monotonic()
+        byte_time = self.__byte_time()
+
+        with self.__condition:
+            received = max(now, self.__tx_free) + len(data) * byte_time
+            self.__tx_free = received
+            response = feed_devices(self.devices, data, received)
+            if response:
+                ready = received + (self.latency if self.simulate_timing else 0.0)
+                available = max(ready, self.__rx_free) + len(response) * byte_time
+                self.__rx_free = available
+                self.__rx.append([available, bytearray(response)])
+                self.__condition.notify_all()
+            self.bytes_written += len(data)
+        return len(data)
+
+    def __available(self, now):
+        """
+        Count received bytes available at a time.
+        :param now: time.monotonic() timestamp
+        :type now: float
+        :return: available bytes
+        :rtype: int
+        """
+        return sum(len(chunk) for available, chunk in self.__rx if available <= now)
+
+    def read(self, size=1):
+        """
+        Read bytes, waiting up to timeout for them.
+        :param size: number of bytes to read
+        :type size: int
+        :return: received bytes
+        :rtype: bytes
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        data = bytearray()
+        with self.__condition:
+            while len(data) < size:
+                now = time.monotonic()
+                while self.__rx and self.__rx[0][0] <= now and len(data) < size:
+                    chunk = self.__rx[0][1]
+                    taken = chunk[:size - len(data)]
+                    data += taken
+                    del chunk[:len(taken)]
+                    if not chunk:
+                        self.__rx.popleft()
+                if len(data) >= size or not self.is_open:
+                    break
+                wait = None if deadline is None else deadline - now
+                if self.__rx:
+                    wait = self.__rx[0][0] - now if wait is None else min(wait, self.__rx[0][0] - now)
+                if wait is not None and wait <= 0:
+                    if deadline is not None and now >= deadline:
+                        break
+                    continue
+                self.__condition.wait(wait)
+        self.bytes_read += len(data)
+        return bytes(data)
+
+    @property
+    def in_waiting(self):
+        """
+        Get number of bytes available for reading.
+        :return: bytes
+        :rtype: int
+        """
+        with self.__condition:
+            return self.__available(time.monotonic())
+
+    def reset_input_buffer(self):
+        """
+        Discard every received byte, including those still on the wire.
+        :return: None
+        """
+        with self.__condition:
+            self.__rx.clear()
+
+    def reset_output_buffer(self):
+        """
+        Nothing is buffered for output: writes reach the emulated devices immediately.
+        :return: None
+        """
+
+    def flush(self):
+        """
+        Wait until every written byte is on the wire.
+        :return: None
+        """
+        delay = self.__tx_free - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def close(self):
+        """
+        Close the port.
+        :return: None
+        """
+        with self.__condition:
+            self.is_open = False
+            self.__condition.notify_all()
+
+
+class EmulatorPty:
+    """
+    EmulatorPty
+    Emulated devices behind a pseudo terminal (POSIX only): open port with any serial library, e.g.
+    PololuMotorController(com_port=EmulatorPty().port).
+    """
+    def __init__(self, devices=None, baud_rate=115200, latency=0.0, simulate_timing=True):
+        """
+        Initializer
+        :param devices: emulated devices on the line; a single one with the default device number if not provided
+        :type devices: list of SimpleMotorControllerEmulator
+        :param baud_rate: baud rate, used for wire time
+        :type baud_rate: int
+        :param latency: device response latency, in seconds
+        :type latency: float
+        :param simulate_timing: delay responses by wire time and latency
+        :type simulate_timing: bool
+        """
+        import tty  # POSIX only
+
+        if devices is None:
+            devices = [SimpleMotorControllerEmulator(baud_rate=baud_rate)]
+        self.__devices = list(devices)
+        self.__baud_rate = baud_rate
+        self.__latency = latency
+        self.__simulate_timing = simulate_timing
+
+        self.__master, self.__slave = os.openpty()
+        tty.setraw(self.__slave)
+        self.__port = os.ttyname(self.__slave)
+
+        self.__running = True
+        self.__thread = threading.Thread(target=self.__run, name='EmulatorPty', daemon=True)
+        self.__thread.start()
+
+    def __run(self):
+        """
+        Serve the emulated devices.
+        :return: None
+        """
+        byte_time = BITS_PER_BYTE / self.__baud_rate if self.__simulate_timing else 0.0
+        while self.__running:
+            try:
+                data = os.read(self.__master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            received = time.monotonic() + len(data) * byte_time
+            response = feed_devices(self.__devices, data, received)
+            if response:
+                if self.__simulate_timing:
+                    delay = received + self.__latency + len(response) * byte_time - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                try:
+                    os.write(self.__master, response)
+                except OSError:
+                    return
+
+    def close(self):
+        """
+        Stop serving and close the pseudo terminal.
+        :return: None
+        """
+        if self.__running:
+            self.__running = False
+            os.close(self.__slave)
+            os.close(self.__master)
+
+    @property
+    def port(self):
+        """
+        Get port name, to be opened by the host.
+        :return: port
+        :rtype: str
+        """
+        return self.__port
+
+    @property
+    def devices(self):
+        """
+        Get emulated devices.
+        :return: devices
+        :rtype: list
+        """
+        return self.__devices
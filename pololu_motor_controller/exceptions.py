@@ -0,0 +1,73 @@
+class PololuError(Exception):
+    """
+    PololuError
+    Base class of the errors raised by the driver.
+    """
+
+
+class ResponseTimeoutError(PololuError, TimeoutError):
+    """
+    ResponseTimeoutError
+    The device did not send the whole expected response before the deadline.
+    """
+    def __init__(self, message, expected_bytes=0, received=b''):
+        """
+        Initializer
+        :param message: error message
+        :type message: str
+        :param expected_bytes: number of expected response bytes
+        :type expected_bytes: int
+        :param received: bytes received before the deadline
+        :type received: bytes
+        """
+        super().__init__(message)
+        self.expected_bytes = expected_bytes
+        self.received = received
+
+
+class CrcError(PololuError):
+    """
+    CrcError
+    A response failed its CRC-7 check.
+    """
+
+
+class SerialError(PololuError):
+    """
+    SerialError
+    The device reported serial errors (SERIAL_ERRORS_OCCURRED).
+    """
+    def __init__(self, message, errors=0):
+        """
+        Initializer
+        :param message: error message
+        :type message: str
+        :param errors: reported serial errors
+        :type errors: SerialErrors
+        """
+        super().__init__(message)
+        self.errors = errors
+
+
+class MotorLimitError(PololuError):
+    """
+    MotorLimitError
+    The device could not set motor limits to the requested values because of its Hard Motor Limit settings.
+    """
+    def __init__(self, message, conflicts=None):
+        """
+        Initializer
+        :param message: error message
+        :type message: str
+        :param conflicts: conflicting directions keyed by limit
+        :type conflicts: dict
+        """
+        super().__init__(message)
+        self.conflicts = conflicts or {}
+
+
+class SerialCrcError(SerialError, CrcError):
+    """
+    SerialCrcError
+    The device received a frame that failed its CRC-7 check, and ignored it.
+    """
@@ -0,0 +1,280 @@
+import collections
+import concurrent.futures
+import threading
+
+
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+DeviceResult = collections.namedtuple(
+    'DeviceResult',
+    [
+        'value',  # value returned by the operation, None if it failed
+        'error',  # exception raised by the operation, None if successful
+    ],
+)
+
+
+def succeeded(results):
+    """
+    Get the values of the successful operations.
+    :param results: results keyed by device
+    :type results: dict
+    :return: values keyed by device
+    :rtype: dict
+    """
+    return {key: result.value for key, result in results.items() if result.error is None}
+
+
+def failed(results):
+    """
+    Get the errors of the failed operations.
+    :param results: results keyed by device
+    :type results: dict
+    :return: errors keyed by device
+    :rtype: dict
+    """
+    return {key: result.error for key, result in results.items() if result.error is not None}
+
+
+class PololuFleet:
+    """
+    PololuFleet
+    Controllers spread over several serial ports, driven in parallel: one worker thread per port (bus), so a slow port
+    only delays the devices daisy-chained on it. Devices are keyed by (com_port, device_number) unless named.
+    Every fleet operation returns a DeviceResult per device; a failing device never aborts the others.
+    """
+    def __init__(self, controllers):
+        """
+        Initializer
+        :param controllers: controllers, or controllers keyed by name
+        :type controllers: iterable of PololuMotorController or dict
+        """
+        if not isinstance(controllers, dict):
+            controllers = {
+                (controller.com_port, controller.device_number): controller for controller in controllers
+            }
+        self.__controllers = dict(controllers)
+
+        # devices grouped by the bus they are connected through, each bus served by its own worker
+        self.__ports = collections.OrderedDict()
+        for key, controller in self.__controllers.items():
+            self.__ports.setdefault(controller.bus, []).append(key)
+        self.__workers = {
+            bus: concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'PololuFleet-{bus.com_port}')
+            for bus in self.__ports
+        }
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def __run_port(self, keys, operation):
+        """
+        Run an operation on the devices of one port, one after the other. Worker side.
+        :param keys: devices
+        :type keys: list
+        :param operation: operation, called with the controller
+        :type operation: callable
+        :return: results keyed by device
+        :rtype: dict
+        """
+        results = {}
+        for key in keys:
+            try:
+                results[key] = DeviceResult(operation(self.__controllers[key]), None)
+            except Exception as exception:
+                self.__log_error(f'Fleet operation failed on {key}!\n{exception}')
+                results[key] = DeviceResult(None, exception)
+        return results
+
+    def __collect(self, futures, timeout):
+        """
+        Wait for the ports to complete, up to the deadline.
+        :param futures: devices and their results future, keyed by bus
+        :type futures: dict
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results keyed by device, in fleet order
+        :rtype: dict
+        """
+        concurrent.futures.wait([future for keys, future in futures.values()], timeout=timeout)
+
+        results = {}
+        for bus, (keys, future) in futures.items():
+            if future.done():
+                results.update(future.result())
+            else:
+                error = TimeoutError(f'Port {bus.com_port} did not complete within {timeout}s!')
+                results.update({key: DeviceResult(None, error) for key in keys})
+        return {key: results[key] for key in self.__controllers if key in results}
+
+    def __partition(self, devices):
+        """
+        Group devices by port.
+        :param devices: devices; every device if None
+        :type devices: iterable
+        :return: devices keyed by bus, in fleet order
+        :rtype: dict
+        """
+        if devices is None:
+            return self.__ports
+        devices = set(devices)
+        unknown = devices.difference(self.__controllers)
+        if unknown:
+            raise KeyError(f'Unknown devices: {sorted(map(str, unknown))}!')
+        ports = {bus: [key for key in keys if key in devices] for bus, keys in self.__ports.items()}
+        return {bus: keys for bus, keys in ports.items() if keys}
+
+    def run(self, operation, timeout=None, devices=None):
+        """
+        Run an operation on every device: in parallel across ports, in fleet order on each port.
+        :param operation: operation, called with the controller; its return value is the device result value
+        :type operation: callable
+        :param timeout: maximum time to wait for every port, in seconds; wait forever if None. Ports not done in time
+        are reported as failed (their operations still complete in the background).
+        :type timeout: float
+        :param devices: devices to run the operation on; every device if None
+        :type devices: iterable
+        :return: results keyed by device
+        :rtype: dict
+        """
+        futures = {
+            bus: (keys, self.__workers[bus].submit(self.__run_port, keys, operation))
+            for bus, keys in self.__partition(devices).items()
+        }
+        return self.__collect(futures, timeout)
+
+    @staticmethod
+    def __command(command):
+        """
+        Get an operation sending a command, failing if the command could not be sent.
+        :param command: command to be sent
+        :type command: Commands
+        :return: operation
+        :rtype: callable
+        """
+        def operation(controller):
+            """
+            Send the command.
+            """
+            sent, response = controller.send_command(command)
+            if not sent:
+                raise ConnectionError(f'Failed to send command: {command.name}!')
+            return response
+
+        return operation
+
+    def stop_motor(self, timeout=None):
+        """
+        Stop every motor.
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results keyed by device
+        :rtype: dict
+        """
+        return self.run(self.__command(Commands.stop_motor), timeout)
+
+    def exit_safe_start(self, timeout=None):
+        """
+        Exit Safe-Start on every device.
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results keyed by device
+        :rtype: dict
+        """
+        return self.run(self.__command(Commands.exit_safe_start), timeout)
+
+    def set_speed(self, speeds, timeout=None):
+        """
+        Set signed motor speeds.
+        :param speeds: speeds [-3200, 3200] keyed by device; devices not listed are left untouched
+        :type speeds: dict
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results of the listed devices, keyed by device
+        :rtype: dict
+        """
+        speeds = {self.__controllers[key]: speed for key, speed in speeds.items()}
+        devices = [key for key, controller in self.__controllers.items() if controller in speeds]
+        return self.run(lambda controller: controller.set_speed(speeds[controller]), timeout, devices)
+
+    def read_variables(self, variables, timeout=None):
+        """
+        Read the same variables from every device, one pipelined exchange per device.
+        :param variables: variables to be read
+        :type variables: iterable of Variables
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results keyed by device, whose values are raw values keyed by variable
+        :rtype: dict
+        """
+        variables = list(variables)
+        return self.run(lambda controller: controller.read_variables(variables), timeout)
+
+    def emergency_stop(self, timeout=1.0):
+        """
+        Stop every motor now. Stop Motor frames are written from one short-lived thread per port, without queuing behind
+        pending fleet operations, so the whole fleet stops within about one link latency (plus at most one exchange
+        already in progress on each port).
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: results keyed by device
+        :rtype: dict
+        """
+        operation = self.__command(Commands.stop_motor)
+        futures = {}
+        for bus, keys in self.__ports.items():
+            future = concurrent.futures.Future()
+
+            def stop(keys=keys, future=future):
+                """
+                Stop the devices of one port.
+                """
+                future.set_result(self.__run_port(keys, operation))
+
+            threading.Thread(target=stop, name=f'PololuFleet-stop-{bus.com_port}', daemon=True).start()
+            futures[bus] = (keys, future)
+        return self.__collect(futures, timeout)
+
+    def close(self):
+        """
+        Stop the workers, after the pending operations. Controllers are left connected.
+        :return: None
+        """
+        for worker in self.__workers.values():
+            worker.shutdown(wait=True)
+
+    def terminate(self):
+        """
+        Stop the workers and terminate every controller. To be called before closing.
+        :return: None
+        """
+        self.close()
+        for controller in self.__controllers.values():
+            try:
+                controller.terminate()
+            except Exception as exception:
+                self.__log_error(f'Failed to terminate {controller.com_port}!\n{exception}')
+
+    @property
+    def controllers(self):
+        """
+        Get controllers.
+        :return: controllers keyed by device
+        :rtype: dict
+        """
+        return dict(self.__controllers)
+
+    @property
+    def ports(self):
+        """
+        Get number of ports (workers).
+        :return: ports
+        :rtype: int
+        """
+        return len(self.__ports)
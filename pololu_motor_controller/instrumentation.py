@@ -0,0 +1,227 @@
+import bisect
+import collections
+import threading
+
+
+# histogram bucket upper bounds, in seconds; the last bucket collects everything slower
+DEFAULT_BUCKETS = (
+    0.00001, 0.00002, 0.00005,
+    0.0001, 0.0002, 0.0005,
+    0.001, 0.002, 0.005,
+    0.01, 0.02, 0.05,
+    0.1, 0.2, 0.5,
+    1.0,
+)
+
+
+ExchangeRecord = collections.namedtuple(
+    'ExchangeRecord',
+    [
+        'command',  # Commands member the frames were encoded for, None if unknown
+        'frames',  # number of frames sent in the exchange
+        'request',  # bytes sent; may be a reusable buffer, copy it to keep it
+        'response',  # bytes received, None if nothing was read
+        'expected_bytes',  # number of response bytes expected
+        'started',  # time.perf_counter() before waiting for the bus
+        'acquired',  # time.perf_counter() once the bus was acquired
+        'written',  # time.perf_counter() once the request was written, None if it was not
+        'finished',  # time.perf_counter() once the response was read (or timed out), None if it was not
+        'error',  # exception raised by the exchange, None if successful
+    ],
+)
+
+
+class Histogram:
+    """
+    Histogram
+    Fixed bucket latency histogram.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializer
+        :param buckets: bucket upper bounds, in seconds, in increasing order
+        :type buckets: tuple
+        """
+        self.__buckets = tuple(buckets)
+        self.__counts = [0] * (len(self.__buckets) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+
+    def record(self, value):
+        """
+        Record one value.
+        :param value: duration, in seconds
+        :type value: float
+        :return: None
+        """
+        self.__counts[bisect.bisect_left(self.__buckets, value)] += 1
+        self.__count += 1
+        self.__total += value
+        if value > self.__max:
+            self.__max = value
+
+    def snapshot(self):
+        """
+        Get a copy of the histogram.
+        :return: bucket upper bounds (None for the overflow bucket), counts, count, mean and max
+        :rtype: dict
+        """
+        return {
+            'buckets': list(self.__buckets) + [None],
+            'counts': list(self.__counts),
+            'count': self.__count,
+            'mean': self.__total / self.__count if self.__count else None,
+            'max': self.__max,
+        }
+
+
+class CommandStats:
+    """
+    CommandStats
+    Counters and latency histograms of one command.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializer
+        :param buckets: histogram bucket upper bounds, in seconds
+        :type buckets: tuple
+        """
+        self.frames = 0
+        self.exchanges = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.errors = 0
+        self.short_reads = 0
+        self.write_time = Histogram(buckets)
+        self.response_wait = Histogram(buckets)
+
+    def snapshot(self):
+        """
+        Get a copy of the statistics.
+        :return: statistics
+        :rtype: dict
+        """
+        return {
+            'frames': self.frames,
+            'exchanges': self.exchanges,
+            'bytes_written': self.bytes_written,
+            'bytes_read': self.bytes_read,
+            'errors': self.errors,
+            'short_reads': self.short_reads,
+            'write_time': self.write_time.snapshot(),
+            'response_wait': self.response_wait.snapshot(),
+        }
+
+
+class Instrumentation:
+    """
+    Instrumentation
+    Per command frame and byte counters, write time and response wait histograms, error and short read counts.
+    Attach to a controller (PololuMotorController(instrumentation=...)) to enable it; when no instrumentation is
+    attached the exchange path does not even read the clock.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initializer
+        :param buckets: histogram bucket upper bounds, in seconds
+        :type buckets: tuple
+        """
+        self.__buckets = tuple(buckets)
+        self.__lock = threading.Lock()
+        self.__commands = {}
+        self.__bus_wait = Histogram(self.__buckets)
+        self.__hooks = []
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def record(self, record):
+        """
+        Record one exchange and pass it on to the hooks.
+        :param record: exchange
+        :type record: ExchangeRecord
+        :return: None
+        """
+        with self.__lock:
+            stats = self.__commands.get(record.command)
+            if stats is None:
+                stats = self.__commands[record.command] = CommandStats(self.__buckets)
+
+            stats.exchanges += 1
+            stats.frames += record.frames
+            self.__bus_wait.record(record.acquired - record.started)
+            if record.error is not None:
+                stats.errors += 1
+            if record.written is not None:
+                stats.bytes_written += len(record.request)
+                stats.write_time.record(record.written - record.acquired)
+            if record.expected_bytes and record.response is not None and record.finished is not None:
+                received = len(record.response)
+                stats.bytes_read += received
+                stats.response_wait.record(record.finished - record.written)
+                if received < record.expected_bytes:
+                    stats.short_reads += 1
+
+        for hook in self.__hooks:
+            try:
+                hook(record)
+            except Exception as exception:
+                self.__log_error(f'Instrumentation hook failed!\n{exception}')
+
+    def add_hook(self, hook):
+        """
+        Call hook(record) after every exchange, from the thread that made it.
+        :param hook: hook
+        :type hook: callable
+        :return: hook, to be used with remove_hook()
+        :rtype: callable
+        """
+        self.__hooks = self.__hooks + [hook]
+        return hook
+
+    def remove_hook(self, hook):
+        """
+        Stop calling hook.
+        :param hook: hook registered with add_hook()
+        :type hook: callable
+        :return: None
+        """
+        self.__hooks = [registered for registered in self.__hooks if registered is not hook]
+
+    def reset(self):
+        """
+        Reset every counter and histogram.
+        :return: None
+        """
+        with self.__lock:
+            self.__commands = {}
+            self.__bus_wait = Histogram(self.__buckets)
+
+    def snapshot(self):
+        """
+        Get a copy of the statistics, e.g. to export them to a metrics system.
+        :return: statistics keyed by command name, plus the bus wait histogram and totals
+        :rtype: dict
+        """
+        with self.__lock:
+            commands = {
+                command.name if command is not None else None: stats.snapshot()
+                for command, stats in self.__commands.items()
+            }
+            bus_wait = self.__bus_wait.snapshot()
+
+        totals = {
+            key: sum(stats[key] for stats in commands.values())
+            for key in ('frames', 'exchanges', 'bytes_written', 'bytes_read', 'errors', 'short_reads')
+        }
+        return {
+            'commands': commands,
+            'bus_wait': bus_wait,
+            'totals': totals,
+        }
@@ -0,0 +1,137 @@
+import threading
+import time
+
+
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+
+
+DEFAULT_LEAD = 0.25  # fraction of the serial timeout left when the keepalive is sent
+
+
+class KeepaliveScheduler:
+    """
+    KeepaliveScheduler
+    Keeps the controller's serial timeout from expiring while the host is idle. Any valid command resets the timeout,
+    so a keepalive (Get Variable ERROR_STATUS, whose frame is cached) is sent only when no frame was sent to the device
+    for most of the timeout: regular traffic postpones it, and it never competes with a busy link. The keepalive
+    response refreshes the controller's cached error status.
+    Use PololuMotorController.start_keepalive() rather than creating one directly.
+    """
+    def __init__(self, controller, serial_timeout, lead=DEFAULT_LEAD):
+        """
+        Initializer
+        :param controller: kept alive controller
+        :type controller: PololuMotorController
+        :param serial_timeout: serial timeout configured on the controller, in seconds
+        :type serial_timeout: float
+        :param lead: fraction of the serial timeout left when the keepalive is sent (0, 1)
+        :type lead: float
+        """
+        if serial_timeout <= 0:
+            raise ValueError(f'Invalid serial timeout: {serial_timeout}! Must be positive! ')
+        if lead <= 0 or lead >= 1:
+            raise ValueError(f'Invalid lead: {lead}! Must be within interval (0, 1)! ')
+
+        self.__controller = controller
+        self.__serial_timeout = serial_timeout
+        self.__idle = serial_timeout * (1 - lead)
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__sent = 0
+        self.__errors = 0
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def start(self):
+        """
+        Start the scheduler thread.
+        :return: None
+        """
+        if self.running:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name='KeepaliveScheduler', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop the scheduler thread.
+        :return: None
+        """
+        self.__stop_event.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        """
+        Scheduling loop: sleep until the link has been idle for the idle interval, then send a keepalive unless a frame
+        was sent meanwhile.
+        :return: None
+        """
+        controller = self.__controller
+        started = time.monotonic()
+        while True:
+            last_sent = controller.last_sent
+            if last_sent is None or last_sent < started:
+                last_sent = started
+            delay = last_sent + self.__idle - time.monotonic()
+            if delay > 0:
+                if self.__stop_event.wait(delay):
+                    return
+                continue  # re-check: traffic may have postponed the keepalive
+            if self.__stop_event.is_set():
+                return
+
+            try:
+                timeout = min(self.__serial_timeout, self.__idle)
+                controller.read_variables((Variables.ERROR_STATUS, ), timeout, live=True)  # never served from a cache
+                self.__sent += 1
+            except Exception as exception:
+                self.__errors += 1
+                self.__log_error(f'Failed to send keepalive!\n{exception}')
+                if self.__stop_event.wait(self.__serial_timeout - self.__idle):
+                    return
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def serial_timeout(self):
+        """
+        Get serial timeout.
+        :return: serial timeout, in seconds
+        :rtype: float
+        """
+        return self.__serial_timeout
+
+    @property
+    def sent(self):
+        """
+        Get number of keepalives sent.
+        :return: keepalives
+        :rtype: int
+        """
+        return self.__sent
+
+    @property
+    def errors(self):
+        """
+        Get number of keepalives that failed.
+        :return: errors
+        :rtype: int
+        """
+        return self.__errors
@@ -0,0 +1,259 @@
+import collections
+import threading
+import time
+
+
+from pololu_motor_controller.utils.pololu_protocol.variables import ErrorStatus, LimitStatus, Variables
+
+
+DEFAULT_HEALTHY_INTERVAL = 0.5  # seconds between polls while healthy (see is_alert())
+DEFAULT_ALERT_INTERVAL = 0.05  # seconds between polls while faulted or while the motor is being limited
+
+MONITORED_VARIABLES = (Variables.ERROR_STATUS, Variables.ERRORS_OCCURRED, Variables.LIMIT_STATUS)
+
+# errors cleared by Exit Safe-Start: once only these are left, a fault has cleared
+REARMABLE_ERRORS = ErrorStatus.SAFE_START_VIOLATION | ErrorStatus.SERIAL_ERROR | ErrorStatus.COMMAND_TIMEOUT
+
+
+MonitorState = collections.namedtuple(
+    'MonitorState',
+    [
+        'errors',  # ERROR_STATUS: errors currently stopping the motor
+        'occurred',  # ERRORS_OCCURRED: errors occurred since the previous poll, even if already cleared
+        'limits',  # LIMIT_STATUS: what is currently limiting the motor
+        'time',  # time.monotonic() of the poll
+    ],
+)
+
+
+def decode_state(values, now=None):
+    """
+    Decode the monitored registers.
+    :param values: raw values keyed by variable, MONITORED_VARIABLES included
+    :type values: dict
+    :param now: time.monotonic() of the read; current time if None
+    :type now: float
+    :return: state
+    :rtype: MonitorState
+    """
+    return MonitorState(
+        errors=ErrorStatus(values[Variables.ERROR_STATUS]),
+        occurred=ErrorStatus(values[Variables.ERRORS_OCCURRED]),
+        limits=LimitStatus(values[Variables.LIMIT_STATUS]),
+        time=time.monotonic() if now is None else now,
+    )
+
+
+def is_faulted(state):
+    """
+    Check whether an error other than Safe-Start violation is set, or occurred since the previous poll.
+    :param state: state
+    :type state: MonitorState
+    :return: True if faulted
+    :rtype: bool
+    """
+    return bool((state.errors | state.occurred) & ~ErrorStatus.SAFE_START_VIOLATION)
+
+
+def is_alert(state):
+    """
+    Check whether a state calls for fast polling: faulted, or the motor is being limited. A stopped motor waiting for
+    Exit Safe-Start (Safe-Start violation, motor not allowed to run) is healthy.
+    :param state: state
+    :type state: MonitorState
+    :return: True if alert
+    :rtype: bool
+    """
+    return is_faulted(state) or bool(state.limits & ~LimitStatus.MOTOR_NOT_ALLOWED_TO_RUN)
+
+
+class ErrorMonitor:
+    """
+    ErrorMonitor
+    Polls ERROR_STATUS, ERRORS_OCCURRED and LIMIT_STATUS in a single exchange and notifies callbacks only when the
+    flags change (or errors occurred and cleared between polls). Polling is slow while the controller is healthy (a
+    Safe-Start violation alone included) and fast while faulted or while the motor is being limited. Optionally re-arms the controller (Exit Safe-Start) once
+    a fault clears.
+    """
+    def __init__(self, controller, healthy_interval=DEFAULT_HEALTHY_INTERVAL, alert_interval=DEFAULT_ALERT_INTERVAL,
+                 rearm=False, timeout=None):
+        """
+        Initializer
+        :param controller: monitored controller
+        :type controller: PololuMotorController
+        :param healthy_interval: seconds between polls while healthy
+        :type healthy_interval: float
+        :param alert_interval: seconds between polls while faulted or while the motor is being limited
+        :type alert_interval: float
+        :param rearm: send Exit Safe-Start once a fault clears (only Safe-Start, serial and command timeout errors
+        left); a Safe-Start violation caused by Stop Motor alone is never re-armed
+        :type rearm: bool
+        :param timeout: response timeout, in seconds; controller's default if None
+        :type timeout: float
+        """
+        if healthy_interval <= 0 or alert_interval <= 0:
+            raise ValueError(f'Invalid intervals: {healthy_interval}s, {alert_interval}s! Must be positive! ')
+
+        self.__controller = controller
+        self.__healthy_interval = healthy_interval
+        self.__alert_interval = alert_interval
+        self.__rearm = rearm
+        self.__timeout = timeout
+
+        self.__callbacks = []
+        self.__state = None
+        self.__faulted = False  # an error other than Safe-Start violation was seen and has not been re-armed yet
+        self.__polls = 0
+        self.__events = 0
+        self.__rearms = 0
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def add_callback(self, callback):
+        """
+        Register a callback, called from the monitor thread with the previous state (None on the first poll) and the
+        new one whenever flags change.
+        :param callback: callback
+        :type callback: callable
+        :return: None
+        """
+        self.__callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """
+        Unregister a callback.
+        :param callback: callback
+        :type callback: callable
+        :return: None
+        """
+        self.__callbacks.remove(callback)
+
+    def poll(self):
+        """
+        Read and decode the monitored registers once, notifying callbacks and re-arming if needed.
+        :return: state
+        :rtype: MonitorState
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        state = decode_state(self.__controller.read_variables(MONITORED_VARIABLES, self.__timeout, live=True))
+        previous, self.__state = self.__state, state
+        self.__polls += 1
+
+        transient = state.occurred & ~state.errors  # errors set and cleared again between polls
+        if previous is None or transient or (state.errors, state.limits) != (previous.errors, previous.limits):
+            self.__events += 1
+            for callback in list(self.__callbacks):
+                try:
+                    callback(previous, state)
+                except Exception as exception:
+                    self.__log_error(f'Monitor callback failed!\n{exception}')
+
+        if is_faulted(state):
+            self.__faulted = True  # including faults set and cleared again between polls
+        if self.__rearm and self.__faulted and not state.errors & ~REARMABLE_ERRORS:
+            self.__controller.exit_safe_start()
+            self.__faulted = False
+            self.__rearms += 1
+        return state
+
+    def interval(self, state=None):
+        """
+        Get the time until the next poll.
+        :param state: last state; the last polled one if None
+        :type state: MonitorState
+        :return: seconds
+        :rtype: float
+        """
+        state = self.__state if state is None else state
+        if state is None or is_alert(state):
+            return self.__alert_interval
+        return self.__healthy_interval
+
+    def start(self):
+        """
+        Start the monitor thread.
+        :return: None
+        """
+        if self.running:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name='ErrorMonitor', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop the monitor thread.
+        :return: None
+        """
+        self.__stop_event.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        """
+        Polling loop.
+        :return: None
+        """
+        while not self.__stop_event.is_set():
+            try:
+                state = self.poll()
+            except Exception as exception:
+                self.__log_error(f'Failed to poll error status!\n{exception}')
+                state = None
+            if self.__stop_event.wait(self.interval(state)):
+                return
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def state(self):
+        """
+        Get last polled state.
+        :return: state, None if never polled
+        :rtype: MonitorState
+        """
+        return self.__state
+
+    @property
+    def polls(self):
+        """
+        Get number of polls.
+        :return: polls
+        :rtype: int
+        """
+        return self.__polls
+
+    @property
+    def events(self):
+        """
+        Get number of polls that notified the callbacks.
+        :return: events
+        :rtype: int
+        """
+        return self.__events
+
+    @property
+    def rearms(self):
+        """
+        Get number of Exit Safe-Start commands sent by the monitor.
+        :return: rearms
+        :rtype: int
+        """
+        return self.__rearms
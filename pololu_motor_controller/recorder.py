@@ -0,0 +1,507 @@
+# Telemetry recorder
+# Records what a controller sends and receives (setpoints, other commands, variable values, failed exchanges) as fixed
+# size records in a preallocated, memory-mapped file. The file is columnar: a header followed by one region per column
+# (timestamps, kinds, devices, codes, values), so a reader maps the file and gets every column as a zero-copy
+# memoryview instead of parsing records one by one. Recorded setpoints can be replayed at their original timing.
+import collections
+import mmap
+import struct
+import threading
+import time
+
+
+from pololu_motor_controller.instrumentation import Instrumentation
+from pololu_motor_controller.trajectory import TrajectoryExecutor, TrajectoryPoint
+from pololu_motor_controller.utils.pololu_protocol.variables import VARIABLE_DEFINITIONS, decode_variables
+from pololu_motor_controller.utils.pololu_protocol.frames import (
+    LOW_RESOLUTION_SPEED_STEP,
+    MAX_LOW_RESOLUTION_SPEED,
+    MAX_SPEED,
+)
+from pololu_motor_controller.utils.pololu_protocol.commands import (
+    BAUD_RATE_SYNC_BYTE,
+    COMMAND_DATA_BYTES,
+    COMPACT_COMMAND_FLAG,
+
+    Commands,
+)
+
+
+MAGIC = b'PMCREC02'
+HEADER = struct.Struct('<8sQQdB')  # magic, capacity, count, wall clock start time, device number of compact frames
+HEADER_SIZE = 64
+COUNT = struct.Struct('<Q')  # record count, updated after every record
+COUNT_OFFSET = 16
+
+# columns: name, typecode, item size
+COLUMNS = (
+    ('timestamps', 'd', 8),  # seconds since the start of the recording
+    ('kinds', 'B', 1),  # record kind (KIND_*)
+    ('devices', 'B', 1),  # device number the frame was addressed to
+    ('codes', 'B', 1),  # command byte, or variable id for KIND_VARIABLE
+    ('values', 'i', 4),  # signed speed, brake amount or variable value; 0 if none
+)
+
+KIND_SPEED = 1  # speed setpoint sent (Motor Forward / Motor Reverse, any resolution)
+KIND_BRAKE = 2  # brake setpoint sent
+KIND_VARIABLE = 3  # variable value received
+KIND_COMMAND = 4  # other command sent
+KIND_ERROR = 5  # exchange failed (timeout, CRC error, ...)
+
+# speed commands keyed by command byte: direction, 7-bit resolution
+SPEED_COMMANDS = {
+    Commands.motor_forward.value.payload[0]: (1, False),
+    Commands.motor_reverse.value.payload[0]: (-1, False),
+    Commands.motor_forward_low_resolution.value.payload[0]: (1, True),
+    Commands.motor_reverse_low_resolution.value.payload[0]: (-1, True),
+}
+BRAKE_COMMAND = Commands.motor_brake.value.payload[0]
+VARIABLE_IDS = {variable.value: variable for variable in VARIABLE_DEFINITIONS}
+
+
+RecordedSetpoint = collections.namedtuple('RecordedSetpoint', ['timestamp', 'kind', 'device_number', 'value'])
+
+
+def column_offsets(capacity):
+    """
+    Get the file offset of every column and the file size.
+    :param capacity: number of records
+    :type capacity: int
+    :return: offsets keyed by column name, file size
+    :rtype: tuple
+    """
+    offsets = {}
+    offset = HEADER_SIZE
+    for name, typecode, item_size in COLUMNS:
+        offsets[name] = offset
+        offset += (capacity * item_size + 7) // 8 * 8  # keep every column 8-byte aligned
+    return offsets, offset
+
+
+def parse_frames(request, device_number=0):
+    """
+    Split a request into its frames, walking each frame header and the data bytes of its command. Frames may differ
+    in length, protocol and CRC mode: a CRC byte is the only byte after the data bytes with its MSB cleared.
+    :param request: request bytes
+    :type request: bytes or bytearray
+    :param device_number: device number of compact protocol frames
+    :type device_number: int
+    :return: device number, command byte (MSB cleared) and data bytes of every frame, up to the first one that cannot
+    be parsed
+    :rtype: list of tuple
+    """
+    parsed = []
+    index = 0
+    while index < len(request):
+        first = request[index]
+        if first == BAUD_RATE_SYNC_BYTE:
+            if index + 2 >= len(request):
+                break
+            frame_device_number, command_byte = request[index + 1], request[index + 2]
+            index += 3
+        elif first & COMPACT_COMMAND_FLAG:
+            frame_device_number, command_byte = device_number, first & ~COMPACT_COMMAND_FLAG
+            index += 1
+        else:
+            break
+
+        data_length = COMMAND_DATA_BYTES.get(command_byte)
+        if data_length is None or index + data_length > len(request):
+            break
+        parsed.append((frame_device_number, command_byte, bytes(request[index:index + data_length])))
+        index += data_length
+        if index < len(request) and not request[index] & COMPACT_COMMAND_FLAG:
+            index += 1  # CRC byte
+    return parsed
+
+
+class TelemetryRecorder:
+    """
+    TelemetryRecorder
+    Appends exchange records to a preallocated recording file. Attach it to a controller (attach()) to record through
+    the instrumentation hooks, or call record() / append() directly. Once full, further records are dropped.
+    """
+    def __init__(self, path, capacity=1000000):
+        """
+        Initializer. An existing file at path is overwritten.
+        :param path: recording file path
+        :type path: str
+        :param capacity: maximum number of records (each takes 15 bytes)
+        :type capacity: int
+        """
+        if capacity <= 0:
+            raise ValueError(f'Invalid capacity: {capacity}! Must be positive! ')
+
+        self.__path = path
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__count = 0
+        self.__dropped = 0
+        self.__started = time.perf_counter()
+        self.__device_number = 0
+
+        offsets, size = column_offsets(capacity)
+        self.__file = open(path, 'w+b')
+        self.__file.truncate(size)
+        self.__mmap = mmap.mmap(self.__file.fileno(), size)
+        self.__buffer = memoryview(self.__mmap)
+        self.__columns = [
+            self.__buffer[offsets[name]:offsets[name] + capacity * item_size].cast(typecode)
+            for name, typecode, item_size in COLUMNS
+        ]
+        self.__wall_started = time.time()
+        self.__write_header()
+
+        self.__hooked = []  # (controller, instrumentation, hook)
+
+    def __write_header(self):
+        """
+        Write the header (the record count is updated after every record).
+        :return: None
+        """
+        HEADER.pack_into(self.__mmap, 0, MAGIC, self.__capacity, self.__count, self.__wall_started,
+                         self.__device_number)
+
+    def append(self, timestamp, kind, device_number, code, value):
+        """
+        Append one record.
+        :param timestamp: time.perf_counter() timestamp
+        :type timestamp: float
+        :param kind: record kind (KIND_*)
+        :type kind: int
+        :param device_number: device number the frame was addressed to
+        :type device_number: int
+        :param code: command byte, or variable id
+        :type code: int
+        :param value: value
+        :type value: int
+        :return: False if the recording is full (the record is dropped)
+        :rtype: bool
+        """
+        with self.__lock:
+            index = self.__count
+            if index >= self.__capacity:
+                self.__dropped += 1
+                return False
+            timestamps, kinds, devices, codes, values = self.__columns
+            timestamps[index] = timestamp - self.__started
+            kinds[index] = kind
+            devices[index] = device_number
+            codes[index] = code
+            values[index] = value
+            self.__count = index + 1
+            COUNT.pack_into(self.__mmap, COUNT_OFFSET, self.__count)
+            return True
+
+    def record(self, record):
+        """
+        Record one exchange. To be registered as an instrumentation hook (see attach()).
+        :param record: exchange
+        :type record: ExchangeRecord
+        :return: None
+        """
+        timestamp = record.written if record.written is not None else record.started
+        frames = parse_frames(record.request, self.__device_number)
+        if record.error is not None:
+            command_byte = record.command.value.payload[0] if record.command is not None else 0
+            self.append(timestamp, KIND_ERROR, frames[0][0] if frames else self.__device_number, command_byte, 0)
+            return
+
+        if record.command is Commands.get_variable:
+            response = record.response or b''
+            length = len(response) // max(len(frames), 1)
+            for index, (device_number, command_byte, data_bytes) in enumerate(frames):
+                variable = VARIABLE_IDS.get(data_bytes[0])
+                if variable is None:
+                    continue
+                chunk = response[index * length:index * length + 2]
+                value = decode_variables((variable, ), chunk)[variable]
+                self.append(timestamp, KIND_VARIABLE, device_number, variable.value, value)
+            return
+
+        for device_number, command_byte, data_bytes in frames:
+            speed_command = SPEED_COMMANDS.get(command_byte)
+            if speed_command is not None:
+                direction, low_resolution = speed_command
+                if not low_resolution:
+                    speed = data_bytes[0] + (data_bytes[1] << 5)
+                elif data_bytes[0] == MAX_LOW_RESOLUTION_SPEED:
+                    speed = MAX_SPEED
+                else:
+                    speed = data_bytes[0] * LOW_RESOLUTION_SPEED_STEP
+                self.append(timestamp, KIND_SPEED, device_number, command_byte, direction * speed)
+            elif command_byte == BRAKE_COMMAND:
+                self.append(timestamp, KIND_BRAKE, device_number, command_byte, data_bytes[0])
+            else:
+                self.append(timestamp, KIND_COMMAND, device_number, command_byte, 0)
+
+    def attach(self, controller):
+        """
+        Record every exchange of a controller, enabling its instrumentation if needed.
+        :param controller: recorded controller
+        :type controller: PololuMotorController
+        :return: None
+        """
+        instrumentation = controller.instrumentation
+        if instrumentation is None:
+            instrumentation = controller.instrumentation = Instrumentation()
+        self.__device_number = controller.device_number
+        self.__write_header()
+        self.__hooked.append((controller, instrumentation, instrumentation.add_hook(self.record)))
+
+    def detach(self):
+        """
+        Stop recording the attached controllers.
+        :return: None
+        """
+        for controller, instrumentation, hook in self.__hooked:
+            instrumentation.remove_hook(hook)
+        self.__hooked = []
+
+    def close(self):
+        """
+        Detach, flush and close the recording file.
+        :return: None
+        """
+        self.detach()
+        with self.__lock:
+            if self.__mmap.closed:
+                return
+            for column in self.__columns:
+                column.release()
+            self.__buffer.release()
+            self.__mmap.flush()
+            self.__mmap.close()
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def path(self):
+        """
+        Get recording file path.
+        :return: path
+        :rtype: str
+        """
+        return self.__path
+
+    @property
+    def count(self):
+        """
+        Get number of records.
+        :return: records
+        :rtype: int
+        """
+        return self.__count
+
+    @property
+    def dropped(self):
+        """
+        Get number of records dropped because the recording was full.
+        :return: dropped records
+        :rtype: int
+        """
+        return self.__dropped
+
+
+class TelemetryRecording:
+    """
+    TelemetryRecording
+    Read-only view of a recording file. Columns are zero-copy memoryviews of the mapped file, valid until close().
+    """
+    def __init__(self, path):
+        """
+        Initializer
+        :param path: recording file path
+        :type path: str
+        """
+        self.__file = open(path, 'rb')
+        self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, capacity, count, started_at, device_number = HEADER.unpack_from(self.__mmap, 0)
+        if magic != MAGIC:
+            self.__mmap.close()
+            self.__file.close()
+            raise ValueError(f'Invalid recording file: {path}!')
+
+        self.__count = count
+        self.__started_at = started_at
+        self.__device_number = device_number
+        offsets, size = column_offsets(capacity)
+        self.__buffer = memoryview(self.__mmap)
+        self.__columns = {
+            name: self.__buffer[offsets[name]:offsets[name] + count * item_size].cast(typecode)
+            for name, typecode, item_size in COLUMNS
+        }
+
+    def close(self):
+        """
+        Release the columns and close the file.
+        :return: None
+        """
+        if self.__mmap.closed:
+            return
+        for column in self.__columns.values():
+            column.release()
+        self.__buffer.release()
+        self.__mmap.close()
+        self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.__count
+
+    @property
+    def count(self):
+        """
+        Get number of records.
+        :return: records
+        :rtype: int
+        """
+        return self.__count
+
+    @property
+    def started_at(self):
+        """
+        Get wall clock start time of the recording.
+        :return: time.time() timestamp
+        :rtype: float
+        """
+        return self.__started_at
+
+    @property
+    def device_number(self):
+        """
+        Get device number of the recorded controller (the last attached one), used for compact protocol frames.
+        :return: device number
+        :rtype: int
+        """
+        return self.__device_number
+
+    @property
+    def timestamps(self):
+        """
+        Get record timestamps, in seconds since the start of the recording.
+        :return: timestamps
+        :rtype: memoryview
+        """
+        return self.__columns['timestamps']
+
+    @property
+    def kinds(self):
+        """
+        Get record kinds (KIND_*).
+        :return: kinds
+        :rtype: memoryview
+        """
+        return self.__columns['kinds']
+
+    @property
+    def devices(self):
+        """
+        Get record device numbers.
+        :return: device numbers
+        :rtype: memoryview
+        """
+        return self.__columns['devices']
+
+    @property
+    def codes(self):
+        """
+        Get record codes: command bytes, or variable ids for KIND_VARIABLE records.
+        :return: codes
+        :rtype: memoryview
+        """
+        return self.__columns['codes']
+
+    @property
+    def values(self):
+        """
+        Get record values.
+        :return: values
+        :rtype: memoryview
+        """
+        return self.__columns['values']
+
+    def variable(self, variable, device_number=None):
+        """
+        Get the recorded values of one variable.
+        :param variable: variable
+        :type variable: Variables
+        :param device_number: device the values were read from; every device if None
+        :type device_number: int
+        :return: timestamps and values
+        :rtype: tuple of list
+        """
+        timestamps, kinds, devices, codes, values = self.timestamps, self.kinds, self.devices, self.codes, self.values
+        indexes = [
+            index for index in range(self.__count)
+            if kinds[index] == KIND_VARIABLE and codes[index] == variable.value
+            and (device_number is None or devices[index] == device_number)
+        ]
+        return [timestamps[index] for index in indexes], [values[index] for index in indexes]
+
+    def setpoints(self, device_number=None):
+        """
+        Get the recorded setpoints.
+        :param device_number: device the setpoints were sent to; every device if None
+        :type device_number: int
+        :return: setpoints, in recording order
+        :rtype: list of RecordedSetpoint
+        """
+        timestamps, kinds, devices, values = self.timestamps, self.kinds, self.devices, self.values
+        return [
+            RecordedSetpoint(timestamps[index], kinds[index], devices[index], values[index])
+            for index in range(self.__count)
+            if kinds[index] in (KIND_SPEED, KIND_BRAKE) and (device_number is None or devices[index] == device_number)
+        ]
+
+
+def replay(recording, target, deduplicate=False, device_number=None):
+    """
+    Send the setpoints recorded for one device again, at their original timing (relative to the first one).
+    :param recording: recording
+    :type recording: TelemetryRecording
+    :param target: controller, or a pyserial compatible port (e.g. EmulatedSerial) the frames are written to for
+    device_number
+    :type target: PololuMotorController or serial.Serial
+    :param deduplicate: skip setpoints repeating the previous one
+    :type deduplicate: bool
+    :param device_number: device whose setpoints are replayed; the target controller's device number, or the recorded
+    one for a port, if None
+    :type device_number: int
+    :return: report
+    :rtype: TrajectoryReport
+    """
+    controller = target
+    if not hasattr(target, 'set_speed'):
+        from pololu_motor_controller.core import PololuMotorController
+
+        controller = PololuMotorController(
+            com_port=getattr(target, 'port', None),
+            device_number=recording.device_number if device_number is None else device_number,
+            connection=target,
+            lazy=True,
+        )
+    if device_number is None:
+        device_number = controller.device_number
+
+    setpoints = recording.setpoints(device_number)
+    if not setpoints:
+        return TrajectoryExecutor(controller).run([])
+
+    first = setpoints[0].timestamp
+    points = [
+        TrajectoryPoint(setpoint.timestamp - first, setpoint.value if setpoint.kind == KIND_SPEED else 0,
+                        setpoint.value if setpoint.kind == KIND_BRAKE else None)
+        for setpoint in setpoints
+    ]
+    return TrajectoryExecutor(controller, deduplicate=deduplicate).run(points)
@@ -0,0 +1,206 @@
+import threading
+import time
+
+
+SPEED = 'speed'
+BRAKE = 'brake'
+
+
+class SetpointStreamer:
+    """
+    SetpointStreamer
+    Latest-wins setpoint streaming. Callers post targets without blocking; a single writer thread sends only the newest
+    pending target, skips targets identical to the last one sent and never exceeds the maximum frame rate.
+    """
+    def __init__(self, controller, max_rate=100.0):
+        """
+        Initializer
+        :param controller: controller the setpoints are sent to
+        :type controller: PololuMotorController
+        :param max_rate: maximum number of setpoint frames per second; unlimited if None
+        :type max_rate: float
+        """
+        if max_rate is not None and max_rate <= 0:
+            raise ValueError(f'Invalid maximum rate: {max_rate}! Must be positive! ')
+
+        self.__controller = controller
+        self.__min_interval = 1 / max_rate if max_rate else 0
+
+        self.__condition = threading.Condition()
+        self.__pending = None  # (kind, value) waiting to be sent
+        self.__last_sent = None  # (kind, value) last sent
+        self.__stopping = False
+        self.__thread = None
+
+        # statistics
+        # ==============================================================================================================
+        self.__posted = 0
+        self.__sent = 0
+        self.__coalesced = 0
+        self.__deduplicated = 0
+        self.__errors = 0
+        # ==============================================================================================================
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def start(self):
+        """
+        Start the writer thread.
+        :return: None
+        """
+        if self.running:
+            return
+        with self.__condition:
+            self.__stopping = False
+        self.__thread = threading.Thread(target=self.__run, name='SetpointStreamer', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop the writer thread, after it has sent the pending setpoint (if any).
+        :return: None
+        """
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __post(self, setpoint):
+        """
+        Replace the pending setpoint.
+        :param setpoint: (kind, value)
+        :type setpoint: tuple
+        :return: None
+        """
+        with self.__condition:
+            self.__posted += 1
+            if self.__pending is not None:
+                self.__coalesced += 1
+            self.__pending = setpoint
+            self.__condition.notify()
+
+    def post_speed(self, speed):
+        """
+        Post a signed speed target, without blocking.
+        :param speed: desired speed [-3200, 3200]
+        :type speed: int
+        :return: None
+        """
+        self.__post((SPEED, speed))
+
+    def post_brake(self, brake_amount=1):
+        """
+        Post a brake target, without blocking.
+        :param brake_amount: desired brake amount [0-32]
+        :type brake_amount: int
+        :return: None
+        """
+        self.__post((BRAKE, brake_amount))
+
+    def __run(self):
+        """
+        Writer loop.
+        :return: None
+        """
+        next_frame_time = 0
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__stopping:
+                    self.__condition.wait()
+                if self.__pending is None:
+                    return
+
+            # targets posted while waiting for the rate limit replace the pending one
+            delay = next_frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.__condition:
+                setpoint, self.__pending = self.__pending, None
+                if setpoint == self.__last_sent:
+                    self.__deduplicated += 1
+                    continue
+
+            try:
+                kind, value = setpoint
+                if kind == SPEED:
+                    self.__controller.set_speed(value)
+                else:
+                    self.__controller.motor_brake(value)
+            except Exception as exception:
+                self.__errors += 1
+                self.__log_error(f'Failed to send setpoint: {setpoint}!\n{exception}')
+                continue
+
+            self.__last_sent = setpoint
+            self.__sent += 1
+            next_frame_time = time.monotonic() + self.__min_interval
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def last_sent(self):
+        """
+        Get the last setpoint sent.
+        :return: (kind, value), None if nothing was sent yet
+        :rtype: tuple
+        """
+        return self.__last_sent
+
+    @property
+    def coalesced(self):
+        """
+        Get the number of setpoints replaced by a newer one before being sent.
+        :return: coalesced setpoints
+        :rtype: int
+        """
+        return self.__coalesced
+
+    @property
+    def deduplicated(self):
+        """
+        Get the number of setpoints skipped because identical to the last one sent.
+        :return: deduplicated setpoints
+        :rtype: int
+        """
+        return self.__deduplicated
+
+    @property
+    def dropped(self):
+        """
+        Get the number of posted setpoints that were never sent (coalesced or deduplicated).
+        :return: dropped setpoints
+        :rtype: int
+        """
+        return self.__coalesced + self.__deduplicated
+
+    @property
+    def stats(self):
+        """
+        Get statistics.
+        :return: posted, sent, coalesced, deduplicated and failed setpoint counts
+        :rtype: dict
+        """
+        with self.__condition:
+            return {
+                'posted': self.__posted,
+                'sent': self.__sent,
+                'coalesced': self.__coalesced,
+                'deduplicated': self.__deduplicated,
+                'errors': self.__errors,
+            }
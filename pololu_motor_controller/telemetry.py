@@ -0,0 +1,348 @@
+import array
+import bisect
+import threading
+import time
+
+
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+
+
+DEFAULT_VARIABLES = (
+    Variables.SPEED,
+    Variables.TARGET_SPEED,
+    Variables.INPUT_VOLTAGE,
+    Variables.TEMPERATURE,
+    Variables.ERROR_STATUS,
+)
+
+TIMESTAMP_TYPECODE = 'd'
+VALUE_TYPECODE = 'i'
+
+
+def zeros(typecode, length):
+    """
+    Allocate a zero-filled array.
+    :param typecode: array type code
+    :type typecode: str
+    :param length: number of items
+    :type length: int
+    :return: array
+    :rtype: array.array
+    """
+    return array.array(typecode, bytes(array.array(typecode).itemsize * length))
+
+
+class TelemetryWindow:
+    """
+    TelemetryWindow
+    Consecutive samples of a telemetry buffer, oldest first. Columns are memoryviews into the buffer (no copy): they
+    remain valid, but are overwritten once the poller wraps around, so copy them (e.g. list(view)) to keep them.
+    """
+    def __init__(self, timestamps, columns):
+        """
+        Initializer
+        :param timestamps: sample timestamps (time.monotonic), in seconds
+        :type timestamps: memoryview
+        :param columns: sample values keyed by variable
+        :type columns: dict
+        """
+        self.__timestamps = timestamps
+        self.__columns = columns
+
+    def __len__(self):
+        return len(self.__timestamps)
+
+    def __getitem__(self, variable):
+        return self.__columns[variable]
+
+    @property
+    def timestamps(self):
+        """
+        Get timestamps.
+        :return: sample timestamps (time.monotonic), in seconds
+        :rtype: memoryview
+        """
+        return self.__timestamps
+
+    @property
+    def columns(self):
+        """
+        Get columns.
+        :return: sample values keyed by variable
+        :rtype: dict
+        """
+        return self.__columns
+
+
+class TelemetryBuffer:
+    """
+    TelemetryBuffer
+    Preallocated ring buffer with one array column per variable plus one for timestamps. Every sample is written twice,
+    capacity items apart, so the latest samples are always contiguous and windows can be returned without copying.
+    """
+    def __init__(self, variables, capacity=1024):
+        """
+        Initializer
+        :param variables: recorded variables
+        :type variables: iterable of Variables
+        :param capacity: number of samples kept
+        :type capacity: int
+        """
+        if capacity < 1:
+            raise ValueError(f'Invalid capacity: {capacity}! Must be at least 1! ')
+
+        self.__variables = tuple(dict.fromkeys(variables))
+        self.__capacity = capacity
+        self.__count = 0  # samples appended so far
+
+        self.__timestamps = zeros(TIMESTAMP_TYPECODE, 2 * capacity)
+        self.__columns = {variable: zeros(VALUE_TYPECODE, 2 * capacity) for variable in self.__variables}
+
+    def __len__(self):
+        return min(self.__count, self.__capacity)
+
+    def append(self, timestamp, values):
+        """
+        Append one sample, overwriting the oldest one when full.
+        :param timestamp: sample timestamp (time.monotonic), in seconds
+        :type timestamp: float
+        :param values: sample values keyed by variable
+        :type values: dict
+        :return: None
+        """
+        index = self.__count % self.__capacity
+        mirror = index + self.__capacity
+
+        self.__timestamps[index] = self.__timestamps[mirror] = timestamp
+        for variable, column in self.__columns.items():
+            column[index] = column[mirror] = values[variable]
+        self.__count += 1
+
+    def latest(self):
+        """
+        Get the latest sample.
+        :return: timestamp and values keyed by variable, None if empty
+        :rtype: tuple
+        """
+        if not self.__count:
+            return None
+        index = (self.__count - 1) % self.__capacity
+        values = {variable: column[index] for variable, column in self.__columns.items()}
+        return self.__timestamps[index], values
+
+    def last(self, samples):
+        """
+        Get the latest samples.
+        :param samples: maximum number of samples
+        :type samples: int
+        :return: samples, oldest first
+        :rtype: TelemetryWindow
+        """
+        samples = max(0, min(samples, len(self)))
+        end = 0
+        if self.__count:
+            end = (self.__count - 1) % self.__capacity + self.__capacity + 1  # just after the latest mirrored sample
+        start = end - samples
+
+        timestamps = memoryview(self.__timestamps)[start:end]
+        columns = {variable: memoryview(column)[start:end] for variable, column in self.__columns.items()}
+        return TelemetryWindow(timestamps, columns)
+
+    def window(self, seconds, now=None):
+        """
+        Get the samples taken within the last seconds.
+        :param seconds: window length, in seconds
+        :type seconds: float
+        :param now: end of the window (time.monotonic); time of the latest sample if None
+        :type now: float
+        :return: samples, oldest first
+        :rtype: TelemetryWindow
+        """
+        window = self.last(len(self))
+        if not len(window):
+            return window
+        if now is None:
+            now = window.timestamps[-1]
+
+        first = bisect.bisect_left(window.timestamps, now - seconds)
+        return self.last(len(window) - first)
+
+    @property
+    def variables(self):
+        """
+        Get variables.
+        :return: recorded variables
+        :rtype: tuple
+        """
+        return self.__variables
+
+    @property
+    def capacity(self):
+        """
+        Get capacity.
+        :return: number of samples kept
+        :rtype: int
+        """
+        return self.__capacity
+
+    @property
+    def count(self):
+        """
+        Get count.
+        :return: number of samples appended so far
+        :rtype: int
+        """
+        return self.__count
+
+
+class TelemetryPoller:
+    """
+    TelemetryPoller
+    Opt-in background sampler: reads a set of variables at a fixed rate with one pipelined read per sample and keeps
+    the samples in a TelemetryBuffer, so consumers share one request per cycle instead of polling the board themselves.
+    """
+    def __init__(self, controller, variables=DEFAULT_VARIABLES, rate=10.0, capacity=1024):
+        """
+        Initializer
+        :param controller: sampled controller
+        :type controller: PololuMotorController
+        :param variables: sampled variables
+        :type variables: iterable of Variables
+        :param rate: sampling rate, in Hz
+        :type rate: float
+        :param capacity: number of samples kept
+        :type capacity: int
+        """
+        if rate <= 0:
+            raise ValueError(f'Invalid rate: {rate}! Must be positive! ')
+
+        self.__controller = controller
+        self.__period = 1 / rate
+        self.__buffer = TelemetryBuffer(variables, capacity)
+
+        self.__subscribers = []
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def start(self):
+        """
+        Start sampling in a background thread.
+        :return: None
+        """
+        if self.running:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name='TelemetryPoller', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and wait for the background thread to finish.
+        :return: None
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self):
+        """
+        Sampling loop. Samples are scheduled on absolute deadlines, so timing errors do not accumulate.
+        :return: None
+        """
+        variables = self.__buffer.variables
+        deadline = time.monotonic()
+        while not self.__stop_event.is_set():
+            try:
+                values = self.__controller.read_variables(variables)
+                self.__publish(time.monotonic(), values)
+            except Exception as exception:
+                self.__log_error(f'Failed to sample telemetry!\n{exception}')
+
+            deadline += self.__period
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                deadline = time.monotonic()  # overrun: skip the missed samples instead of bursting
+                delay = 0
+            self.__stop_event.wait(delay)
+
+    def __publish(self, timestamp, values):
+        """
+        Store a sample and notify subscribers.
+        :param timestamp: sample timestamp (time.monotonic), in seconds
+        :type timestamp: float
+        :param values: sample values keyed by variable
+        :type values: dict
+        :return: None
+        """
+        self.__buffer.append(timestamp, values)
+        for callback in tuple(self.__subscribers):
+            try:
+                callback(timestamp, values)
+            except Exception as exception:
+                self.__log_error(f'Telemetry subscriber failed!\n{exception}')
+
+    def subscribe(self, callback):
+        """
+        Call callback(timestamp, values) for every new sample, from the sampling thread.
+        :param callback: callback
+        :type callback: callable
+        :return: callback, to be used with unsubscribe()
+        :rtype: callable
+        """
+        self.__subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        """
+        Stop notifying callback.
+        :param callback: callback registered with subscribe()
+        :type callback: callable
+        :return: None
+        """
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def latest(self):
+        """
+        Get the latest sample.
+        :return: timestamp and values keyed by variable, None if nothing was sampled yet
+        :rtype: tuple
+        """
+        return self.__buffer.latest()
+
+    def window(self, seconds):
+        """
+        Get the samples taken within the last seconds, without copying.
+        :param seconds: window length, in seconds
+        :type seconds: float
+        :return: samples, oldest first
+        :rtype: TelemetryWindow
+        """
+        return self.__buffer.window(seconds, now=time.monotonic())
+
+    @property
+    def buffer(self):
+        """
+        Get buffer.
+        :return: sample buffer
+        :rtype: TelemetryBuffer
+        """
+        return self.__buffer
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
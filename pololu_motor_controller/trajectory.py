@@ -0,0 +1,302 @@
+import collections
+import math
+import threading
+import time
+
+
+from pololu_motor_controller.utils.statistics import percentile
+from pololu_motor_controller.utils.pololu_protocol.frames import MAX_SPEED
+
+
+DEFAULT_RATE = 100.0  # Hz, setpoints per second of generated profiles
+SPIN_THRESHOLD = 0.0005  # seconds before a deadline from which the executor spins instead of sleeping
+
+
+TrajectoryPoint = collections.namedtuple(
+    'TrajectoryPoint',
+    [
+        'time',  # seconds from the start of the profile
+        'speed',  # signed speed [-3200, 3200]
+        'brake',  # brake amount [0-32] to brake instead of setting the speed, None to set the speed
+    ],
+    defaults=(None, ),
+)
+
+
+TrajectoryReport = collections.namedtuple(
+    'TrajectoryReport',
+    [
+        'points',  # number of points in the profile
+        'sent',  # number of frames sent
+        'deduplicated',  # points not sent because they repeated the previous setpoint
+        'errors',  # points that failed to be sent
+        'completed',  # False if the run was stopped before the last point
+        'duration',  # seconds from the start to the last point sent
+        'lateness_us',  # send time minus deadline statistics: mean, p50, p99 and max, in µs
+    ],
+)
+
+
+def ramp(start_speed, end_speed, duration, rate=DEFAULT_RATE, start_time=0.0):
+    """
+    Generate a linear speed ramp.
+    :param start_speed: signed speed at start_time [-3200, 3200]
+    :type start_speed: int
+    :param end_speed: signed speed at start_time + duration [-3200, 3200]
+    :type end_speed: int
+    :param duration: ramp duration, in seconds
+    :type duration: float
+    :param rate: setpoints per second
+    :type rate: float
+    :param start_time: time of the first point, in seconds
+    :type start_time: float
+    :return: points, the last one at start_time + duration
+    :rtype: list of TrajectoryPoint
+    """
+    return profile(lambda fraction: fraction, start_speed, end_speed, duration, rate, start_time)
+
+
+def s_curve(start_speed, end_speed, duration, rate=DEFAULT_RATE, start_time=0.0):
+    """
+    Generate an S-curve speed transition: zero acceleration at both ends, maximum half way (cosine blend).
+    :param start_speed: signed speed at start_time [-3200, 3200]
+    :type start_speed: int
+    :param end_speed: signed speed at start_time + duration [-3200, 3200]
+    :type end_speed: int
+    :param duration: transition duration, in seconds
+    :type duration: float
+    :param rate: setpoints per second
+    :type rate: float
+    :param start_time: time of the first point, in seconds
+    :type start_time: float
+    :return: points, the last one at start_time + duration
+    :rtype: list of TrajectoryPoint
+    """
+    return profile(lambda fraction: (1 - math.cos(math.pi * fraction)) / 2, start_speed, end_speed, duration, rate,
+                   start_time)
+
+
+def profile(shape, start_speed, end_speed, duration, rate=DEFAULT_RATE, start_time=0.0):
+    """
+    Generate a speed transition of any shape, in one batch.
+    :param shape: maps the elapsed fraction of the duration [0, 1] to the completed fraction of the transition [0, 1]
+    :type shape: callable
+    :param start_speed: signed speed at start_time [-3200, 3200]
+    :type start_speed: int
+    :param end_speed: signed speed at start_time + duration [-3200, 3200]
+    :type end_speed: int
+    :param duration: transition duration, in seconds
+    :type duration: float
+    :param rate: setpoints per second
+    :type rate: float
+    :param start_time: time of the first point, in seconds
+    :type start_time: float
+    :return: points, the last one at start_time + duration
+    :rtype: list of TrajectoryPoint
+    """
+    for speed in (start_speed, end_speed):
+        if abs(speed) > MAX_SPEED:
+            raise ValueError(f'Invalid speed: {speed}! Must be within interval [-{MAX_SPEED}, {MAX_SPEED}]! ')
+    if duration < 0 or rate <= 0:
+        raise ValueError(f'Invalid duration or rate: {duration}s at {rate}Hz! Must be positive! ')
+
+    steps = max(1, round(duration * rate))
+    change = end_speed - start_speed
+    return [
+        TrajectoryPoint(start_time + duration * step / steps, start_speed + round(change * shape(step / steps)))
+        for step in range(steps + 1)
+    ]
+
+
+def concatenate(*profiles):
+    """
+    Chain profiles: each one starts where the previous one ends (its own first point is dropped if it falls on the
+    previous last point's time).
+    :param profiles: profiles, each starting at time 0
+    :type profiles: list of TrajectoryPoint
+    :return: points
+    :rtype: list of TrajectoryPoint
+    """
+    points = []
+    offset = 0.0
+    for segment in profiles:
+        if not segment:
+            continue
+        shifted = [point._replace(time=point.time + offset) for point in segment]
+        if points and shifted[0].time <= points[-1].time:
+            shifted = shifted[1:]
+        points.extend(shifted)
+        offset = points[-1].time
+    return points
+
+
+class TrajectoryExecutor:
+    """
+    TrajectoryExecutor
+    Streams a precomputed speed profile to a controller. Every point is sent at its own absolute deadline (profile
+    start + point time), so late points never delay the following ones and timing errors do not accumulate.
+    """
+    def __init__(self, controller, deduplicate=True):
+        """
+        Initializer
+        :param controller: controller the profile is sent to
+        :type controller: PololuMotorController
+        :param deduplicate: skip points repeating the previous setpoint
+        :type deduplicate: bool
+        """
+        self.__controller = controller
+        self.__deduplicate = deduplicate
+
+        self.__stop_event = threading.Event()
+        self.__thread = None
+        self.__report = None
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def __wait(self, deadline):
+        """
+        Wait for a deadline: sleep until shortly before it, then spin.
+        :param deadline: time.perf_counter() deadline
+        :type deadline: float
+        :return: False if stopped while waiting
+        :rtype: bool
+        """
+        clock = time.perf_counter
+        delay = deadline - clock() - SPIN_THRESHOLD
+        if delay > 0 and self.__stop_event.wait(delay):
+            return False
+        while clock() < deadline:
+            pass
+        return not self.__stop_event.is_set()
+
+    def run(self, points):
+        """
+        Stream a profile, blocking until its last point is sent (or stop() is called from another thread).
+        :param points: profile, sorted by time
+        :type points: iterable of TrajectoryPoint
+        :return: report
+        :rtype: TrajectoryReport
+        """
+        self.__stop_event.clear()
+        return self.__run(list(points))
+
+    def __run(self, points):
+        """
+        Streaming loop.
+        :param points: profile, sorted by time
+        :type points: list of TrajectoryPoint
+        :return: report
+        :rtype: TrajectoryReport
+        """
+        controller = self.__controller
+        clock = time.perf_counter
+
+        lateness = []
+        sent = deduplicated = errors = 0
+        last_setpoint = None
+        completed = True
+        started = clock()
+        finished = started
+        for point in points:
+            if not self.__wait(started + point.time):
+                completed = False
+                break
+
+            setpoint = ('brake', point.brake) if point.brake is not None else ('speed', point.speed)
+            if self.__deduplicate and setpoint == last_setpoint:
+                deduplicated += 1
+                continue
+
+            sending = clock()
+            lateness.append(sending - started - point.time)
+            try:
+                if point.brake is not None:
+                    controller.motor_brake(point.brake)
+                else:
+                    controller.set_speed(point.speed)
+                sent += 1
+                last_setpoint = setpoint
+            except Exception as exception:
+                errors += 1
+                self.__log_error(f'Failed to send trajectory point {point}!\n{exception}')
+            finished = sending
+
+        lateness.sort()
+        self.__report = TrajectoryReport(
+            points=len(points),
+            sent=sent,
+            deduplicated=deduplicated,
+            errors=errors,
+            completed=completed,
+            duration=finished - started,
+            lateness_us={
+                'mean': sum(lateness) / len(lateness) * 1e6 if lateness else None,
+                'p50': percentile(lateness, 0.50) * 1e6 if lateness else None,
+                'p99': percentile(lateness, 0.99) * 1e6 if lateness else None,
+                'max': lateness[-1] * 1e6 if lateness else None,
+            },
+        )
+        return self.__report
+
+    def start(self, points):
+        """
+        Stream a profile from a background thread.
+        :param points: profile, sorted by time
+        :type points: iterable of TrajectoryPoint
+        :return: None
+        """
+        if self.running:
+            raise RuntimeError('A trajectory is already running!')
+        points = list(points)
+        self.__stop_event.clear()
+        self.__report = None
+        self.__thread = threading.Thread(target=self.__run, args=(points, ), name='TrajectoryExecutor', daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stop streaming (the motor keeps the last setpoint sent) and wait for the background thread, if any.
+        :return: report
+        :rtype: TrajectoryReport
+        """
+        self.__stop_event.set()
+        return self.join()
+
+    def join(self, timeout=None):
+        """
+        Wait for the background run to finish.
+        :param timeout: maximum time to wait, in seconds; wait forever if None
+        :type timeout: float
+        :return: report, None if still running
+        :rtype: TrajectoryReport
+        """
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+            if self.__thread.is_alive():
+                return None
+            self.__thread = None
+        return self.__report
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def report(self):
+        """
+        Get report of the last run.
+        :return: report, None if no run completed
+        :rtype: TrajectoryReport
+        """
+        return self.__report
@@ -5,6 +5,21 @@ BAUD_RATE_SYNC_BYTE = 0xAA
 
 VARIABLE_ID_BYTE_INDEX = 1
 
+# Compact Protocol
+# This is the simpler of the two protocols. It is the protocol you should use if your Simple Motor Controller is the
+# only device connected to your serial line. The Simple Motor Controller compact protocol command packet is simply:
+# command byte (with MSB set), any necessary data bytes
+# https://www.pololu.com/docs/0J44/6.2
+COMPACT_COMMAND_FLAG = 0x80
+
+
+class Protocols(enum.Enum):
+    """
+    Protocols
+    """
+    POLOLU = 'pololu'  # 0xAA, device number, command byte (MSB cleared), data bytes
+    COMPACT = 'compact'  # command byte (MSB set), data bytes; single device links only
+
 
 class Command:
     """
@@ -15,6 +30,9 @@ class Command:
         Initializer
         :param name: command's name
         :type name: str
+        :param description: command's description; looked up in DESCRIPTIONS (by command byte) when first requested if
+        None
+        :type description: str
         :param payload: command bytes without including first 2 bytes: 0xAA (170 in decimal) as the first (command)
         byte, used for baud rate synchronization and Device Number data byte
         :type payload: bytearray
@@ -65,6 +83,10 @@ class Command:
         :return: description
         :rtype: str
         """
+        if self.__description is None:
+            from pololu_motor_controller.utils.pololu_protocol.descriptions import DESCRIPTIONS
+
+            self.__description = DESCRIPTIONS.get(self.payload[0], '')
         return self.__description
 
     @property
@@ -105,13 +127,7 @@ def cmd_get_firmware_version_response_normalizer(response):
 
 cmd_get_firmware_version = Command(
     name='Get Firmware Version',
-    description="""This command lets you read the Simple Motor Controller product number and firmware version number. 
-    The first two bytes of the response are the low and high bytes of the product ID (each Simple Motor Controller 
-    version has a unique product ID), and the last two bytes of the response are the firmware minor and major version 
-    numbers in binary-coded decimal (BCD) format. BCD format means that the version number is the value you get when 
-    you write it in hex and then read it as if it were in decimal. For example, a minor version byte of 0x15 (21) means 
-    a the minor version number is 15, not 21.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x42, ]),
     response_bytes=4,
 )
@@ -120,16 +136,7 @@ cmd_get_firmware_version.normalizer = cmd_get_firmware_version_response_normaliz
 
 cmd_exit_safe_start = Command(
     name='Exit Safe-Start (Serial/USB input mode only)',
-    description="""If the Input Mode is Serial/USB, and you have not disabled Safe-start protection, then this command 
-is required before the motor can run. Specifically, this command must be issued when the controller is first powered 
-up, after any reset, and after any error stops the motor. This command has no serial response.
-If you just want your motor to run whenever possible, you can transmit Exit Safe Start and motor speed commands 
-regularly. One potential problem with this approach is that if there is an error (e.g. the battery becomes 
-disconnected) then the motor will start running immediately when the error has been resolved (e.g. the battery is 
-reconnected).
-If you want to prevent your motor from starting up unexpectedly after the controller has recovered from an error, then 
-you should only send an Exit Safe Start command after either waiting for user input or issuing a warning to the user.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x03, ]),
     response_bytes=0,
 )
@@ -137,26 +144,7 @@ you should only send an Exit Safe Start command after either waiting for user in
 
 cmd_motor_forward = Command(
     name='Motor Forward (Serial/USB input mode only)',
-    description="""This command lets you set the full-resolution motor target speed in the forward direction. The motor 
-speed must be a number from 0 (motor stopped) to 3200 (motor forward at full speed) and is specified using two data 
-bytes. The first data byte contains the low five bits of the speed and the second data byte contains the high seven 
-bits of the speed.
-The first speed data byte can be computed by taking the full (0-3200) speed modulo 32, which is the same as dividing 
-the speed by 32, discarding the quotient, and keeping only the remainder. We can get the same result using binary math 
-by bitwise-ANDing the speed with 0x1F (31). In C (and many other programming languages), these operations can be 
-carried out with the following expressions:
-speed_byte_1 = speed % 32;
-or, equivalently:
-speed_byte_1 = speed & 0x1F;
-The second speed data byte can be computed by dividing the full (0-3200) speed by 32, discarding the remainder, and 
-keeping only the quotient (i.e. turn the division result into a whole number by dropping everything after the decimal 
-point). We can get the same result using binary math by bit-shifting the speed right five places. In C (and many other 
-programming languages), these operations can be carried out with the following expressions:
-speed_byte_2 = speed / 32;
-or, equivalently:
-speed_byte_2 = speed >> 5;
-This command has no serial response.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x05, 0x00, 0x00]),  # last 2 bytes to be changed accordingly to the desired speed
     response_bytes=0,
 )
@@ -164,24 +152,31 @@ This command has no serial response.
 
 cmd_motor_reverse = Command(
     name='Motor Reverse (Serial/USB input mode only)',
-    description="""This command lets you set the full-resolution motor target speed in the reverse direction. The motor 
-speed must be a number from 0 (motor stopped) to 3200 (motor reverse at full speed) and is specified using two data 
-bytes, the first containing the low five bits of the speed and the second containing the high seven bits of the speed. 
-This command behaves the same as the Motor Forward command except the motor moves in the opposite direction.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x06, 0x00, 0x00]),  # last 2 bytes to be changed accordingly to the desired speed
     response_bytes=0,
 )
 
 
+cmd_motor_forward_low_resolution = Command(
+    name='Motor Forward, 7-bit resolution (Serial/USB input mode only)',
+    description=None,  # loaded on demand
+    payload=bytearray([0x09, 0x00]),  # last byte to be changed accordingly to the desired speed
+    response_bytes=0,
+)
+
+
+cmd_motor_reverse_low_resolution = Command(
+    name='Motor Reverse, 7-bit resolution (Serial/USB input mode only)',
+    description=None,  # loaded on demand
+    payload=bytearray([0x0A, 0x00]),  # last byte to be changed accordingly to the desired speed
+    response_bytes=0,
+)
+
+
 cmd_motor_brake = Command(
     name='Motor Brake (Serial/USB input mode only)',
-    description="""This command causes the motor to immediately brake by the specified amount (configured deceleration 
-limits are ignored). The Brake Amount byte can have a value from 0 to 32, with 0 resulting in maximum coasting (the 
-motor leads are floating almost 100% of the time) and 32 resulting in full braking (the motor leads are shorted 
-together 100% of the time). Requesting a brake amount greater than 32 results in a Serial Format Error. This command 
-has no serial response.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x12, 0x00]),  # last byte to be changed accordingly to the desired brake amount
     response_bytes=0,
 )
@@ -189,11 +184,7 @@ has no serial response.
 
 cmd_stop_motor = Command(
     name='Stop Motor (any input mode)',
-    description="""This command sets the motor target speed to zero and makes the controller susceptible to a 
-safe-start violation error if Safe Start is enabled. Put another way, this command will stop the motor (configured 
-deceleration limits will be respected) and not allow the motor to start again until the Safe-Start conditions required 
-by the Input Mode are satisfied. This command has no serial response.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x60, ]),
     response_bytes=0,
 )
@@ -201,21 +192,20 @@ by the Input Mode are satisfied. This command has no serial response.
 
 cmd_get_variable = Command(
     name='Get Variable (any input mode)',
-    description="""This command lets you read a 16-bit variable from the Simple Motor Controller. See Section 6.4 for a 
-list of all of available variables. The value of the requested variable is transmitted as two bytes, with the low byte 
-sent first. You can reconstruct the variable value from these bytes using the following equation:
-variable_low_byte + 256 * variable_high_byte
-If the variable type is signed and the above result is greater than 32767, you will need to subtract 65536 from the 
-result to obtain the correct, signed value. Alternatively, if it is supported by the language you are using, you can 
-cast the result to a signed 16-bit data type.
-Requesting variable IDs between 41 and 127 results in a Serial Format Error, and the controller does not transmit a 
-response.
-""",
+    description=None,  # loaded on demand
     payload=bytearray([0x21, 0x00, ]),  # last byte to be changed accordingly to the desired variable id
     response_bytes=2,
 )
 
 
+cmd_set_motor_limit = Command(
+    name='Set Motor Limit (any input mode)',
+    description=None,  # loaded on demand
+    payload=bytearray([0x22, 0x00, 0x00, 0x00]),  # limit id, limit value low 7 bits, limit value high 7 bits
+    response_bytes=1,
+)
+
+
 class Commands(enum.Enum):
     """
     Commands
@@ -224,6 +214,13 @@ class Commands(enum.Enum):
     exit_safe_start: Command = cmd_exit_safe_start
     motor_forward: Command = cmd_motor_forward
     motor_reverse: Command = cmd_motor_reverse
+    motor_forward_low_resolution: Command = cmd_motor_forward_low_resolution
+    motor_reverse_low_resolution: Command = cmd_motor_reverse_low_resolution
     motor_brake: Command = cmd_motor_brake
     stop_motor: Command = cmd_stop_motor
     get_variable: Command = cmd_get_variable
+    set_motor_limit: Command = cmd_set_motor_limit
+
+
+# data bytes following each command byte
+COMMAND_DATA_BYTES = {command.value.payload[0]: len(command.value.payload) - 1 for command in Commands}
@@ -0,0 +1,88 @@
+# Cyclic Redundancy Check (CRC) Error Detection
+# For certain applications, verifying the integrity of the data you are sending and receiving can be very important.
+# Because of this, the Simple Motor Controller has optional 7-bit cyclic redundancy checking, which is similar to a
+# checksum but more robust as it can detect errors that would not affect a checksum, such as an extra zero byte or
+# bytes out of order. When enabled, a CRC byte computed over the whole packet must be appended to every command
+# packet; the controller can also be configured to append a CRC byte to every response.
+# The CRC-7 polynomial is 0x91 (bit-reversed 0x89): for example, the CRC byte of the packet 0x83, 0x01 is 0x17.
+
+# https://www.pololu.com/docs/0J44/6.7
+import enum
+
+
+from pololu_motor_controller.exceptions import CrcError
+
+
+CRC7_POLYNOMIAL = 0x91
+
+
+class CrcModes(enum.Enum):
+    """
+    CrcModes
+    Must match the CRC mode configured on the controller.
+    """
+    DISABLED = 'disabled'
+    COMMANDS = 'commands'  # a CRC byte is appended to every command
+    COMMANDS_AND_RESPONSES = 'commands and responses'  # ... and the controller appends one to every response
+
+
+def build_crc7_table():
+    """
+    Precompute the CRC-7 of every single byte, so CRCs are computed one byte (not one bit) at a time.
+    :return: table
+    :rtype: bytes
+    """
+    table = bytearray(256)
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            if crc & 1:
+                crc ^= CRC7_POLYNOMIAL
+            crc >>= 1
+        table[byte] = crc
+    return bytes(table)
+
+
+CRC7_TABLE = build_crc7_table()
+
+
+def crc7(data, length=None):
+    """
+    Compute the CRC-7 of a packet.
+    :param data: packet
+    :type data: bytes or bytearray
+    :param length: number of bytes covered, starting with the first one; all of them if None
+    :type length: int
+    :return: CRC byte
+    :rtype: int
+    """
+    table = CRC7_TABLE
+    crc = 0
+    for index in range(len(data) if length is None else length):
+        crc = table[crc ^ data[index]]
+    return crc
+
+
+def verify_responses(response, response_bytes):
+    """
+    Verify and strip the CRC byte following each response.
+    :param response: consecutive responses, each followed by its CRC byte
+    :type response: bytes
+    :param response_bytes: length of one response, CRC byte excluded
+    :type response_bytes: int
+    :return: responses without their CRC bytes
+    :rtype: bytes
+    :raises CrcError: a CRC byte does not match its response
+    """
+    size = response_bytes + 1
+    verified = bytearray()
+    for offset in range(0, len(response), size):
+        data = response[offset:offset + response_bytes]
+        received_crc = response[offset + response_bytes]
+        if crc7(data) != received_crc:
+            raise CrcError(
+                f'Response CRC mismatch: {bytes(data).hex()} received with CRC 0x{received_crc:02x}, '
+                f'expected 0x{crc7(data):02x}!'
+            )
+        verified += data
+    return bytes(verified)
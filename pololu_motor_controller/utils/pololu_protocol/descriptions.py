@@ -0,0 +1,102 @@
+# Command descriptions
+# Kept apart from the command definitions and imported only when a description is first requested
+# (Command.description), so importing the driver does not build these strings.
+
+# https://www.pololu.com/docs/0J44/6.2.1
+
+
+# descriptions keyed by command byte
+DESCRIPTIONS = {
+    # Get Firmware Version
+    0x42: """This command lets you read the Simple Motor Controller product number and firmware version number. 
+    The first two bytes of the response are the low and high bytes of the product ID (each Simple Motor Controller 
+    version has a unique product ID), and the last two bytes of the response are the firmware minor and major version 
+    numbers in binary-coded decimal (BCD) format. BCD format means that the version number is the value you get when 
+    you write it in hex and then read it as if it were in decimal. For example, a minor version byte of 0x15 (21) means 
+    a the minor version number is 15, not 21.
+""",
+    # Exit Safe-Start (Serial/USB input mode only)
+    0x03: """If the Input Mode is Serial/USB, and you have not disabled Safe-start protection, then this command 
+is required before the motor can run. Specifically, this command must be issued when the controller is first powered 
+up, after any reset, and after any error stops the motor. This command has no serial response.
+If you just want your motor to run whenever possible, you can transmit Exit Safe Start and motor speed commands 
+regularly. One potential problem with this approach is that if there is an error (e.g. the battery becomes 
+disconnected) then the motor will start running immediately when the error has been resolved (e.g. the battery is 
+reconnected).
+If you want to prevent your motor from starting up unexpectedly after the controller has recovered from an error, then 
+you should only send an Exit Safe Start command after either waiting for user input or issuing a warning to the user.
+""",
+    # Motor Forward (Serial/USB input mode only)
+    0x05: """This command lets you set the full-resolution motor target speed in the forward direction. The motor 
+speed must be a number from 0 (motor stopped) to 3200 (motor forward at full speed) and is specified using two data 
+bytes. The first data byte contains the low five bits of the speed and the second data byte contains the high seven 
+bits of the speed.
+The first speed data byte can be computed by taking the full (0-3200) speed modulo 32, which is the same as dividing 
+the speed by 32, discarding the quotient, and keeping only the remainder. We can get the same result using binary math 
+by bitwise-ANDing the speed with 0x1F (31). In C (and many other programming languages), these operations can be 
+carried out with the following expressions:
+speed_byte_1 = speed % 32;
+or, equivalently:
+speed_byte_1 = speed & 0x1F;
+The second speed data byte can be computed by dividing the full (0-3200) speed by 32, discarding the remainder, and 
+keeping only the quotient (i.e. turn the division result into a whole number by dropping everything after the decimal 
+point). We can get the same result using binary math by bit-shifting the speed right five places. In C (and many other 
+programming languages), these operations can be carried out with the following expressions:
+speed_byte_2 = speed / 32;
+or, equivalently:
+speed_byte_2 = speed >> 5;
+This command has no serial response.
+""",
+    # Motor Reverse (Serial/USB input mode only)
+    0x06: """This command lets you set the full-resolution motor target speed in the reverse direction. The motor 
+speed must be a number from 0 (motor stopped) to 3200 (motor reverse at full speed) and is specified using two data 
+bytes, the first containing the low five bits of the speed and the second containing the high seven bits of the speed. 
+This command behaves the same as the Motor Forward command except the motor moves in the opposite direction.
+""",
+    # Motor Forward, 7-bit resolution (Serial/USB input mode only)
+    0x09: """This command is a lower-resolution alternative to the Motor Forward command: the motor target 
+speed in the forward direction is specified using a single data byte from 0 (motor stopped) to 127 (motor forward at 
+full speed). The controller scales the 7-bit speed to the full-resolution range, so each step corresponds to a 
+full-resolution speed change of 25. The command is one byte shorter than the full-resolution one, which makes it 
+well suited to coarse control. This command has no serial response.
+""",
+    # Motor Reverse, 7-bit resolution (Serial/USB input mode only)
+    0x0A: """This command is a lower-resolution alternative to the Motor Reverse command: the motor target 
+speed in the reverse direction is specified using a single data byte from 0 (motor stopped) to 127 (motor reverse at 
+full speed). This command behaves the same as the 7-bit Motor Forward command except the motor moves in the opposite 
+direction. This command has no serial response.
+""",
+    # Motor Brake (Serial/USB input mode only)
+    0x12: """This command causes the motor to immediately brake by the specified amount (configured deceleration 
+limits are ignored). The Brake Amount byte can have a value from 0 to 32, with 0 resulting in maximum coasting (the 
+motor leads are floating almost 100% of the time) and 32 resulting in full braking (the motor leads are shorted 
+together 100% of the time). Requesting a brake amount greater than 32 results in a Serial Format Error. This command 
+has no serial response.
+""",
+    # Stop Motor (any input mode)
+    0x60: """This command sets the motor target speed to zero and makes the controller susceptible to a 
+safe-start violation error if Safe Start is enabled. Put another way, this command will stop the motor (configured 
+deceleration limits will be respected) and not allow the motor to start again until the Safe-Start conditions required 
+by the Input Mode are satisfied. This command has no serial response.
+""",
+    # Get Variable (any input mode)
+    0x21: """This command lets you read a 16-bit variable from the Simple Motor Controller. See Section 6.4 for a 
+list of all of available variables. The value of the requested variable is transmitted as two bytes, with the low byte 
+sent first. You can reconstruct the variable value from these bytes using the following equation:
+variable_low_byte + 256 * variable_high_byte
+If the variable type is signed and the above result is greater than 32767, you will need to subtract 65536 from the 
+result to obtain the correct, signed value. Alternatively, if it is supported by the language you are using, you can 
+cast the result to a signed 16-bit data type.
+Requesting variable IDs between 41 and 127 results in a Serial Format Error, and the controller does not transmit a 
+response.
+""",
+    # Set Motor Limit (any input mode)
+    0x22: """This command lets you change the temporary motor limits (maximum speed, maximum acceleration, 
+maximum deceleration and brake duration) without saving them to the settings. The first data byte is the limit id 
+(0-3 for both directions, 4-7 for forward only, 8-11 for reverse only; in that order: max speed, max acceleration, 
+max deceleration, brake duration), the next two are the limit value low 7 bits and high 7 bits. Brake durations are 
+expressed in units of 4 ms. The response is a single byte: 0 if the limit was set, 1 if the forward limit could not be 
+set to the specified value because of the Hard Motor Limit settings, 2 for the reverse limit, 3 for both. Invalid 
+limit ids result in a Serial Format Error.
+""",
+}
@@ -0,0 +1,435 @@
+# Frame encoding
+# A complete Pololu protocol frame is the baud rate synchronization byte (0xAA), the Device Number data byte and the
+# command payload. A compact protocol frame is the command payload alone, with the MSB of the command byte set.
+# Frames whose bytes never change (Exit Safe Start, Stop Motor, Get Firmware Version and every Get Variable request)
+# are computed once per device number and shared as immutable bytes. Frames carrying a value (speed, brake amount) are
+# packed into buffers owned by each encoder, so encoding never touches the Command definitions and never allocates on
+# the setpoint path. With CRC enabled, every frame ends with its CRC-7 byte; cached frames carry it already.
+# Setpoints for several daisy-chained devices can be encoded back to back into one buffer (encode_setpoints).
+
+# https://www.pololu.com/docs/0J44/6.2
+import collections
+import enum
+import functools
+
+
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, crc7
+from pololu_motor_controller.utils.pololu_protocol.limits import check_limit
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+from pololu_motor_controller.utils.pololu_protocol.commands import (
+    BAUD_RATE_SYNC_BYTE,
+    COMPACT_COMMAND_FLAG,
+
+    Commands,
+    Protocols,
+)
+
+
+MAX_SPEED = 3200
+MAX_BRAKE_AMOUNT = 32
+
+MAX_LOW_RESOLUTION_SPEED = 127  # full speed
+LOW_RESOLUTION_SPEED_STEP = 25  # full-resolution speed change per 7-bit step
+
+
+class Resolutions(enum.Enum):
+    """
+    Resolutions
+    Speed command resolution policies.
+    """
+    FULL = 'full'  # always send the full-resolution commands (2 data bytes)
+    LOW = 'low'  # always send the 7-bit commands (1 data byte), rounding the speed to the nearest 7-bit step
+    AUTO = 'auto'  # send the 7-bit commands only when they represent the requested speed exactly
+
+
+Brake = collections.namedtuple(
+    'Brake',
+    [
+        'amount',  # brake amount [0-32]
+    ],
+)
+
+
+STATIC_COMMANDS = (
+    Commands.get_firmware_version,
+    Commands.exit_safe_start,
+    Commands.stop_motor,
+)
+
+
+def frame_header(device_number, protocol):
+    """
+    Get the bytes preceding the command byte.
+    :param device_number: device number
+    :type device_number: int
+    :param protocol: protocol
+    :type protocol: Protocols
+    :return: header
+    :rtype: bytes
+    """
+    if protocol is Protocols.COMPACT:
+        return b''
+    return bytes([BAUD_RATE_SYNC_BYTE, device_number])
+
+
+def command_byte(command, protocol):
+    """
+    Get the command byte of a command, as sent with the specified protocol.
+    :param command: command
+    :type command: Commands
+    :param protocol: protocol
+    :type protocol: Protocols
+    :return: command byte
+    :rtype: int
+    """
+    if protocol is Protocols.COMPACT:
+        return command.value.payload[0] | COMPACT_COMMAND_FLAG
+    return command.value.payload[0]
+
+
+def encode_payload(device_number, protocol, command, payload, crc=False):
+    """
+    Build a complete frame from a command payload.
+    :param device_number: device number
+    :type device_number: int
+    :param protocol: protocol
+    :type protocol: Protocols
+    :param command: command
+    :type command: Commands
+    :param payload: command payload, command byte included (as defined for the Pololu protocol)
+    :type payload: bytes or bytearray
+    :param crc: append the CRC-7 byte
+    :type crc: bool
+    :return: frame
+    :rtype: bytes
+    """
+    frame = frame_header(device_number, protocol) + bytes([command_byte(command, protocol)]) + bytes(payload[1:])
+    if crc:
+        frame += bytes([crc7(frame)])
+    return frame
+
+
+def use_low_resolution(speed, resolution):
+    """
+    Check whether a speed is to be sent with the 7-bit commands.
+    :param speed: desired speed [0-3200]
+    :type speed: int
+    :param resolution: resolution policy
+    :type resolution: Resolutions
+    :return: True for the 7-bit commands, False for the full-resolution ones
+    :rtype: bool
+    """
+    if resolution is Resolutions.FULL:
+        return False
+    if resolution is Resolutions.LOW:
+        return True
+    # the top 7-bit step is full speed (3200), every other one a multiple of the step below 127 steps
+    if speed == MAX_SPEED:
+        return True
+    return speed % LOW_RESOLUTION_SPEED_STEP == 0 and speed < MAX_LOW_RESOLUTION_SPEED * LOW_RESOLUTION_SPEED_STEP
+
+
+def low_resolution_speed(speed):
+    """
+    Convert a full-resolution speed to the nearest 7-bit speed. 127 stands for full speed (3200) rather than 127
+    steps, so it is only chosen when full speed is strictly the nearest.
+    :param speed: desired speed [0-3200]
+    :type speed: int
+    :return: 7-bit speed [0-127]
+    :rtype: int
+    """
+    steps = min((speed + LOW_RESOLUTION_SPEED_STEP // 2) // LOW_RESOLUTION_SPEED_STEP, MAX_LOW_RESOLUTION_SPEED - 1)
+    if MAX_SPEED - speed < abs(speed - steps * LOW_RESOLUTION_SPEED_STEP):
+        return MAX_LOW_RESOLUTION_SPEED
+    return steps
+
+
+def encode_setpoints(setpoints, crc=False):
+    """
+    Encode setpoints for several devices on one line as one buffer of Pololu protocol frames, in the given order:
+    Motor Forward or Motor Reverse for signed speeds, Motor Brake for Brake setpoints.
+    :param setpoints: signed speed [-3200, 3200] or Brake keyed by device number
+    :type setpoints: dict
+    :param crc: append the CRC-7 byte to every frame, or only to the frames of the devices mapped to True
+    :type crc: bool or dict
+    :return: frames, and the length of the first one
+    :rtype: tuple
+    """
+    buffer = bytearray()
+    first_frame = 0
+    for device_number, setpoint in setpoints.items():
+        if isinstance(setpoint, Brake):
+            if setpoint.amount < 0 or setpoint.amount > MAX_BRAKE_AMOUNT:
+                raise ValueError(
+                    f'Invalid brake amount: {setpoint.amount}! Must be within interval [0, {MAX_BRAKE_AMOUNT}]! '
+                )
+            command, payload = Commands.motor_brake, (0x00, setpoint.amount)
+        else:
+            if abs(setpoint) > MAX_SPEED:
+                raise ValueError(f'Invalid speed: {setpoint}! Must be within interval [-{MAX_SPEED}, {MAX_SPEED}]! ')
+            command = Commands.motor_forward if setpoint >= 0 else Commands.motor_reverse
+            speed = abs(setpoint)
+            payload = (0x00, speed & 0x1F, speed >> 5)  # as specified in documentation
+        device_crc = crc.get(device_number, False) if isinstance(crc, dict) else crc
+        frame = encode_payload(device_number, Protocols.POLOLU, command, payload, device_crc)
+        if not buffer:
+            first_frame = len(frame)
+        buffer += frame
+    return bytes(buffer), first_frame
+
+
+@functools.lru_cache(maxsize=None)
+def static_frames(device_number, protocol=Protocols.POLOLU, crc=False):
+    """
+    Precompute the frames that never change for a device number.
+    :param device_number: device number
+    :type device_number: int
+    :param protocol: protocol
+    :type protocol: Protocols
+    :param crc: append the CRC-7 byte
+    :type crc: bool
+    :return: command frames keyed by command and Get Variable frames keyed by variable
+    :rtype: tuple
+    """
+    command_frames = {
+        command: encode_payload(device_number, protocol, command, command.value.payload, crc)
+        for command in STATIC_COMMANDS
+    }
+    variable_frames = {
+        variable: encode_payload(device_number, protocol, Commands.get_variable, bytes([0x00, variable.value]), crc)
+        for variable in Variables
+    }
+    return command_frames, variable_frames
+
+
+class FrameEncoder:
+    """
+    FrameEncoder
+    Builds complete frames for one device number without modifying the shared Command definitions.
+    """
+    def __init__(self, device_number, protocol=Protocols.POLOLU, crc=CrcModes.DISABLED):
+        """
+        Initializer
+        :param device_number: device number (ignored by the compact protocol)
+        :type device_number: int
+        :param protocol: protocol
+        :type protocol: Protocols
+        :param crc: CRC mode configured on the controller
+        :type crc: CrcModes
+        """
+        if device_number < 0 or device_number > 127:
+            raise ValueError(f'Invalid device number: {device_number}! Must be within interval [0, 127]! ')
+
+        self.__device_number = device_number
+        self.__protocol = protocol
+        self.__crc_mode = crc
+        self.__crc = crc is not CrcModes.DISABLED
+        self.__command_frames, self.__variable_frames = static_frames(device_number, protocol, self.__crc)
+
+        # reusable buffers for the frames carrying a value, CRC byte included
+        header = frame_header(device_number, protocol)
+        crc_byte = bytes(1) if self.__crc else b''
+        self.__command_index = len(header)
+        self.__speed_frame = bytearray(header + bytes(3) + crc_byte)
+        self.__low_resolution_speed_frame = bytearray(header + bytes(2) + crc_byte)
+        self.__brake_frame = bytearray(header + bytes([command_byte(Commands.motor_brake, protocol), 0]) + crc_byte)
+
+    @property
+    def device_number(self):
+        """
+        Get device number.
+        :return: device number
+        :rtype: int
+        """
+        return self.__device_number
+
+    @property
+    def protocol(self):
+        """
+        Get protocol.
+        :return: protocol
+        :rtype: Protocols
+        """
+        return self.__protocol
+
+    @property
+    def crc(self):
+        """
+        Get CRC mode.
+        :return: CRC mode
+        :rtype: CrcModes
+        """
+        return self.__crc_mode
+
+    @property
+    def response_crc(self):
+        """
+        Get whether every response ends with a CRC byte.
+        :return: response CRC enabled
+        :rtype: bool
+        """
+        return self.__crc_mode is CrcModes.COMMANDS_AND_RESPONSES
+
+    def __seal(self, frame):
+        """
+        Write the CRC byte of a reusable frame buffer, if CRC is enabled.
+        :param frame: frame buffer, CRC byte included
+        :type frame: bytearray
+        :return: frame
+        :rtype: bytearray
+        """
+        if self.__crc:
+            frame[-1] = crc7(frame, len(frame) - 1)
+        return frame
+
+    def command(self, command):
+        """
+        Get the frame of a command as currently defined by its payload. Static commands are served from the cache.
+        :param command: command to be encoded
+        :type command: Commands
+        :return: frame
+        :rtype: bytes
+        """
+        frame = self.__command_frames.get(command)
+        if frame is None:
+            frame = encode_payload(self.__device_number, self.__protocol, command, command.value.payload, self.__crc)
+        return frame
+
+    def get_variable(self, variable):
+        """
+        Get the Get Variable frame of a variable.
+        :param variable: variable to be read
+        :type variable: Variables
+        :return: frame
+        :rtype: bytes
+        """
+        return self.__variable_frames[variable]
+
+    def get_variables(self, variables):
+        """
+        Get the Get Variable frames of several variables as one buffer.
+        :param variables: variables to be read
+        :type variables: iterable of Variables
+        :return: frames
+        :rtype: bytes
+        """
+        variable_frames = self.__variable_frames
+        return b''.join([variable_frames[variable] for variable in variables])
+
+    def __speed(self, command, speed):
+        """
+        Pack a full-resolution speed frame into the reusable speed buffer.
+        :param command: Motor Forward or Motor Reverse
+        :type command: Commands
+        :param speed: desired speed [0-3200]
+        :type speed: int
+        :return: frame, valid until the next speed frame is encoded
+        :rtype: bytearray
+        """
+        if speed < 0 or speed > MAX_SPEED:
+            raise ValueError(f'Invalid speed: {speed}! Must be within interval [0, {MAX_SPEED}]! ')
+
+        frame = self.__speed_frame
+        index = self.__command_index
+        frame[index] = command_byte(command, self.__protocol)
+        frame[index + 1] = speed & 0x1F  # as specified in documentation
+        frame[index + 2] = speed >> 5  # as specified in documentation
+        return self.__seal(frame)
+
+    def motor_forward(self, speed):
+        """
+        Get the Motor Forward frame.
+        :param speed: desired speed [0-3200]
+        :type speed: int
+        :return: frame, valid until the next speed frame is encoded
+        :rtype: bytearray
+        """
+        return self.__speed(Commands.motor_forward, speed)
+
+    def motor_reverse(self, speed):
+        """
+        Get the Motor Reverse frame.
+        :param speed: desired speed [0-3200]
+        :type speed: int
+        :return: frame, valid until the next speed frame is encoded
+        :rtype: bytearray
+        """
+        return self.__speed(Commands.motor_reverse, speed)
+
+    def __low_resolution_speed(self, command, speed):
+        """
+        Pack a 7-bit speed frame into the reusable 7-bit speed buffer.
+        :param command: 7-bit Motor Forward or 7-bit Motor Reverse
+        :type command: Commands
+        :param speed: desired speed [0-3200], rounded to the nearest 7-bit step
+        :type speed: int
+        :return: frame, valid until the next 7-bit speed frame is encoded
+        :rtype: bytearray
+        """
+        if speed < 0 or speed > MAX_SPEED:
+            raise ValueError(f'Invalid speed: {speed}! Must be within interval [0, {MAX_SPEED}]! ')
+
+        frame = self.__low_resolution_speed_frame
+        index = self.__command_index
+        frame[index] = command_byte(command, self.__protocol)
+        frame[index + 1] = low_resolution_speed(speed)
+        return self.__seal(frame)
+
+    def motor_forward_low_resolution(self, speed):
+        """
+        Get the 7-bit Motor Forward frame.
+        :param speed: desired speed [0-3200], rounded to the nearest 7-bit step
+        :type speed: int
+        :return: frame, valid until the next 7-bit speed frame is encoded
+        :rtype: bytearray
+        """
+        return self.__low_resolution_speed(Commands.motor_forward_low_resolution, speed)
+
+    def motor_reverse_low_resolution(self, speed):
+        """
+        Get the 7-bit Motor Reverse frame.
+        :param speed: desired speed [0-3200], rounded to the nearest 7-bit step
+        :type speed: int
+        :return: frame, valid until the next 7-bit speed frame is encoded
+        :rtype: bytearray
+        """
+        return self.__low_resolution_speed(Commands.motor_reverse_low_resolution, speed)
+
+    def motor_brake(self, brake_amount):
+        """
+        Get the Motor Brake frame.
+        :param brake_amount: desired brake amount [0-32]
+        :type brake_amount: int
+        :return: frame, valid until the next brake frame is encoded
+        :rtype: bytearray
+        """
+        if brake_amount < 0 or brake_amount > MAX_BRAKE_AMOUNT:
+            raise ValueError(f'Invalid brake amount: {brake_amount}! Must be within interval [0, {MAX_BRAKE_AMOUNT}]! ')
+
+        frame = self.__brake_frame
+        frame[self.__command_index + 1] = brake_amount
+        return self.__seal(frame)
+
+    def set_motor_limit(self, limit, value):
+        """
+        Get the Set Motor Limit frame of a limit.
+        :param limit: limit
+        :type limit: MotorLimits
+        :param value: limit value; brake durations in units of 4 ms
+        :type value: int
+        :return: frame
+        :rtype: bytes
+        """
+        check_limit(limit, value)
+        payload = bytes([0x00, limit.value, value & 0x7F, value >> 7])  # as specified in documentation
+        return encode_payload(self.__device_number, self.__protocol, Commands.set_motor_limit, payload, self.__crc)
+
+    def set_motor_limits(self, limits):
+        """
+        Get the Set Motor Limit frames of several limits as one buffer.
+        :param limits: values keyed by limit
+        :type limits: dict
+        :return: frames
+        :rtype: bytes
+        """
+        return b''.join([self.set_motor_limit(limit, value) for limit, value in limits.items()])
@@ -0,0 +1,156 @@
+# Temporary motor limits
+# Set with the Set Motor Limit command, read back through the Temporary Motor Limits variables. Each limit applies to
+# both directions or to one direction only, depending on its limit id.
+
+# https://www.pololu.com/docs/0J44/6.2.1
+import collections
+import enum
+
+
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+
+
+MAX_LIMIT_VALUE = 3200  # max speed, max acceleration and max deceleration
+MAX_BRAKE_DURATION = 4096  # in units of 4 ms (16384 ms)
+BRAKE_DURATION_UNIT = 4  # ms per Set Motor Limit brake duration unit; Get Variable reports brake durations in ms
+MOTOR_LIMIT_RESPONSE_BYTES = 1
+
+
+class MotorLimits(enum.Enum):
+    """
+    MotorLimits
+    Set Motor Limit limit ids.
+    """
+    MAX_SPEED = 0
+    MAX_ACCELERATION = 1
+    MAX_DECELERATION = 2
+    BRAKE_DURATION = 3
+    MAX_SPEED_FORWARD = 4
+    MAX_ACCELERATION_FORWARD = 5
+    MAX_DECELERATION_FORWARD = 6
+    BRAKE_DURATION_FORWARD = 7
+    MAX_SPEED_REVERSE = 8
+    MAX_ACCELERATION_REVERSE = 9
+    MAX_DECELERATION_REVERSE = 10
+    BRAKE_DURATION_REVERSE = 11
+
+
+class LimitConflicts(enum.IntFlag):
+    """
+    LimitConflicts
+    Set Motor Limit response: directions whose limit could not be set to the requested value because of the Hard Motor
+    Limit settings.
+    """
+    FORWARD = 1 << 0
+    REVERSE = 1 << 1
+
+
+# variable holding each one-direction limit, in profile order
+LIMIT_VARIABLES = collections.OrderedDict((
+    (MotorLimits.MAX_SPEED_FORWARD, Variables.MAX_SPEED_FORWARD),
+    (MotorLimits.MAX_ACCELERATION_FORWARD, Variables.MAX_ACCELERATION_FORWARD),
+    (MotorLimits.MAX_DECELERATION_FORWARD, Variables.MAX_DECELERATION_FORWARD),
+    (MotorLimits.BRAKE_DURATION_FORWARD, Variables.BRAKE_DURATION_FORWARD),
+    (MotorLimits.MAX_SPEED_REVERSE, Variables.MAX_SPEED_REVERSE),
+    (MotorLimits.MAX_ACCELERATION_REVERSE, Variables.MAX_ACCELERATION_REVERSE),
+    (MotorLimits.MAX_DECELERATION_REVERSE, Variables.MAX_DECELERATION_REVERSE),
+    (MotorLimits.BRAKE_DURATION_REVERSE, Variables.BRAKE_DURATION_REVERSE),
+))
+
+# one-direction limits set together by each both-directions limit id
+BOTH_DIRECTIONS = {
+    MotorLimits.MAX_SPEED: (MotorLimits.MAX_SPEED_FORWARD, MotorLimits.MAX_SPEED_REVERSE),
+    MotorLimits.MAX_ACCELERATION: (MotorLimits.MAX_ACCELERATION_FORWARD, MotorLimits.MAX_ACCELERATION_REVERSE),
+    MotorLimits.MAX_DECELERATION: (MotorLimits.MAX_DECELERATION_FORWARD, MotorLimits.MAX_DECELERATION_REVERSE),
+    MotorLimits.BRAKE_DURATION: (MotorLimits.BRAKE_DURATION_FORWARD, MotorLimits.BRAKE_DURATION_REVERSE),
+}
+
+
+MotorLimitProfile = collections.namedtuple(
+    'MotorLimitProfile',
+    [
+        'max_speed_forward',  # [0-3200]
+        'max_acceleration_forward',  # speed change per update period (1 ms) [0-3200], 0 means no limit
+        'max_deceleration_forward',  # speed change per update period (1 ms) [0-3200], 0 means no limit
+        'brake_duration_forward',  # time spent braking before reversing, in units of 4 ms [0-4096]
+        'max_speed_reverse',
+        'max_acceleration_reverse',
+        'max_deceleration_reverse',
+        'brake_duration_reverse',
+    ],
+    defaults=(None, ) * 8,  # None leaves the limit unchanged
+)
+
+
+def check_limit(limit, value):
+    """
+    Check a limit value.
+    :param limit: limit
+    :type limit: MotorLimits
+    :param value: limit value
+    :type value: int
+    :return: None
+    :raises ValueError: the value is out of range
+    """
+    maximum = MAX_BRAKE_DURATION if is_brake_duration(limit) else MAX_LIMIT_VALUE
+    if value < 0 or value > maximum:
+        raise ValueError(f'Invalid {limit.name} limit: {value}! Must be within interval [0, {maximum}]! ')
+
+
+def is_brake_duration(limit):
+    """
+    Check whether a limit is a brake duration.
+    :param limit: limit
+    :type limit: MotorLimits
+    :return: True for brake durations
+    :rtype: bool
+    """
+    return limit.name.startswith('BRAKE_DURATION')
+
+
+def limit_value(limit, value):
+    """
+    Convert a Temporary Motor Limits variable value to its Set Motor Limit value (brake durations: ms to 4 ms units).
+    :param limit: one-direction limit
+    :type limit: MotorLimits
+    :param value: variable value
+    :type value: int
+    :return: limit value
+    :rtype: int
+    """
+    return value // BRAKE_DURATION_UNIT if is_brake_duration(limit) else value
+
+
+def profile_limits(profile):
+    """
+    Get the one-direction limits set by a profile.
+    :param profile: limit profile
+    :type profile: MotorLimitProfile
+    :return: values keyed by limit, in profile order
+    :rtype: dict
+    """
+    limits = {limit: value for limit, value in zip(LIMIT_VARIABLES, profile) if value is not None}
+    for limit, value in limits.items():
+        check_limit(limit, value)
+    return limits
+
+
+def limit_changes(current, target):
+    """
+    Compute the Set Motor Limit commands turning the current limits into the target ones. A limit changed to the same
+    value in both directions is set with one both-directions command.
+    :param current: current values keyed by one-direction limit
+    :type current: dict
+    :param target: target values keyed by one-direction limit
+    :type target: dict
+    :return: values keyed by limit id to be sent, in limit id order
+    :rtype: dict
+    """
+    changed = {limit: value for limit, value in target.items() if current.get(limit) != value}
+    changes = {}
+    for both, (forward, reverse) in BOTH_DIRECTIONS.items():
+        if forward in changed and changed.get(reverse) == changed[forward]:
+            changes[both] = changed.pop(forward)
+            del changed[reverse]
+    changes.update(changed)
+    return dict(sorted(changes.items(), key=lambda item: item[0].value))
@@ -1,4 +1,7 @@
+import collections
 import enum
+import functools
+import struct
 
 
 class Variables(enum.Enum):
@@ -58,3 +61,181 @@ class Variables(enum.Enum):
     MAX_DECELERATION_REVERSE = 38
     BRAKE_DURATION_REVERSE = 39
     # ==================================================================================================================
+
+
+class ErrorStatus(enum.IntFlag):
+    """
+    ErrorStatus
+    ERROR_STATUS bits (errors currently stopping the motor), also used by ERRORS_OCCURRED (latched, cleared when read).
+    """
+    SAFE_START_VIOLATION = 1 << 0
+    REQUIRED_CHANNEL_INVALID = 1 << 1
+    SERIAL_ERROR = 1 << 2  # details in SERIAL_ERRORS_OCCURRED
+    COMMAND_TIMEOUT = 1 << 3
+    LIMIT_KILL_SWITCH = 1 << 4
+    LOW_VIN = 1 << 5
+    HIGH_VIN = 1 << 6
+    OVER_TEMPERATURE = 1 << 7
+    MOTOR_DRIVER_ERROR = 1 << 8
+    ERR_LINE_HIGH = 1 << 9
+
+
+class LimitStatus(enum.IntFlag):
+    """
+    LimitStatus
+    LIMIT_STATUS bits: what is currently keeping the motor from reaching its target speed.
+    """
+    MOTOR_NOT_ALLOWED_TO_RUN = 1 << 0  # errors, or stopped by the limit/kill switches
+    TEMPERATURE_REDUCING_SPEED = 1 << 1
+    MAX_SPEED_LIMIT = 1 << 2
+    BELOW_STARTING_SPEED = 1 << 3
+    ACCELERATION_LIMIT = 1 << 4  # acceleration, deceleration or brake duration limiting
+    RC1_KILL_SWITCH = 1 << 5
+    RC2_KILL_SWITCH = 1 << 6
+    AN1_KILL_SWITCH = 1 << 7
+    AN2_KILL_SWITCH = 1 << 8
+    USB_KILL_SWITCH = 1 << 9
+
+
+class SerialErrors(enum.IntFlag):
+    """
+    SerialErrors
+    SERIAL_ERRORS_OCCURRED bits. Latched, cleared when the variable is read.
+    """
+    FRAME = 1 << 1  # a de-synchronization or excessive noise on the RX line: the stop bit was not detected
+    NOISE = 1 << 2  # noise detected on the RX line
+    RX_OVERRUN = 1 << 3  # the receive buffer filled up before its bytes could be processed
+    FORMAT = 1 << 4  # the received command packet did not match the expected format
+    CRC = 1 << 5  # the received command packet failed its CRC-7 check (CRC enabled only)
+
+
+VARIABLE_RESPONSE_BYTES = 2
+
+
+VariableDefinition = collections.namedtuple(
+    'VariableDefinition',
+    [
+        'signed',  # True if the 16-bit value is two's complement
+        'scale',  # physical value = raw value * scale / divisor
+        'divisor',
+        'unit',  # physical unit, None for counts, flags and raw values
+        'high',  # variable holding the high 16 bits of a 32-bit value, None if the value fits in 16 bits
+    ],
+    defaults=(False, 1, 1, None, None),
+)
+
+
+# https://www.pololu.com/docs/0J44/6.4
+VARIABLE_DEFINITIONS = {
+    # Status Flag Registers
+    # ==================================================================================================================
+    Variables.ERROR_STATUS: VariableDefinition(),
+    Variables.ERRORS_OCCURRED: VariableDefinition(),
+    Variables.SERIAL_ERRORS_OCCURRED: VariableDefinition(),
+    Variables.LIMIT_STATUS: VariableDefinition(),
+    Variables.RESET_FLAGS: VariableDefinition(),
+    # ==================================================================================================================
+
+    # RC Channel Inputs
+    # ==================================================================================================================
+    Variables.RC1_UNLIMITED_RAW_VALUE: VariableDefinition(divisor=4, unit='µs'),
+    Variables.RC1_RAW_VALUE: VariableDefinition(divisor=4, unit='µs'),
+    Variables.RC1_SCALED_VALUE: VariableDefinition(signed=True),
+    Variables.RC2_UNLIMITED_RAW_VALUE: VariableDefinition(divisor=4, unit='µs'),
+    Variables.RC2_RAW_VALUE: VariableDefinition(divisor=4, unit='µs'),
+    Variables.RC2_SCALED_VALUE: VariableDefinition(signed=True),
+    # ==================================================================================================================
+
+    # Analog Channel Inputs
+    # ==================================================================================================================
+    Variables.AN1_UNLIMITED_RAW_VALUE: VariableDefinition(),
+    Variables.AN1_RAW_VALUE: VariableDefinition(),
+    Variables.AN1_SCALED_VALUE: VariableDefinition(signed=True),
+    Variables.AN2_UNLIMITED_RAW_VALUE: VariableDefinition(),
+    Variables.AN2_RAW_VALUE: VariableDefinition(),
+    Variables.AN2_SCALED_VALUE: VariableDefinition(signed=True),
+    # ==================================================================================================================
+
+    # Diagnostic Variables
+    # ==================================================================================================================
+    Variables.TARGET_SPEED: VariableDefinition(signed=True),
+    Variables.SPEED: VariableDefinition(signed=True),
+    Variables.BRAKE_AMOUNT: VariableDefinition(),
+    Variables.INPUT_VOLTAGE: VariableDefinition(unit='mV'),
+    Variables.TEMPERATURE: VariableDefinition(divisor=10, unit='°C'),
+    Variables.RC_PERIOD: VariableDefinition(divisor=10, unit='ms'),
+    Variables.BAUD_RATE_REGISTER: VariableDefinition(),  # baud rate = 72000000 / value
+    Variables.SYSTEM_TIME_LOW: VariableDefinition(unit='ms', high=Variables.SYSTEM_TIME_HIGH),
+    Variables.SYSTEM_TIME_HIGH: VariableDefinition(),
+    # ==================================================================================================================
+
+    # Temporary Motor Limits
+    # ==================================================================================================================
+    Variables.MAX_SPEED_FORWARD: VariableDefinition(),
+    Variables.MAX_ACCELERATION_FORWARD: VariableDefinition(),
+    Variables.MAX_DECELERATION_FORWARD: VariableDefinition(),
+    Variables.BRAKE_DURATION_FORWARD: VariableDefinition(unit='ms'),
+    Variables.MAX_SPEED_REVERSE: VariableDefinition(),
+    Variables.MAX_ACCELERATION_REVERSE: VariableDefinition(),
+    Variables.MAX_DECELERATION_REVERSE: VariableDefinition(),
+    Variables.BRAKE_DURATION_REVERSE: VariableDefinition(unit='ms'),
+    # ==================================================================================================================
+}
+
+
+@functools.lru_cache(maxsize=256)
+def response_format(variables):
+    """
+    Get the precompiled format of the responses of consecutive Get Variable requests.
+    :param variables: requested variables, in request order
+    :type variables: tuple of Variables
+    :return: format unpacking every response in one call
+    :rtype: struct.Struct
+    """
+    return struct.Struct('<' + ''.join('h' if VARIABLE_DEFINITIONS[variable].signed else 'H' for variable in variables))
+
+
+def decode_variables(variables, response):
+    """
+    Decode the responses of consecutive Get Variable requests, with one unpack call.
+    :param variables: requested variables, in request order
+    :type variables: list of Variables
+    :param response: received response bytes
+    :type response: bytes
+    :return: raw 16-bit values (two's complement decoded for signed variables) keyed by variable
+    :rtype: dict
+    """
+    variables = tuple(variables)
+    return dict(zip(variables, response_format(variables).unpack_from(response)))
+
+
+def scale_value(variable, value):
+    """
+    Convert a raw value to its physical unit.
+    :param variable: variable
+    :type variable: Variables
+    :param value: raw value
+    :type value: int
+    :return: value in the variable's unit
+    :rtype: int or float
+    """
+    definition = VARIABLE_DEFINITIONS[variable]
+    if definition.divisor != 1:
+        return value * definition.scale / definition.divisor
+    return value * definition.scale
+
+
+def combine_values(values):
+    """
+    Combine the 16-bit halves of the 32-bit variables present in values.
+    :param values: raw values keyed by variable
+    :type values: dict
+    :return: 32-bit values keyed by their low variable (e.g. SYSTEM_TIME_LOW)
+    :rtype: dict
+    """
+    combined = {}
+    for variable, value in values.items():
+        high = VARIABLE_DEFINITIONS[variable].high
+        if high is not None and high in values:
+            combined[variable] = value | values[high] << 16
+    return combined
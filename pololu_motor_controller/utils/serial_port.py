@@ -0,0 +1,28 @@
+# Serial port opening, shared by the transports
+# pyserial is imported on the first port opened, so it is not needed when every transport gets an already opened
+# connection (e.g. EmulatedSerial).
+
+
+def open_serial_port(com_port, baud_rate, timeout=None):
+    """
+    Open a serial port, 8 data bits, no parity, 1 stop bit.
+    :param com_port: COM Port
+    :type com_port: str
+    :param baud_rate: baud rate
+    :type baud_rate: int
+    :param timeout: read timeout, in seconds; 0 for non-blocking reads, block until enough bytes are read if None
+    :type timeout: float
+    :return: connection
+    :rtype: serial.Serial
+    :raises Exception: the port could not be opened (pyserial missing included)
+    """
+    import serial
+
+    return serial.Serial(
+        port=com_port,
+        baudrate=baud_rate,
+        timeout=timeout,
+        bytesize=8,
+        parity='N',
+        stopbits=1,
+    )
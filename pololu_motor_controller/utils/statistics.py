@@ -0,0 +1,17 @@
+import math
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest-rank percentile.
+    :param ordered: sorted samples
+    :type ordered: list
+    :param fraction: percentile, as a fraction [0, 1]
+    :type fraction: float
+    :return: percentile
+    :rtype: float
+    """
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,236 @@
+import collections
+import concurrent.futures
+import queue
+import threading
+
+
+DEFAULT_MAX_BATCH = 32  # maximum number of queued requests written as one buffer
+
+
+ExchangeRequest = collections.namedtuple(
+    'ExchangeRequest',
+    [
+        'frame',  # bytes to be sent, owned by the request (never a reusable encoder buffer)
+        'expected_bytes',  # number of expected response bytes
+        'command',  # command the frame was encoded for, None if unknown
+        'instrumentation',  # instrumentation the exchange is recorded to, None if disabled
+        'frames',  # number of frames in frame
+        'timeout',  # response timeout, in seconds; wait forever if None
+        'device_number',  # device the frames are addressed to, None if unknown
+        'future',  # future receiving the response bytes
+    ],
+)
+
+
+class IoWorker:
+    """
+    IoWorker
+    Dedicated thread owning a bus: any thread submits exchanges and gets futures back. Consecutive requests queued
+    while the worker is busy are written to the port as one buffer and their responses are read back with one read,
+    then handed back to each request in order. Only requests to the same device sharing their command, instrumentation
+    and timeout are batched together, so every batch is recorded under its own command and controller, devices on a
+    daisy chain never answer at the same time and an unresponsive device cannot fail the requests of another one. A
+    failed batch (e.g. a response timeout) fails every request of the batch.
+    """
+    def __init__(self, bus, max_batch=DEFAULT_MAX_BATCH):
+        """
+        Initializer
+        :param bus: bus the exchanges are sent through
+        :type bus: PololuBus
+        :param max_batch: maximum number of requests written as one buffer
+        :type max_batch: int
+        """
+        self.__bus = bus
+        self.__max_batch = max_batch
+
+        self.__queue = queue.SimpleQueue()
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__requests = 0
+        self.__batches = 0
+
+    def __log_error(self, error):  # noqa
+        """
+
+        :param error:
+        :return:
+        """
+        print(error)
+
+    def start(self):
+        """
+        Start the worker thread.
+        :return: None
+        """
+        with self.__lock:
+            if self.running:
+                return
+            self.__thread = threading.Thread(
+                target=self.__run, name=f'IoWorker-{self.__bus.com_port}', daemon=True,
+            )
+            self.__thread.start()
+
+    def stop(self):
+        """
+        Stop the worker thread, after the requests already queued.
+        :return: None
+        """
+        with self.__lock:
+            thread, self.__thread = self.__thread, None
+        if thread is None:
+            return
+        self.__queue.put(None)
+        if thread is not threading.current_thread():
+            thread.join()
+
+    def submit(self, frame, expected_bytes=0, command=None, instrumentation=None, frames=1, timeout=None,
+               device_number=None):
+        """
+        Queue an exchange.
+        :param frame: bytes to be sent; copied if mutable
+        :type frame: bytes or bytearray
+        :param expected_bytes: number of expected response bytes
+        :type expected_bytes: int
+        :param command: command the bytes were encoded for, reported to instrumentation
+        :type command: Commands
+        :param instrumentation: instrumentation the exchange is recorded to, if any
+        :type instrumentation: Instrumentation
+        :param frames: number of frames in frame
+        :type frames: int
+        :param timeout: response timeout, in seconds; wait forever if None
+        :type timeout: float
+        :param device_number: device the frames are addressed to, None if unknown
+        :type device_number: int
+        :return: future receiving the response bytes
+        :rtype: concurrent.futures.Future
+        """
+        if not self.running:
+            self.start()
+        future = concurrent.futures.Future()
+        request = ExchangeRequest(
+            bytes(frame), expected_bytes, command, instrumentation, frames, timeout, device_number, future,
+        )
+        self.__queue.put(request)
+        return future
+
+    def exchange(self, frame, expected_bytes=0, command=None, instrumentation=None, frames=1, timeout=None,
+                 device_number=None):
+        """
+        Queue an exchange and wait for its response.
+        :return: received bytes
+        :rtype: bytes
+        :raises ResponseTimeoutError: the response was not received in time
+        """
+        return self.submit(frame, expected_bytes, command, instrumentation, frames, timeout, device_number).result()
+
+    @staticmethod
+    def __batch_key(request):
+        """
+        Get what requests must share to be batched together.
+        :param request: request
+        :type request: ExchangeRequest
+        :return: key
+        :rtype: tuple
+        """
+        return request.device_number, request.command, id(request.instrumentation), request.timeout
+
+    def __run(self):
+        """
+        Worker loop: wait for a request, take the matching requests queued right behind it and exchange them as one
+        batch. The first request not matching starts the next batch.
+        :return: None
+        """
+        pending = None  # request taken from the queue that did not match the previous batch
+        stopping = False
+        while not stopping:
+            request = self.__queue.get() if pending is None else pending
+            pending = None
+            if request is None:
+                return
+            batch = [request]
+            key = self.__batch_key(request)
+            while len(batch) < self.__max_batch:
+                try:
+                    request = self.__queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                if self.__batch_key(request) != key:
+                    pending = request
+                    break
+                batch.append(request)
+
+            self.__exchange([queued for queued in batch if queued.future.set_running_or_notify_cancel()])
+
+    def __exchange(self, batch):
+        """
+        Exchange a batch of requests and hand the responses back.
+        :param batch: requests, in queue order
+        :type batch: list of ExchangeRequest
+        :return: None
+        """
+        if not batch:
+            return
+        self.__requests += len(batch)
+        self.__batches += 1
+
+        if len(batch) == 1:
+            request = batch[0]
+            try:
+                request.future.set_result(self.__bus.exchange(
+                    request.frame, request.expected_bytes, request.command, request.instrumentation, request.frames,
+                    request.timeout,
+                ))
+            except Exception as exception:
+                request.future.set_exception(exception)
+            return
+
+        first = batch[0]  # every request of the batch shares its device, command, instrumentation and timeout
+        try:
+            response = self.__bus.exchange(
+                b''.join(request.frame for request in batch),
+                sum(request.expected_bytes for request in batch),
+                first.command,
+                first.instrumentation,
+                sum(request.frames for request in batch),
+                first.timeout,
+            )
+        except Exception as exception:
+            self.__log_error(f'Failed to exchange a batch of {len(batch)} requests!\n{exception}')
+            for request in batch:
+                request.future.set_exception(exception)
+            return
+
+        offset = 0
+        for request in batch:
+            request.future.set_result(response[offset:offset + request.expected_bytes])
+            offset += request.expected_bytes
+
+    @property
+    def running(self):
+        """
+        Get running status.
+        :return: running
+        :rtype: bool
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    @property
+    def requests(self):
+        """
+        Get number of requests exchanged.
+        :return: requests
+        :rtype: int
+        """
+        return self.__requests
+
+    @property
+    def batches(self):
+        """
+        Get number of batches written (one write and one read each).
+        :return: batches
+        :rtype: int
+        """
+        return self.__batches
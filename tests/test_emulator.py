@@ -0,0 +1,55 @@
+import threading
+
+
+from pololu_motor_controller.bus import PololuBus
+from pololu_motor_controller.emulator import EmulatedSerial, SimpleMotorControllerEmulator
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+
+
+VOLTAGES = {1: 11000, 2: 22000}
+
+
+def chain():
+    devices = [SimpleMotorControllerEmulator(device_number=number, input_voltage=voltage)
+               for number, voltage in VOLTAGES.items()]
+    return EmulatedSerial(devices, simulate_timing=False)
+
+
+def test_responses_follow_frame_order():
+    connection = chain()
+    variable = Variables.INPUT_VOLTAGE.value
+    connection.write(bytes([0xAA, 2, 0x21, variable, 0xAA, 1, 0x21, variable]))
+    response = connection.read(4)
+    assert int.from_bytes(response[:2], 'little') == VOLTAGES[2]
+    assert int.from_bytes(response[2:], 'little') == VOLTAGES[1]
+
+
+def test_frame_split_across_writes():
+    connection = chain()
+    connection.write(bytes([0xAA, 2, 0x21]))
+    connection.write(bytes([Variables.INPUT_VOLTAGE.value, 0xAA, 1, 0x21, Variables.INPUT_VOLTAGE.value]))
+    response = connection.read(4)
+    assert int.from_bytes(response[:2], 'little') == VOLTAGES[2]
+    assert int.from_bytes(response[2:], 'little') == VOLTAGES[1]
+
+
+def test_threaded_controllers_read_their_own_device():
+    bus = PololuBus(None, connection=chain())
+    controllers = {number: bus.device(number, threaded=True, timeout=1.0) for number in VOLTAGES}
+    wrong = []
+
+    def read(number):
+        for _ in range(200):
+            value = controllers[number].get_variable(Variables.INPUT_VOLTAGE)
+            if value != VOLTAGES[number]:
+                wrong.append((number, value))
+
+    threads = [threading.Thread(target=read, args=(number, )) for number in VOLTAGES]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        bus.disconnect()
+    assert not wrong
@@ -0,0 +1,99 @@
+import pytest
+
+
+from pololu_motor_controller.exceptions import CrcError
+from pololu_motor_controller.utils.pololu_protocol.crc import CrcModes, crc7, verify_responses
+from pololu_motor_controller.utils.pololu_protocol.limits import MotorLimits
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands, Protocols
+from pololu_motor_controller.utils.pololu_protocol.frames import (
+    Brake,
+    FrameEncoder,
+    Resolutions,
+
+    encode_setpoints,
+    low_resolution_speed,
+    use_low_resolution,
+)
+
+
+def test_crc7_documented_example():
+    assert crc7(bytes([0x83, 0x01])) == 0x17
+
+
+def test_verify_responses_strips_crc_bytes():
+    response = bytes([0x10, 0x20])
+    assert verify_responses(response + bytes([crc7(response)]), 2) == response
+
+
+def test_verify_responses_rejects_corrupted_response():
+    response = bytes([0x10, 0x20])
+    with pytest.raises(CrcError):
+        verify_responses(response + bytes([crc7(response) ^ 0x01]), 2)
+
+
+def test_pololu_protocol_frames():
+    encoder = FrameEncoder(0x0D)
+    assert bytes(encoder.command(Commands.exit_safe_start)) == bytes([0xAA, 0x0D, 0x03])
+    assert bytes(encoder.motor_forward(3200)) == bytes([0xAA, 0x0D, 0x05, 0x00, 0x64])
+    assert bytes(encoder.motor_reverse(1234)) == bytes([0xAA, 0x0D, 0x06, 1234 & 0x1F, 1234 >> 5])
+    assert bytes(encoder.motor_brake(32)) == bytes([0xAA, 0x0D, 0x12, 0x20])
+    assert bytes(encoder.get_variable(Variables.INPUT_VOLTAGE)) == bytes([0xAA, 0x0D, 0x21, 23])
+
+
+def test_compact_protocol_frames():
+    encoder = FrameEncoder(0x0D, Protocols.COMPACT)
+    assert bytes(encoder.command(Commands.stop_motor)) == bytes([0xE0])
+    assert bytes(encoder.motor_forward(100)) == bytes([0x85, 100 & 0x1F, 100 >> 5])
+
+
+def test_crc_byte_appended_to_every_frame():
+    encoder = FrameEncoder(0x0D, crc=CrcModes.COMMANDS)
+    for frame in (
+        encoder.command(Commands.exit_safe_start),
+        encoder.motor_forward(1000),
+        encoder.motor_brake(5),
+        encoder.get_variable(Variables.SPEED),
+        encoder.set_motor_limit(MotorLimits.MAX_SPEED, 2000),
+    ):
+        frame = bytes(frame)
+        assert frame[-1] == crc7(frame[:-1])
+
+
+def test_get_variables_pipelines_frames():
+    encoder = FrameEncoder(0x0D)
+    frames = bytes(encoder.get_variables([Variables.SPEED, Variables.TEMPERATURE]))
+    assert frames == bytes([0xAA, 0x0D, 0x21, Variables.SPEED.value, 0xAA, 0x0D, 0x21, Variables.TEMPERATURE.value])
+
+
+def test_set_motor_limit_frame():
+    frame = bytes(FrameEncoder(0x0D).set_motor_limit(MotorLimits.BRAKE_DURATION, 300))
+    assert frame == bytes([0xAA, 0x0D, 0x22, MotorLimits.BRAKE_DURATION.value, 300 & 0x7F, 300 >> 7])
+
+
+def test_set_motor_limit_rejects_out_of_range_brake_duration():
+    with pytest.raises(ValueError):
+        FrameEncoder(0x0D).set_motor_limit(MotorLimits.BRAKE_DURATION, 4097)
+
+
+@pytest.mark.parametrize('speed, expected', [(0, True), (25, True), (3150, True), (3175, False), (3199, False),
+                                             (3200, True)])
+def test_auto_resolution(speed, expected):
+    assert use_low_resolution(speed, Resolutions.AUTO) is expected
+
+
+@pytest.mark.parametrize('speed, expected', [(0, 0), (12, 0), (13, 1), (3163, 126), (3174, 126), (3176, 127),
+                                             (3200, 127)])
+def test_low_resolution_speed_rounds_to_nearest(speed, expected):
+    assert low_resolution_speed(speed) == expected
+
+
+def test_encode_setpoints():
+    buffer, first_frame = encode_setpoints({1: 1000, 2: -1200, 3: Brake(5)}, crc={1: False, 2: True, 3: False})
+    device_2 = bytes([0xAA, 2, 0x06, 1200 & 0x1F, 1200 >> 5])
+    assert first_frame == 5
+    assert buffer == (
+        bytes([0xAA, 1, 0x05, 1000 & 0x1F, 1000 >> 5])
+        + device_2 + bytes([crc7(device_2)])
+        + bytes([0xAA, 3, 0x12, 5])
+    )
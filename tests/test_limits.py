@@ -0,0 +1,53 @@
+import pytest
+
+
+from pololu_motor_controller.core import PololuMotorController
+from pololu_motor_controller.emulator import EmulatedSerial, SimpleMotorControllerEmulator
+from pololu_motor_controller.exceptions import MotorLimitError
+from pololu_motor_controller.utils.pololu_protocol.limits import MotorLimitProfile, MotorLimits
+from pololu_motor_controller.utils.pololu_protocol.variables import Variables
+
+
+@pytest.fixture
+def device():
+    return SimpleMotorControllerEmulator()
+
+
+@pytest.fixture
+def controller(device):
+    return PololuMotorController(None, connection=EmulatedSerial([device], simulate_timing=False), timeout=1.0)
+
+
+def test_only_changed_limits_are_sent(controller):
+    profile = MotorLimitProfile(max_speed_forward=3000, max_speed_reverse=3200, max_acceleration_forward=10)
+    assert controller.configure_motor_limits(profile) == {
+        MotorLimits.MAX_SPEED_FORWARD: 3000,
+        MotorLimits.MAX_ACCELERATION_FORWARD: 10,
+    }
+    assert controller.configure_motor_limits(profile) == {}
+
+
+def test_same_change_in_both_directions_is_one_command(controller):
+    profile = MotorLimitProfile(max_deceleration_forward=20, max_deceleration_reverse=20)
+    assert controller.configure_motor_limits(profile) == {MotorLimits.MAX_DECELERATION: 20}
+
+
+def test_brake_durations_are_diffed_in_set_motor_limit_units(controller, device):
+    profile = MotorLimitProfile(brake_duration_forward=25, brake_duration_reverse=25)
+    assert controller.configure_motor_limits(profile) == {MotorLimits.BRAKE_DURATION: 25}
+    assert device.get_variable(Variables.BRAKE_DURATION_FORWARD) == 100  # reported in ms
+    assert controller.read_motor_limits().brake_duration_forward == 25
+    assert controller.configure_motor_limits(profile) == {}
+
+
+def test_changes_made_behind_the_cache_are_detected(controller, device):
+    profile = MotorLimitProfile(max_speed_forward=2000)
+    controller.configure_motor_limits(profile)
+    device.set_hard_limit(Variables.MAX_SPEED_FORWARD, 3200)  # device reset to its settings
+    assert controller.configure_motor_limits(profile) == {MotorLimits.MAX_SPEED_FORWARD: 2000}
+
+
+def test_hard_limit_conflict(controller, device):
+    device.set_hard_limit(Variables.MAX_SPEED_FORWARD, 1500)
+    with pytest.raises(MotorLimitError):
+        controller.configure_motor_limits(MotorLimitProfile(max_speed_forward=2000))
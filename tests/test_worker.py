@@ -0,0 +1,92 @@
+import threading
+
+
+import pytest
+
+
+from pololu_motor_controller.worker import IoWorker
+from pololu_motor_controller.utils.pololu_protocol.commands import Commands
+
+
+class BlockingBus:
+    """
+    Records exchanges; the first one blocks until released, so the next requests queue up behind it.
+    """
+    com_port = 'test'
+
+    def __init__(self):
+        self.exchanges = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def exchange(self, frame, expected_bytes=0, command=None, instrumentation=None, frames=1, timeout=None):
+        self.exchanges.append((frame, expected_bytes, command, instrumentation, frames, timeout))
+        if len(self.exchanges) == 1:
+            self.started.set()
+            self.release.wait(5)
+        return bytes(range(expected_bytes))
+
+
+@pytest.fixture
+def bus():
+    return BlockingBus()
+
+
+@pytest.fixture
+def worker(bus):
+    worker = IoWorker(bus)
+    yield worker
+    bus.release.set()
+    worker.stop()
+
+
+def submit_behind_blocked_exchange(worker, bus, requests):
+    first = worker.submit(b'\x00', 0, Commands.get_variable, device_number=1)
+    assert bus.started.wait(5)
+    futures = [worker.submit(*request[:-1], device_number=request[-1]) for request in requests]
+    bus.release.set()
+    first.result(5)
+    return [future.result(5) for future in futures]
+
+
+def test_requests_to_one_device_are_batched(worker, bus):
+    results = submit_behind_blocked_exchange(worker, bus, [
+        (b'\x01', 2, Commands.get_variable, 1),
+        (b'\x02', 2, Commands.get_variable, 1),
+        (b'\x03', 2, Commands.get_variable, 1),
+    ])
+    assert len(bus.exchanges) == 2
+    assert bus.exchanges[1][:2] == (b'\x01\x02\x03', 6)
+    assert bus.exchanges[1][4] == 3
+    assert results == [b'\x00\x01', b'\x02\x03', b'\x04\x05']
+
+
+def test_requests_to_different_devices_are_not_batched(worker, bus):
+    submit_behind_blocked_exchange(worker, bus, [
+        (b'\x01', 2, Commands.get_variable, 1),
+        (b'\x02', 2, Commands.get_variable, 2),
+        (b'\x03', 2, Commands.get_variable, 2),
+    ])
+    assert [exchange[0] for exchange in bus.exchanges[1:]] == [b'\x01', b'\x02\x03']
+
+
+def test_requests_with_different_commands_are_not_batched(worker, bus):
+    submit_behind_blocked_exchange(worker, bus, [
+        (b'\x01', 2, Commands.get_variable, 1),
+        (b'\x02', 0, Commands.motor_forward, 1),
+        (b'\x03', 2, Commands.get_variable, 1),
+    ])
+    assert [exchange[0] for exchange in bus.exchanges[1:]] == [b'\x01', b'\x02', b'\x03']
+    assert [exchange[2] for exchange in bus.exchanges[1:]] == [
+        Commands.get_variable, Commands.motor_forward, Commands.get_variable,
+    ]
+
+
+def test_failed_batch_fails_its_requests(worker, bus):
+    def fail(*args):
+        raise TimeoutError('no response')
+
+    bus.exchange = fail
+    future = worker.submit(b'\x01', 2, Commands.get_variable, device_number=1)
+    with pytest.raises(TimeoutError):
+        future.result(5)